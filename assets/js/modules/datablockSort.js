@@ -10,6 +10,12 @@ export function enableDatablockSort() {
         headers.forEach((h) => h.classList.remove("sorted-asc", "sorted-desc"));
         th.classList.add(asc ? "sorted-asc" : "sorted-desc");
         rows.sort((a, b) => {
+          // Precompiled tables carry each cell's rank in data-sort
+          const ra = a.children[i].dataset.sort;
+          const rb = b.children[i].dataset.sort;
+          if (ra !== undefined && rb !== undefined) {
+            return asc ? ra - rb : rb - ra;
+          }
           const tda = a.children[i].textContent;
           const tdb = b.children[i].textContent;
           const valA = parseFloat(tda) || tda;
@@ -1,17 +1,126 @@
-let searchIndex = [];
+// Sharded index written by scripts/generate-search-index.py. Only the
+// manifest is fetched up front; shards and document chunks load on demand.
+const INDEX_BASE = "/search/";
+const INDEX_VERSION = 1;
+const MAX_RESULTS = 20;
+// Terms that merely start with the word being typed rank below exact hits
+const PREFIX_FACTOR = 0.5;
+
+let manifest = null;
+// Hugo's /index.json, used when the sharded index has not been generated
+let searchIndex = null;
+const shardCache = new Map();
+const docCache = new Map();
+let querySeq = 0;
+
+async function fetchJSON(url) {
+  const res = await fetch(url);
+  if (!res.ok) throw new Error(`${res.status} ${url}`);
+  return res.json();
+}
 
 async function fetchSearchData() {
   try {
-    const res = await fetch("/index.json");
-    searchIndex = await res.json();
+    const data = await fetchJSON(`${INDEX_BASE}manifest.json`);
+    if (data.version !== INDEX_VERSION) {
+      throw new Error(`Unsupported search index version ${data.version}`);
+    }
+    manifest = { ...data, stopwords: new Set(data.stopwords) };
   } catch (error) {
-    console.error("Search index load failed:", error);
+    try {
+      searchIndex = await fetchJSON("/index.json");
+    } catch (error) {
+      console.error("Search index load failed:", error);
+    }
+  }
+}
+
+// Must match tokenize() in scripts/generate-search-index.py
+function tokenize(text) {
+  return text
+    .toLowerCase()
+    .normalize("NFKD")
+    .replace(/\p{M}/gu, "")
+    .split(/[^\p{L}\p{N}]+/u)
+    .filter(t => [...t].length >= manifest.min_token && !manifest.stopwords.has(t));
+}
+
+// Must match shard_key() in scripts/generate-search-index.py
+function shardKey(term) {
+  const prefix = [...term].slice(0, manifest.prefix).join("");
+  if (/^[a-z0-9]+$/.test(prefix)) return prefix;
+  return "u" + [...prefix].map(c => c.codePointAt(0).toString(16)).join("-");
+}
+
+function shardsFor(token) {
+  const key = shardKey(token);
+  if ([...token].length >= manifest.prefix) {
+    return key in manifest.shards ? [key] : [];
   }
+  // A word shorter than the shard prefix can continue into several shards
+  return Object.keys(manifest.shards).filter(k => k.startsWith(key));
+}
+
+function loadCached(cache, path) {
+  if (!cache.has(path)) {
+    cache.set(path, fetchJSON(INDEX_BASE + path).catch(error => {
+      cache.delete(path);
+      throw error;
+    }));
+  }
+  return cache.get(path);
+}
+
+async function searchShards(query) {
+  const tokens = tokenize(query);
+  if (tokens.length === 0) return [];
+  const last = tokens.length - 1;
+
+  const shards = await Promise.all(
+    tokens.map(token =>
+      Promise.all(shardsFor(token).map(key => loadCached(shardCache, manifest.shards[key])))
+    )
+  );
+
+  // Every word must match; scores are precomputed, so ranking is a sum
+  let scores = null;
+  tokens.forEach((token, i) => {
+    const matches = new Map();
+    for (const shard of shards[i]) {
+      for (const [term, postings] of Object.entries(shard)) {
+        const exact = term === token;
+        // Only the word still being typed is matched as a prefix
+        if (!exact && !(i === last && term.startsWith(token))) continue;
+        const factor = exact ? 1 : PREFIX_FACTOR;
+        for (const [doc, score] of postings) {
+          matches.set(doc, Math.max(matches.get(doc) || 0, score * factor));
+        }
+      }
+    }
+    if (scores === null) {
+      scores = matches;
+    } else {
+      for (const [doc, score] of scores) {
+        if (matches.has(doc)) scores.set(doc, score + matches.get(doc));
+        else scores.delete(doc);
+      }
+    }
+  });
+
+  const ranked = [...scores]
+    .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+    .slice(0, MAX_RESULTS);
+  const chunks = await Promise.all(
+    ranked.map(([doc]) =>
+      loadCached(docCache, manifest.docs[Math.floor(doc / manifest.chunk)])
+    )
+  );
+  return ranked.map(([doc], i) => chunks[i][doc % manifest.chunk]);
 }
 
-function filterSearch(query) {
+function filterIndex(query) {
   const q = query.toLowerCase();
-  return searchIndex.filter(item =>
+  return (searchIndex || []).filter(item =>
     item.title?.toLowerCase().includes(q) ||
     item.summary?.toLowerCase().includes(q) ||
     item.content?.toLowerCase().includes(q) ||
@@ -20,6 +129,16 @@ function filterSearch(query) {
   );
 }
 
+async function filterSearch(query) {
+  if (!manifest) return filterIndex(query);
+  try {
+    return await searchShards(query);
+  } catch (error) {
+    console.error("Search failed:", error);
+    return [];
+  }
+}
+
 function renderResults(results) {
   const ul = document.getElementById("search-results");
   ul.innerHTML = "";
@@ -79,8 +198,11 @@ function bindKeys() {
     }
   });
 
-  document.getElementById("search-input").addEventListener("input", e => {
-    renderResults(filterSearch(e.target.value));
+  document.getElementById("search-input").addEventListener("input", async e => {
+    // Shards load asynchronously; drop results for queries already replaced
+    const seq = ++querySeq;
+    const results = await filterSearch(e.target.value);
+    if (seq === querySeq) renderResults(results);
   });
 
   const trigger = document.getElementById("search-trigger");
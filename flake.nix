@@ -21,8 +21,12 @@
         pyEnv = pkgs.python3.withPackages (
           ps: with ps; [
             toml
+            pyyaml
             rich
             requests
+            fonttools
+            brotli
+            pillow
           ]
         );
         pre-commit-check = pre-commit-hooks.lib.${system}.run {
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+import argparse, hashlib, json, os, posixpath, re, sys, tempfile
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+try:
+    import toml
+    from rich.console import Console
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+from reporting import FORMATS, Reporter
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Bump when parsing changes, so every page is re-read on the next run.
+CACHE_VERSION = 1
+
+# (tag, attribute) pairs whose value is a single URL, and the kind reported
+URL_ATTRS = {
+    ("a", "href"): "link",
+    ("area", "href"): "link",
+    ("link", "href"): "link",
+    ("img", "src"): "img",
+    ("source", "src"): "img",
+    ("video", "poster"): "img",
+    ("video", "src"): "media",
+    ("audio", "src"): "media",
+    ("iframe", "src"): "link",
+    ("script", "src"): "script",
+}
+SRCSET_TAGS = {"img", "source"}
+
+# Kinds that must not be loaded over plain http, as htmlproofer's img-http check
+INSECURE_KINDS = {"img", "script", "media"}
+
+# Fragments a browser resolves without a matching id
+IMPLICIT_ANCHORS = {"", "top"}
+
+Ref = Tuple[str, str, int]  # kind, url, line
+
+
+def cfg() -> Dict[str, Any]:
+    c = toml.load(ROOT / "config.toml").get("link-check", {})
+    site = toml.load(ROOT / "hugo.toml")
+    return {
+        "public": (ROOT / c.get("public_dir", "public")).resolve(),
+        "cache": (ROOT / c.get("cache", ".cache/link-check.json")).resolve(),
+        "base_url": c.get("base_url", site.get("baseURL", "")),
+        "ignore": [re.compile(p) for p in c.get("ignore", [])],
+    }
+
+
+# ---------------- PARSING ---------------- #
+
+
+class PageParser(HTMLParser):
+    """Collect a page's anchor targets and every URL it references."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.ids: Set[str] = set()
+        self.refs: List[Ref] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        line = self.getpos()[0]
+        for name, value in attrs:
+            if value is None:
+                continue
+            if name == "id" or (tag == "a" and name == "name"):
+                self.ids.add(value)
+            kind = URL_ATTRS.get((tag, name))
+            if kind and value.strip():
+                self.refs.append((kind, value.strip(), line))
+            elif name == "srcset" and tag in SRCSET_TAGS and not value.startswith("data:"):
+                for candidate in value.split(","):
+                    url = candidate.strip().split(" ")[0]
+                    if url:
+                        self.refs.append(("img", url, line))
+
+    handle_startendtag = handle_starttag
+
+
+def parse_page(path: Path) -> Dict[str, Any]:
+    data = path.read_bytes()
+    parser = PageParser()
+    parser.feed(data.decode("utf-8", errors="replace"))
+    parser.close()
+    st = path.stat()
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "ids": sorted(parser.ids),
+        "refs": parser.refs,
+    }
+
+
+def parse_pages(paths: List[Path], jobs: int) -> List[Dict[str, Any]]:
+    if jobs <= 1 or len(paths) <= 1:
+        return [parse_page(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(parse_page, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---------------- CACHE ---------------- #
+
+PageEntry = Dict[str, Any]
+
+
+def load_cache(path: Path) -> Dict[str, PageEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    pages = data.get("pages")
+    return pages if isinstance(pages, dict) else {}
+
+
+def save_cache(path: Path, pages: Dict[str, PageEntry]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".link-check.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        # dumps() takes the C encoder; dump() streams through the pure-Python one
+        f.write(json.dumps({"version": CACHE_VERSION, "pages": pages}, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def is_current(entry: Optional[PageEntry], path: Path) -> Optional[bool]:
+    """Same (mtime, size) trusts the entry; otherwise the content hash decides.
+
+    Returns True when the entry is untouched, None when it is still valid but
+    its stat fields were refreshed (so the cache needs writing), else False.
+    """
+    if not entry:
+        return False
+    st = path.stat()
+    if entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+        return True
+    if file_sha256(path) == entry.get("sha256"):
+        entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+        return None
+    return False
+
+
+# ---------------- CHECKING ---------------- #
+
+
+class Broken(NamedTuple):
+    page: str
+    line: int
+    kind: str
+    url: str
+    problem: str
+
+
+class Site:
+    """Every emitted file and every page's anchor ids, built once per run."""
+
+    def __init__(self, files: Set[str], ids: Dict[str, Set[str]], base_url: str) -> None:
+        self.files = files
+        self.ids = ids
+        base = urlsplit(base_url)
+        self.origin = f"{base.scheme}://{base.netloc}" if base.netloc else ""
+        # Sites served from a subpath (https://host/blog/) emit that prefix
+        self.base_path = "/" + base.path.strip("/") + "/" if base.path.strip("/") else "/"
+        self._resolved: Dict[Tuple[str, str, str], Tuple[Optional[str], str, str]] = {}
+
+    def target(self, path: str) -> Optional[str]:
+        """The emitted file a URL path is served from, following Hugo's index.html."""
+        rel = path.lstrip("/")
+        if rel == "" or rel.endswith("/"):
+            rel += "index.html"
+        if rel in self.files:
+            return rel
+        if rel + "/index.html" in self.files:
+            return rel + "/index.html"
+        return None
+
+    def resolve(self, directory: str, kind: str, url: str) -> Tuple[Optional[str], str, str]:
+        """(target, problem, fragment) for a URL seen from pages in ``directory``.
+
+        The target is ``""`` for references to the page itself and ``None`` when
+        the URL is broken (see ``problem``) or external. Pages repeat the same
+        navigation, asset and taxonomy URLs, so results are memoised per
+        directory rather than recomputed for every reference.
+        """
+        key = (directory, kind, url)
+        hit = self._resolved.get(key)
+        if hit is None:
+            hit = self._resolved[key] = self._resolve(directory, kind, url)
+        return hit
+
+    def _resolve(self, directory: str, kind: str, url: str) -> Tuple[Optional[str], str, str]:
+        parts = urlsplit(url)
+        if parts.scheme or parts.netloc:
+            if self.origin and f"{parts.scheme or 'https'}://{parts.netloc}" == self.origin:
+                parts = parts._replace(scheme="", netloc="")
+            elif parts.scheme == "http" and kind in INSECURE_KINDS:
+                return None, "insecure http://", ""
+            else:
+                return None, "", ""  # external, mailto:, data: and the like; offline by design
+        fragment = unquote(parts.fragment)
+        if not parts.path:
+            return "", "", fragment
+        # Resolve against the page's URL, which includes the base path
+        base = self.base_path + (directory + "/" if directory else "")
+        path = unquote(parts.path)
+        resolved = posixpath.normpath(posixpath.join(base, path))
+        if path.endswith("/") and not resolved.endswith("/"):
+            resolved += "/"
+        if not (resolved + "/").startswith(self.base_path):
+            return None, f"outside {self.base_path}", fragment
+        target = self.target(resolved[len(self.base_path) :])
+        if target is None:
+            return None, "missing file", fragment
+        return target, "", fragment
+
+    def check(self, page: str, ref: Ref) -> Optional[Broken]:
+        kind, url, line = ref
+        # Root-relative URLs (/css/x.css, /tags/go/) read the same from every page
+        rooted = url[:1] == "/" and url[1:2] != "/"
+        target, problem, fragment = self.resolve(
+            "" if rooted else posixpath.dirname(page), kind, url
+        )
+        if target is None:
+            return Broken(page, line, kind, url, problem) if problem else None
+        target = target or page
+        if (
+            kind == "link"
+            and target.endswith(".html")
+            and fragment not in IMPLICIT_ANCHORS
+            and fragment not in self.ids.get(target, ())
+        ):
+            return Broken(page, line, kind, url, f"missing anchor #{fragment}")
+        return None
+
+
+# ---------------- MAIN ---------------- #
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check internal links, anchors, images and scripts in the built site, offline."
+    )
+    parser.add_argument("--public", type=Path, help="built site (default: config.toml public_dir)")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="pages parsed at once (0 = one per CPU, default: 0)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="re-parse every page, ignoring the cache"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="text tables, or one JSON record per broken reference (json document or ndjson lines)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = cfg()
+    public: Path = (args.public or config["public"]).resolve()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    reporter = Reporter(args.format, "check-links")
+    if reporter.enabled:
+        # Keep stdout for the records; warnings and errors still reach stderr
+        console.file = sys.stderr
+    else:
+        console.print(
+            Panel.fit("[bold blue]Link Checker[/bold blue]", box=box.DOUBLE, border_style="blue")
+        )
+        console.print(f"[dim]Site:[/dim] {public}")
+        console.print()
+
+    if not public.is_dir():
+        console.print(f"[red]No built site at {public}; run hugo first[/red]")
+        sys.exit(1)
+
+    with console.status("[bold green]Indexing the built site...", spinner="dots"):
+        files = {p.relative_to(public).as_posix() for p in public.rglob("*") if p.is_file()}
+        html = sorted(f for f in files if f.endswith(".html"))
+        cache = {} if args.no_cache else load_cache(config["cache"])
+        entries: Dict[str, PageEntry] = {}
+        stale: List[str] = []
+        touched = False
+        for rel in html:
+            current = is_current(cache.get(rel), public / rel)
+            if current is False:
+                stale.append(rel)
+            else:
+                entries[rel] = cache[rel]
+                touched = touched or current is None
+        for rel, entry in zip(stale, parse_pages([public / rel for rel in stale], jobs)):
+            entries[rel] = entry
+        if stale or touched or len(entries) != len(cache):
+            save_cache(config["cache"], entries)
+
+    site = Site(files, {rel: set(e["ids"]) for rel, e in entries.items()}, config["base_url"])
+    broken: List[Broken] = []
+    checked = 0
+    for rel in html:
+        for ref in entries[rel]["refs"]:
+            if any(p.search(ref[1]) for p in config["ignore"]):
+                continue
+            checked += 1
+            problem = site.check(rel, tuple(ref))
+            if problem:
+                broken.append(problem)
+                reporter.record("broken", **problem._asdict())
+
+    if reporter.enabled:
+        reporter.summary(
+            pages=len(html),
+            parsed=len(stale),
+            files=len(files),
+            references=checked,
+            broken=len(broken),
+        )
+    else:
+        if broken:
+            table = Table(box=box.ROUNDED, border_style="red")
+            table.add_column("Page", style="cyan", no_wrap=False)
+            table.add_column("Kind", style="magenta", justify="center")
+            table.add_column("Reference", no_wrap=False)
+            table.add_column("Problem", style="red")
+            for b in broken:
+                table.add_row(f"{b.page}:{b.line}", b.kind, b.url, b.problem)
+            console.print(table)
+
+        pages_hit = len({b.page for b in broken})
+        summary = Panel(
+            f"[bold {'red' if broken else 'green'}]"
+            f"{'Broken references found' if broken else 'All references resolve'}"
+            f"[/bold {'red' if broken else 'green'}]\n\n"
+            f"[cyan]Pages:[/cyan] [bold]{len(html)}[/bold] "
+            f"([bold]{len(stale)}[/bold] parsed, [bold]{len(html) - len(stale)}[/bold] cached) "
+            f"• [cyan]Files:[/cyan] [bold]{len(files)}[/bold]\n"
+            f"[cyan]References checked:[/cyan] [bold]{checked}[/bold] "
+            f"• [cyan]Broken:[/cyan] [bold red]{len(broken)}[/bold red] "
+            f"on [bold]{pages_hit}[/bold] page(s)",
+            title="[bold blue]Summary[/bold blue]",
+            box=box.ROUNDED,
+            border_style="red" if broken else "green",
+        )
+        console.print()
+        console.print(summary)
+    if broken:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
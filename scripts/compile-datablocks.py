@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+import argparse, csv, hashlib, json, os, re, sys, tempfile
+from pathlib import Path
+from typing import Any, Dict, IO, List, NamedTuple, Optional, Tuple
+
+try:
+    import toml
+    from rich.console import Console
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Bump when the output layout or cell classification changes, so every CSV is
+# recompiled on the next run.
+COMPILER_VERSION = 1
+
+MANIFEST_NAME = ".manifest.json"
+
+# Same classification the datablock shortcode applied with findRE per cell:
+# "-12" is an int, "-1.5" a float
+NUMBER_RE = re.compile(r"-?\d+(\.\d+)?")
+
+# Rows buffered before being transposed into the column spools
+SPOOL_BATCH = 4096
+
+# Sort groups: numbers before text, nulls last
+NUMERIC_TYPES = {"int", "float"}
+
+
+def cfg() -> Dict[str, Path]:
+    c = toml.load(ROOT / "config.toml").get("datablocks", {})
+    return {
+        "src": (ROOT / c.get("source_dir", "assets/data")).resolve(),
+        "out": (ROOT / c.get("output_dir", "assets/datablocks")).resolve(),
+    }
+
+
+def cell_type(value: str) -> str:
+    if value == "null":
+        return "null"
+    match = NUMBER_RE.fullmatch(value)
+    if match:
+        return "float" if match.group(1) else "int"
+    return "string"
+
+
+def sort_key(value: str, kind: str) -> Tuple[int, Any]:
+    if kind in NUMERIC_TYPES:
+        return (0, float(value))
+    if kind == "null":
+        return (2, "")
+    return (1, value.casefold())
+
+
+def dense_ranks(keys: List[Any]) -> List[int]:
+    """Rank of each key in ascending order; equal keys share a rank."""
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    ranks = [0] * len(keys)
+    rank = -1
+    previous = None
+    for i in order:
+        if keys[i] != previous:
+            rank += 1
+            previous = keys[i]
+        ranks[i] = rank
+    return ranks
+
+
+# ---------------- COMPILING ---------------- #
+
+
+class Compiled(NamedTuple):
+    rows: int
+    columns: int
+    ragged: int
+
+
+def compile_csv(src: Path, dst: Path, source_name: str, digest: str) -> Compiled:
+    """Compile ``src`` into column-oriented JSON at ``dst``.
+
+    Rows are streamed once into one spool file per column, then each column is
+    ranked and written in turn, so memory is bounded by a single column rather
+    than the whole table.
+    """
+    with src.open(newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        width = len(header)
+        spools: List[IO[str]] = [
+            tempfile.TemporaryFile("w+", encoding="utf-8", newline="") for _ in header
+        ]
+        writers = [csv.writer(spool) for spool in spools]
+        rows = ragged = 0
+        try:
+            batch: List[List[str]] = []
+            for row in reader:
+                if len(row) != width:
+                    ragged += 1
+                    row = (row + [""] * width)[:width]
+                batch.append(row)
+                if len(batch) == SPOOL_BATCH:
+                    spool_batch(writers, batch)
+                    rows += len(batch)
+                    batch = []
+            spool_batch(writers, batch)
+            rows += len(batch)
+
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.stem}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as out:
+                    out.write(
+                        f'{{"version":{COMPILER_VERSION},"source":{json.dumps(source_name)},'
+                        f'"sha256":"{digest}","rows":{rows},"columns":['
+                    )
+                    for i, (name, spool) in enumerate(zip(header, spools)):
+                        if i:
+                            out.write(",")
+                        out.write(json.dumps(column_data(name, spool), separators=(",", ":")))
+                        spool.close()
+                    out.write("]}\n")
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, dst)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        finally:
+            for spool in spools:
+                spool.close()
+    return Compiled(rows, len(header), ragged)
+
+
+def spool_batch(writers: List[Any], batch: List[List[str]]) -> None:
+    """Append a batch of rows to the per-column spools, one CSV record per cell."""
+    for writer, column in zip(writers, zip(*batch)):
+        writer.writerows(zip(column))
+
+
+def column_data(name: str, spool: IO[str]) -> Dict[str, Any]:
+    """One column: display values, cell types and sort ranks for datablockSort.js.
+
+    ``type`` is the column's single cell type; mixed columns set it to "mixed"
+    and carry a per-cell ``types`` list instead.
+    """
+    spool.seek(0)
+    values = [record[0] for record in csv.reader(spool)]
+    types = [cell_type(v) for v in values]
+    kinds = set(types)
+    kind = next(iter(kinds)) if len(kinds) == 1 else "mixed" if kinds else "string"
+    if kind != "mixed":
+        # A single type needs no group in the key, which keeps the sort cheap
+        keys: List[Any] = (
+            [float(v) for v in values] if kind in NUMERIC_TYPES else [v.casefold() for v in values]
+        )
+    else:
+        keys = [sort_key(v, t) for v, t in zip(values, types)]
+    column: Dict[str, Any] = {
+        "name": name,
+        "type": kind,
+        "values": values,
+        "sort": dense_ranks(keys),
+    }
+    if kind == "mixed":
+        column["types"] = types
+    return column
+
+
+# ---------------- MANIFEST ---------------- #
+
+ManifestEntry = Dict[str, Any]
+
+
+def load_manifest(path: Path) -> Dict[str, ManifestEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != COMPILER_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(path: Path, files: Dict[str, ManifestEntry]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".manifest.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"version": COMPILER_VERSION, "files": files}, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_current(entry: Optional[ManifestEntry], src: Path, dst: Path) -> Tuple[bool, str]:
+    """Whether ``dst`` is up to date; returns the source digest when it was computed."""
+    if entry is None or not dst.exists():
+        return False, ""
+    st = src.stat()
+    if entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+        return True, entry["sha256"]
+    digest = file_sha256(src)
+    return digest == entry.get("sha256"), digest
+
+
+# ---------------- MAIN ---------------- #
+
+
+class BlockResult(NamedTuple):
+    name: str
+    status: str
+    compiled: Optional[Compiled]
+    error: Optional[Exception]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Precompile datablock CSVs into typed, column-oriented JSON."
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="recompile every CSV, ignoring the manifest"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = cfg()
+    src_dir, out_dir = config["src"], config["out"]
+    manifest_path = out_dir / MANIFEST_NAME
+
+    console.print(
+        Panel.fit(
+            "[bold blue]Datablock Compiler[/bold blue]",
+            box=box.DOUBLE,
+            border_style="blue",
+        )
+    )
+    console.print(f"[dim]Source directory:[/dim] {src_dir}")
+    console.print(f"[dim]Output directory:[/dim] {out_dir}")
+    console.print()
+
+    manifest = load_manifest(manifest_path)
+    seen: Dict[str, ManifestEntry] = {}
+    results: List[BlockResult] = []
+    for src in sorted(src_dir.rglob("*.csv")):
+        rel = src.relative_to(src_dir).as_posix()
+        dst = out_dir / Path(rel).with_suffix(".json")
+        entry = manifest.get(rel)
+        try:
+            current, digest = is_current(entry, src, dst)
+            if current and not args.force:
+                st = src.stat()
+                seen[rel] = {**entry, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+                results.append(BlockResult(rel, "cached", None, None))
+                continue
+            digest = digest or file_sha256(src)
+            compiled = compile_csv(src, dst, rel, digest)
+            st = src.stat()
+            seen[rel] = {
+                "sha256": digest,
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "rows": compiled.rows,
+            }
+            results.append(BlockResult(rel, "compiled", compiled, None))
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            if entry is not None:
+                seen[rel] = entry
+            results.append(BlockResult(rel, "failed", None, e))
+
+    pruned = 0
+    for rel in [k for k in manifest if k not in seen]:
+        (out_dir / Path(rel).with_suffix(".json")).unlink(missing_ok=True)
+        pruned += 1
+    save_manifest(manifest_path, seen)
+
+    table = Table(box=box.ROUNDED, border_style="green")
+    table.add_column("CSV", style="cyan")
+    table.add_column("Rows", justify="right")
+    table.add_column("Columns", justify="right")
+    table.add_column("Status", justify="center", width=10)
+    for result in results:
+        if result.status == "failed":
+            console.print(f"[red]❌ {result.name}[/red]: {result.error}")
+            table.add_row(result.name, "-", "-", "[red]FAIL[/red]")
+        elif result.status == "cached":
+            table.add_row(result.name, str(seen[result.name].get("rows", "-")), "-", "[dim]CACHED[/dim]")
+        else:
+            c = result.compiled
+            note = f" [yellow]({c.ragged} ragged)[/yellow]" if c.ragged else ""
+            table.add_row(result.name, f"{c.rows}{note}", str(c.columns), "[green]OK[/green]")
+    if results:
+        console.print(table)
+
+    counts = {s: sum(r.status == s for r in results) for s in ("compiled", "cached", "failed")}
+    summary = Panel(
+        f"[bold green]Datablocks Completed[/bold green]\n\n"
+        f"[cyan]Compiled:[/cyan] [bold green]{counts['compiled']}[/bold green] "
+        f"• [cyan]Cached:[/cyan] [bold]{counts['cached']}[/bold] "
+        f"• [cyan]Failed:[/cyan] [bold red]{counts['failed']}[/bold red] "
+        f"• [cyan]Pruned:[/cyan] [bold]{pruned}[/bold]\n"
+        f"[cyan]Output directory:[/cyan] [dim]{out_dir}[/dim]",
+        title="[bold blue]Summary[/bold blue]",
+        box=box.ROUNDED,
+        border_style="green",
+    )
+    console.print()
+    console.print(summary)
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
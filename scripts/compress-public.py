@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+import argparse, gzip, hashlib, json, os, shutil, sys, tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import toml
+    import brotli
+    from rich.console import Console
+    from rich.progress import (
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        BarColumn,
+        TimeElapsedColumn,
+    )
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+from reporting import FORMATS, Reporter
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Bump when the compression settings change, so every file is redone on the next run.
+COMPRESS_VERSION = 1
+
+# Sibling suffix per encoding, in the order a server should prefer them
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+DEFAULT_EXTENSIONS = [".html", ".css", ".js", ".json", ".svg", ".xml", ".txt"]
+
+
+def cfg() -> Dict[str, Any]:
+    c = toml.load(ROOT / "config.toml").get("precompress", {})
+    return {
+        "public": (ROOT / c.get("public_dir", "public")).resolve(),
+        # Compressed blobs by content hash; survives `just clean` wiping public/
+        "store": (ROOT / c.get("store_dir", ".cache/precompress")).resolve(),
+        "extensions": {e.lower() for e in c.get("extensions", DEFAULT_EXTENSIONS)},
+        "min_size": c.get("min_size", 256),
+        "brotli_quality": c.get("brotli_quality", 11),
+        "gzip_level": c.get("gzip_level", 9),
+    }
+
+
+# ---------------- COMPRESSION ---------------- #
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def compress_file(src: Path, sha: str, store: Path, quality: int, level: int) -> Dict[str, int]:
+    """Write ``<sha>.br`` and ``<sha>.gz`` for ``src`` into the store; returns their sizes."""
+    data = src.read_bytes()
+    blobs = {
+        "br": brotli.compress(data, quality=quality),
+        # mtime=0 keeps the output a function of the input alone
+        "gzip": gzip.compress(data, compresslevel=level, mtime=0),
+    }
+    sizes = {}
+    for encoding, blob in blobs.items():
+        write_atomic(store / f"{sha}{ENCODINGS[encoding]}", blob)
+        sizes[encoding] = len(blob)
+    return sizes
+
+
+def place(src: Path, sha: str, store: Path, sizes: Dict[str, int]) -> None:
+    """Copy the stored variants next to ``src``, dropping any that do not save bytes."""
+    size = src.stat().st_size
+    for encoding, suffix in ENCODINGS.items():
+        sibling = src.with_name(src.name + suffix)
+        if sizes.get(encoding, size) < size:
+            shutil.copyfile(store / f"{sha}{suffix}", sibling)
+        else:
+            sibling.unlink(missing_ok=True)
+
+
+# ---------------- MANIFEST ---------------- #
+
+ManifestEntry = Dict[str, Any]
+
+
+def load_manifest(path: Path) -> Dict[str, ManifestEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != COMPRESS_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(path: Path, files: Dict[str, ManifestEntry]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".manifest.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"version": COMPRESS_VERSION, "files": files}, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_digest(entry: Optional[ManifestEntry], src: Path) -> str:
+    """The source's sha256, reusing the manifest's when mtime and size match."""
+    st = src.stat()
+    if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+        return entry["sha256"]
+    return file_sha256(src)
+
+
+def siblings_current(src: Path, entry: ManifestEntry) -> bool:
+    """Whether the variants next to ``src`` are the ones the manifest recorded."""
+    size = entry["size"]
+    for encoding, suffix in ENCODINGS.items():
+        expected = entry["sizes"].get(encoding, size)
+        sibling = src.with_name(src.name + suffix)
+        if expected < size:
+            try:
+                if sibling.stat().st_size != expected:
+                    return False
+            except OSError:
+                return False
+        elif sibling.exists():
+            return False
+    return True
+
+
+# ---------------- MAIN ---------------- #
+
+
+class FileResult(NamedTuple):
+    path: str
+    status: str
+    size: int
+    sizes: Dict[str, int]
+    error: Optional[Exception]
+
+
+def format_size(size_bytes: int) -> str:
+    if size_bytes < 1024:
+        return f"{size_bytes}B"
+    if size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f}KB"
+    return f"{size_bytes / (1024 * 1024):.1f}MB"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Write Brotli and gzip siblings for the text files of the built site."
+    )
+    parser.add_argument("--public", type=Path, help="built site (default: config.toml public_dir)")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="files compressed at once (0 = one per CPU, default: 0)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="recompress every file, ignoring the store"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="text tables, or one JSON record per file (json document or ndjson lines)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = cfg()
+    public: Path = (args.public or config["public"]).resolve()
+    store: Path = config["store"]
+    manifest_path = store / "manifest.json"
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    reporter = Reporter(args.format, "compress-public")
+    if reporter.enabled:
+        # Keep stdout for the records; warnings and errors still reach stderr
+        console.file = sys.stderr
+    else:
+        console.print(
+            Panel.fit(
+                "[bold blue]Precompressor - Brotli + gzip[/bold blue]",
+                box=box.DOUBLE,
+                border_style="blue",
+            )
+        )
+        console.print(f"[dim]Site:[/dim] {public}")
+        console.print(f"[dim]Store:[/dim] {store}")
+        console.print()
+
+    if not public.is_dir():
+        console.print(f"[red]No built site at {public}; run hugo first[/red]")
+        sys.exit(1)
+    store.mkdir(parents=True, exist_ok=True)
+
+    suffixes = tuple(ENCODINGS.values())
+    sources: List[Path] = []
+    orphans: List[Path] = []
+    for path in public.rglob("*"):
+        if not path.is_file():
+            continue
+        if path.suffix in suffixes:
+            original = path.with_suffix("")
+            if original.suffix.lower() in config["extensions"] and not original.is_file():
+                orphans.append(path)
+        elif path.suffix.lower() in config["extensions"]:
+            sources.append(path)
+    sources.sort()
+
+    manifest = {} if args.force else load_manifest(manifest_path)
+    seen: Dict[str, ManifestEntry] = {}
+    results: Dict[str, FileResult] = {}
+    pending: List[Tuple[str, Path, ManifestEntry]] = []
+
+    for src in sources:
+        key = src.relative_to(public).as_posix()
+        st = src.stat()
+        if st.st_size < config["min_size"]:
+            # Too small to be worth a round of negotiation; drop stale variants
+            for suffix in suffixes:
+                src.with_name(src.name + suffix).unlink(missing_ok=True)
+            continue
+        entry = manifest.get(key)
+        sha = source_digest(entry, src)
+        fresh: ManifestEntry = {"sha256": sha, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        stored = all((store / f"{sha}{s}").exists() for s in suffixes)
+        if entry and entry.get("sha256") == sha and stored:
+            seen[key] = {**fresh, "sizes": entry["sizes"]}
+            status = "cached"
+            if not siblings_current(src, seen[key]):
+                # public/ was rebuilt from scratch; the store still has the bytes
+                place(src, sha, store, entry["sizes"])
+                status = "restored"
+            results[key] = FileResult(key, status, st.st_size, entry["sizes"], None)
+        else:
+            pending.append((key, src, fresh))
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        TimeElapsedColumn(),
+        console=console,
+        disable=reporter.enabled,
+    ) as progress:
+        task = progress.add_task("[green]Compressing...", total=len(seen) + len(pending))
+        progress.advance(task, len(seen))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(
+                    compress_file,
+                    src,
+                    fresh["sha256"],
+                    store,
+                    config["brotli_quality"],
+                    config["gzip_level"],
+                ): (key, src, fresh)
+                for key, src, fresh in pending
+            }
+            for future in as_completed(futures):
+                key, src, fresh = futures[future]
+                try:
+                    sizes = future.result()
+                    place(src, fresh["sha256"], store, sizes)
+                    seen[key] = {**fresh, "sizes": sizes}
+                    results[key] = FileResult(key, "compressed", fresh["size"], sizes, None)
+                except Exception as e:
+                    for suffix in suffixes:
+                        src.with_name(src.name + suffix).unlink(missing_ok=True)
+                    results[key] = FileResult(key, "failed", fresh["size"], {}, e)
+                progress.update(task, description=f"[green]Compressed [cyan]{src.name}[/cyan]")
+                progress.advance(task)
+
+    for path in orphans:
+        path.unlink()
+    # The store holds one build's worth of blobs; anything else is from an older build
+    live = {e["sha256"] for e in seen.values()}
+    for blob in store.iterdir():
+        if blob.suffix in suffixes and blob.stem not in live:
+            blob.unlink()
+    save_manifest(manifest_path, seen)
+
+    by_ext: Dict[str, List[int]] = {}
+    failed = [r for r in results.values() if r.status == "failed"]
+    for key in sorted(results):
+        result = results[key]
+        reporter.record(
+            "file",
+            path=result.path,
+            status=result.status,
+            bytes=result.size,
+            br=result.sizes.get("br"),
+            gzip=result.sizes.get("gzip"),
+            error=str(result.error) if result.error else None,
+        )
+        if result.error:
+            continue
+        totals = by_ext.setdefault(Path(key).suffix.lower(), [0, 0, 0, 0])
+        totals[0] += 1
+        totals[1] += result.size
+        totals[2] += min(result.sizes["br"], result.size)
+        totals[3] += min(result.sizes["gzip"], result.size)
+
+    counts = {
+        status: sum(r.status == status for r in results.values())
+        for status in ("compressed", "restored", "cached")
+    }
+    if reporter.enabled:
+        reporter.summary(
+            files=len(results),
+            **counts,
+            failed=len(failed),
+            removed=len(orphans),
+            bytes=sum(t[1] for t in by_ext.values()),
+            br=sum(t[2] for t in by_ext.values()),
+            gzip=sum(t[3] for t in by_ext.values()),
+        )
+    else:
+        table = Table(box=box.ROUNDED, border_style="green")
+        table.add_column("Type", style="cyan")
+        table.add_column("Files", justify="right")
+        table.add_column("Original", style="yellow", justify="right")
+        table.add_column("Brotli", style="green", justify="right")
+        table.add_column("gzip", style="green", justify="right")
+        all_totals = [0, 0, 0, 0]
+        for ext in sorted(by_ext):
+            totals = by_ext[ext]
+            all_totals = [a + b for a, b in zip(all_totals, totals)]
+            table.add_row(
+                ext,
+                str(totals[0]),
+                format_size(totals[1]),
+                f"{format_size(totals[2])} ({totals[2] / totals[1]:.0%})",
+                f"{format_size(totals[3])} ({totals[3] / totals[1]:.0%})",
+            )
+        if by_ext:
+            console.print(table)
+        for result in failed:
+            console.print(f"[red]Failed {result.path}: {result.error}[/red]")
+
+        files, original, br, gz = all_totals
+        summary = Panel(
+            f"[bold {'red' if failed else 'green'}]"
+            f"{'Compression finished with errors' if failed else 'Compression complete'}"
+            f"[/bold {'red' if failed else 'green'}]\n\n"
+            f"[cyan]Files:[/cyan] [bold]{files}[/bold] "
+            f"([bold]{counts['compressed']}[/bold] compressed, "
+            f"[bold]{counts['restored']}[/bold] restored, "
+            f"[bold]{counts['cached']}[/bold] unchanged) "
+            f"• [cyan]Stale variants removed:[/cyan] [bold]{len(orphans)}[/bold]\n"
+            f"[cyan]Original:[/cyan] [bold]{format_size(original)}[/bold] "
+            f"• [cyan]Brotli:[/cyan] [bold green]{format_size(br)}[/bold green] "
+            f"• [cyan]gzip:[/cyan] [bold green]{format_size(gz)}[/bold green]",
+            title="[bold blue]Summary[/bold blue]",
+            box=box.ROUNDED,
+            border_style="red" if failed else "green",
+        )
+        console.print()
+        console.print(summary)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
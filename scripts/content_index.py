@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""Incrementally updated SQLite index of content pages, shared by the scripts.
+
+Each Markdown file is parsed once: its frontmatter, plain text, word count,
+headings, code-fence languages and image references are stored under
+.cache/ and only re-parsed when the file's content changes.
+"""
+
+import argparse, datetime, hashlib, json, re, sqlite3, sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import toml
+    import yaml
+    from rich.console import Console
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATH = ROOT / ".cache" / "content-index.sqlite"
+
+# Bump when the parsed fields change, so the index is rebuilt on the next run.
+INDEX_VERSION = 1
+
+MORE_MARKER = "<!--more-->"
+
+HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+HEADING_ATTRS_RE = re.compile(r"\s*\{[#.][^}]*\}\s*$")
+FENCE_RE = re.compile(r"^\s{0,3}(`{3,}|~{3,})\s*([^\s`]*)")
+IMAGE_RES = (
+    re.compile(r"!\[[^\]]*\]\(\s*<?([^)\s>]+)"),
+    re.compile(r"<img\b[^>]*?\bsrc=[\"']([^\"']+)", re.I),
+    re.compile(r"\{\{[<%]\s*(?:figure|img|image)\b[^}]*?\bsrc=[\"']([^\"']+)"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    frontmatter TEXT NOT NULL,
+    error TEXT,
+    words INTEGER NOT NULL,
+    headings TEXT NOT NULL,
+    code_languages TEXT NOT NULL,
+    images TEXT NOT NULL,
+    text TEXT NOT NULL,
+    lead TEXT
+);
+"""
+
+
+# ---------------- PARSING ---------------- #
+
+
+def split_frontmatter(text: str) -> Tuple[Dict[str, Any], str]:
+    """Split YAML (---) or TOML (+++) frontmatter from the body."""
+    for fence, loader in (("---", yaml.safe_load), ("+++", toml.loads)):
+        if text.startswith(fence + "\n") or text.startswith(fence + "\r\n"):
+            end = re.search(rf"^{re.escape(fence)}\s*$", text[len(fence) + 1 :], re.M)
+            if end:
+                start = len(fence) + 1
+                meta = loader(text[start : start + end.start()]) or {}
+                return meta if isinstance(meta, dict) else {}, text[start + end.end() :]
+    return {}, text
+
+
+def plain_text(markdown: str) -> str:
+    """Reduce markdown to searchable prose, roughly as Hugo's plainify does."""
+    text = re.sub(r"\{\{[<%].*?[%>]\}\}", " ", markdown, flags=re.S)
+    text = re.sub(r"<!--.*?-->", " ", text, flags=re.S)
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", " ", text)
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+", "", text, flags=re.M)
+    text = re.sub(r"[`*_~|]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def outline(body: str) -> Tuple[List[Tuple[int, str]], List[str]]:
+    """Headings and code-fence languages, ignoring anything inside a fence."""
+    headings: List[Tuple[int, str]] = []
+    languages: List[str] = []
+    fence: Optional[str] = None
+    for line in body.splitlines():
+        match = FENCE_RE.match(line)
+        if fence is not None:
+            # A fence closes on a bare run of the same character, at least as long
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence) and not match.group(2):
+                fence = None
+            continue
+        if match:
+            fence = match.group(1)
+            language = match.group(2).strip("{}").lstrip(".")
+            if language:
+                languages.append(language)
+            continue
+        heading = HEADING_RE.match(line)
+        if heading:
+            headings.append((len(heading.group(1)), HEADING_ATTRS_RE.sub("", heading.group(2))))
+    return headings, languages
+
+
+def image_refs(body: str) -> List[str]:
+    refs: Dict[str, None] = {}
+    for pattern in IMAGE_RES:
+        for ref in pattern.findall(body):
+            refs.setdefault(ref, None)
+    return list(refs)
+
+
+# Frontmatter is kept as JSON, with dates tagged so readers get back the same
+# date and datetime objects YAML and TOML produced.
+
+
+def encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+
+def decode_object(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "$datetime" in obj:
+            return datetime.datetime.fromisoformat(obj["$datetime"])
+        if "$date" in obj:
+            return datetime.date.fromisoformat(obj["$date"])
+    return obj
+
+
+class Page(NamedTuple):
+    path: Path
+    frontmatter: Dict[str, Any]
+    # Why the frontmatter could not be parsed, if it could not
+    error: Optional[str]
+    words: int
+    headings: List[Tuple[int, str]]
+    code_languages: List[str]
+    images: List[str]
+    # Body reduced to plain text, and the part before <!--more--> if present
+    text: str
+    lead: Optional[str]
+
+
+def parse_page(path: Path, text: str) -> Page:
+    error = None
+    try:
+        meta, body = split_frontmatter(text)
+    except (yaml.YAMLError, toml.TomlDecodeError) as e:
+        meta, body, error = {}, text, str(e)
+    headings, languages = outline(body)
+    plain = plain_text(body)
+    lead = plain_text(body.split(MORE_MARKER, 1)[0]) if MORE_MARKER in body else None
+    return Page(
+        path, meta, error, len(plain.split()), headings, languages, image_refs(body), plain, lead
+    )
+
+
+# ---------------- INDEX ---------------- #
+
+
+class RefreshStats(NamedTuple):
+    files: int
+    parsed: int
+    removed: int
+
+
+def file_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ContentIndex:
+    """Parsed content pages keyed by absolute path.
+
+    ``refresh`` brings every Markdown file under a root up to date: files whose
+    mtime and size match are trusted, the rest are hashed and only re-parsed
+    when their content changed. Several scripts may refresh at once; SQLite
+    serialises the writes.
+    """
+
+    def __init__(self, path: Path = DEFAULT_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self.db:
+            self.db.executescript(SCHEMA)
+            row = self.db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != str(INDEX_VERSION):
+                self.db.execute("DELETE FROM pages")
+                self.db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),)
+                )
+
+    def __enter__(self) -> "ContentIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _under(self, root: Path) -> Tuple[str, Tuple[str, int]]:
+        prefix = root.resolve().as_posix().rstrip("/") + "/"
+        return "substr(path, 1, ?) = ?", (prefix, len(prefix))
+
+    def refresh(self, root: Path) -> RefreshStats:
+        where, (prefix, length) = self._under(root)
+        known = {
+            path: (mtime_ns, size, sha)
+            for path, mtime_ns, size, sha in self.db.execute(
+                f"SELECT path, mtime_ns, size, sha256 FROM pages WHERE {where}", (length, prefix)
+            )
+        }
+        seen = set()
+        parsed = 0
+        with self.db:
+            for file in sorted(root.resolve().rglob("*.md")):
+                if not file.is_file():
+                    continue
+                key = file.as_posix()
+                seen.add(key)
+                st = file.stat()
+                prior = known.get(key)
+                if prior and prior[:2] == (st.st_mtime_ns, st.st_size):
+                    continue
+                data = file.read_bytes()
+                sha = file_sha256(data)
+                if prior and prior[2] == sha:
+                    self.db.execute(
+                        "UPDATE pages SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (st.st_mtime_ns, st.st_size, key),
+                    )
+                    continue
+                page = parse_page(file, data.decode("utf-8", errors="replace"))
+                self.db.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        st.st_mtime_ns,
+                        st.st_size,
+                        sha,
+                        json.dumps(page.frontmatter, default=encode_value),
+                        page.error,
+                        page.words,
+                        json.dumps(page.headings),
+                        json.dumps(page.code_languages),
+                        json.dumps(page.images),
+                        page.text,
+                        page.lead,
+                    ),
+                )
+                parsed += 1
+            removed = [k for k in known if k not in seen]
+            self.db.executemany("DELETE FROM pages WHERE path = ?", ((k,) for k in removed))
+        return RefreshStats(len(seen), parsed, len(removed))
+
+    def _rows(self, sql: str, params: Tuple[Any, ...]) -> Iterator[Page]:
+        for row in self.db.execute(
+            "SELECT path, frontmatter, error, words, headings, code_languages, images, text, lead "
+            f"FROM pages {sql}",
+            params,
+        ):
+            path, meta, error, words, headings, languages, images, text, lead = row
+            yield Page(
+                Path(path),
+                json.loads(meta, object_hook=decode_object),
+                error,
+                words,
+                [tuple(h) for h in json.loads(headings)],
+                json.loads(languages),
+                json.loads(images),
+                text,
+                lead,
+            )
+
+    def get(self, path: Path) -> Optional[Page]:
+        return next(self._rows("WHERE path = ?", (path.resolve().as_posix(),)), None)
+
+    def pages(self, root: Path) -> List[Page]:
+        """Every indexed page under ``root``, in ``sorted(Path)`` order.
+
+        SQLite compares the strings, which puts ``a-b/x.md`` before
+        ``a/x.md``; Path compares by component, as the scripts' rglob walks
+        did, so document ids stay the same as before the index existed.
+        """
+        where, (prefix, length) = self._under(root)
+        return sorted(self._rows(f"WHERE {where}", (length, prefix)), key=lambda page: page.path)
+
+
+# ---------------- MAIN ---------------- #
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Refresh the shared content index and summarise what it holds."
+    )
+    parser.add_argument(
+        "root", type=Path, nargs="?", default=ROOT / "content", help="content directory"
+    )
+    parser.add_argument(
+        "--index", type=Path, default=DEFAULT_PATH, help=f"index file (default: {DEFAULT_PATH})"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    root = args.root.resolve()
+
+    console.print(
+        Panel.fit("[bold blue]Content Index[/bold blue]", box=box.DOUBLE, border_style="blue")
+    )
+    console.print(f"[dim]Content directory:[/dim] {root}")
+    console.print(f"[dim]Index:[/dim] {args.index}")
+    console.print()
+
+    with ContentIndex(args.index) as index:
+        stats = index.refresh(root)
+        pages = index.pages(root)
+
+    sections: Counter = Counter()
+    words: Counter = Counter()
+    languages: Counter = Counter()
+    for page in pages:
+        rel = page.path.relative_to(root)
+        section = rel.parts[0] if len(rel.parts) > 1 else "(root)"
+        sections[section] += 1
+        words[section] += page.words
+        languages.update(page.code_languages)
+        if page.error:
+            console.print(f"[red]❌ {rel}[/red]: {page.error.splitlines()[0]}")
+
+    table = Table(box=box.ROUNDED, border_style="green")
+    table.add_column("Section", style="cyan")
+    table.add_column("Pages", justify="right")
+    table.add_column("Words", justify="right")
+    for section in sorted(sections):
+        table.add_row(section, str(sections[section]), str(words[section]))
+    if sections:
+        console.print(table)
+
+    top = ", ".join(f"{lang} ({n})" for lang, n in languages.most_common(8)) or "none"
+    summary = Panel(
+        f"[bold green]Content Index Refreshed[/bold green]\n\n"
+        f"[cyan]Pages:[/cyan] [bold]{stats.files}[/bold] "
+        f"• [cyan]Parsed:[/cyan] [bold]{stats.parsed}[/bold] "
+        f"• [cyan]Removed:[/cyan] [bold]{stats.removed}[/bold]\n"
+        f"[cyan]Images referenced:[/cyan] [bold]{sum(len(p.images) for p in pages)}[/bold]\n"
+        f"[cyan]Code languages:[/cyan] {top}",
+        title="[bold blue]Summary[/bold blue]",
+        box=box.ROUNDED,
+        border_style="green",
+    )
+    console.print()
+    console.print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,38 @@
 #!/usr/bin/env python3
 
+import argparse
+import difflib
+import hashlib
+import json
+import math
+import os
 import sys
 import re
+import subprocess
+import tempfile
+import time
 import yaml
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 from rich.console import Console
 from rich.panel import Panel
+from rich.syntax import Syntax
 from rich.table import Table
 from rich.progress import (
     Progress,
@@ -18,8 +43,17 @@ from rich.progress import (
 )
 from rich import box
 
+from reporting import FORMATS, Reporter
+
 console = Console()
 
+A = TypeVar("A")
+T = TypeVar("T")
+
+# Chunks handed to each worker; more than one keeps the pool busy when some
+# files are much larger than others.
+CHUNKS_PER_JOB = 4
+
 VALID_LANGUAGES = {
     "python",
     "bash",
@@ -66,12 +100,18 @@ FRONTMATTER_FIELDS = {
 # ---------------- FIX FUNCTIONS ---------------- #
 
 
+NUMBERED_PREFIX_RE = re.compile(r"^(#{1,6})\s+\d+(\.\d+)*\.?\s+")
+FIGURE_HEADER_RE = re.compile(r"^###### (_(?:Table|Figure).*)")
+
+BAD_MARKERS = {"##### **Code**", "##### **Output**"}
+
+
 def remove_numbered_headings(line: str) -> str:
-    return re.sub(r"^(#{1,6})\s+\d+(\.\d+)*\.?\s+", r"\1 ", line)
+    return NUMBERED_PREFIX_RE.sub(r"\1 ", line)
 
 
 def remove_specific_markers(line: str) -> str:
-    return "" if line.strip() in {"##### **Code**", "##### **Output**"} else line
+    return "" if line.strip() in BAD_MARKERS else line
 
 
 def remove_bad_hr(line: str, in_frontmatter: bool) -> str:
@@ -79,7 +119,7 @@ def remove_bad_hr(line: str, in_frontmatter: bool) -> str:
 
 
 def fix_table_figure(line: str) -> str:
-    return re.sub(r"^###### (_(?:Table|Figure).*)", r"\1", line)
+    return FIGURE_HEADER_RE.sub(r"\1", line)
 
 
 FIX_FUNCTIONS = {
@@ -90,8 +130,27 @@ FIX_FUNCTIONS = {
 }
 
 
-def transform_lines(lines: List[str], enabled_fixes: List[str]) -> List[str]:
-    new_lines = []
+def apply_fixes(line: str, enabled_fixes: List[str], in_frontmatter: bool) -> str:
+    if "numbering" in enabled_fixes:
+        line = remove_numbered_headings(line)
+    if "markers" in enabled_fixes:
+        line = remove_specific_markers(line)
+    if "figures" in enabled_fixes:
+        line = fix_table_figure(line)
+    if "hr" in enabled_fixes:
+        line = remove_bad_hr(line, in_frontmatter)
+    return line
+
+
+def fix_stream(
+    lines: Iterable[str], enabled_fixes: List[str]
+) -> Iterator[Tuple[str, bool]]:
+    """Yield each output line with whether a second pass would leave it as is.
+
+    Delimiter lines pass through untouched, so a second pass sees the same
+    frontmatter state on every line and the output is a fixed point exactly
+    when every yielded flag is true.
+    """
     in_frontmatter = False
     delim_count = 0
 
@@ -99,82 +158,275 @@ def transform_lines(lines: List[str], enabled_fixes: List[str]) -> List[str]:
         if line.strip() == "---":
             delim_count += 1
             in_frontmatter = delim_count <= 2
-            new_lines.append(line)
+            yield line, True
             continue
 
-        if "numbering" in enabled_fixes:
-            line = remove_numbered_headings(line)
-        if "markers" in enabled_fixes:
-            line = remove_specific_markers(line)
-        if "figures" in enabled_fixes:
-            line = fix_table_figure(line)
-        if "hr" in enabled_fixes:
-            line = remove_bad_hr(line, in_frontmatter)
-
+        line = apply_fixes(line, enabled_fixes, in_frontmatter)
         if line.strip():
-            new_lines.append(line)
+            yield line, apply_fixes(line, enabled_fixes, in_frontmatter) == line
+
 
-    return new_lines
+def transform_lines(lines: Iterable[str], enabled_fixes: List[str]) -> Iterator[str]:
+    return (line for line, _ in fix_stream(lines, enabled_fixes))
 
 
 # ---------------- CHECK FUNCTIONS ---------------- #
 
+# Each line rule receives the raw line, its stripped form and its own issue
+# bucket. Rules run in registration order on a single pass and their buckets are
+# concatenated in that order, so the report is grouped by rule.
+LineRule = Callable[[str, str, List[str]], None]
 
-def check_h1_headers(lines: List[str], issues: List[str]) -> None:
-    for line in lines:
-        if re.match(r"^#\s+", line):
-            issues.append(f"[H1 HEADER] {line.strip()}")
+LINE_RULES: List[LineRule] = []
 
+H1_RE = re.compile(r"^#\s+")
+NUMBERED_HEADING_RE = re.compile(r"^#+\s+\d+(\.\d+)*\s+")
+TABLE_FIGURE_RE = re.compile(r"###### _(?:Table|Figure)")
 
-def check_numbered_headings(lines: List[str], issues: List[str]) -> None:
-    for line in lines:
-        if re.match(r"^#+\s+\d+(\.\d+)*\s+", line):
-            issues.append(f"[NUMBERED HEADING] {line.strip()}")
+# Longest frontmatter block that is buffered; keeps memory bounded when a file
+# opens with "---" but never closes it. A longer block that does close is
+# reported as oversized rather than parsed.
+FRONTMATTER_MAX_LINES = 1000
 
 
-def check_codeblock_languages(lines: List[str], issues: List[str]) -> None:
-    for line in lines:
-        if line.startswith("```"):
-            lang = line[3:].strip().lower()
-            if lang and lang not in VALID_LANGUAGES:
-                issues.append(f"[INVALID LANG] ```{lang}")
+def line_rule(func: LineRule) -> LineRule:
+    LINE_RULES.append(func)
+    return func
 
 
-def check_specific_cases(lines: List[str], issues: List[str]) -> None:
-    for line in lines:
-        if line.strip() in {"##### **Code**", "##### **Output**"}:
-            issues.append(f"[BAD MARKER] {line.strip()}")
+@line_rule
+def check_h1_headers(line: str, stripped: str, issues: List[str]) -> None:
+    if H1_RE.match(line):
+        issues.append(f"[H1 HEADER] {stripped}")
 
 
-def check_bad_horizontal_rules(lines: List[str], issues: List[str]) -> None:
-    in_frontmatter = False
-    frontmatter_count = 0
-    for line in lines:
-        if line.strip() == "---":
-            frontmatter_count += 1
-            in_frontmatter = frontmatter_count < 2
+@line_rule
+def check_numbered_headings(line: str, stripped: str, issues: List[str]) -> None:
+    if NUMBERED_HEADING_RE.match(line):
+        issues.append(f"[NUMBERED HEADING] {stripped}")
+
+
+@line_rule
+def check_codeblock_languages(line: str, stripped: str, issues: List[str]) -> None:
+    if line.startswith("```"):
+        lang = line[3:].strip().lower()
+        if lang and lang not in VALID_LANGUAGES:
+            issues.append(f"[INVALID LANG] ```{lang}")
+
+
+@line_rule
+def check_specific_cases(line: str, stripped: str, issues: List[str]) -> None:
+    if stripped in BAD_MARKERS:
+        issues.append(f"[BAD MARKER] {stripped}")
+
+
+@line_rule
+def check_table_figure(line: str, stripped: str, issues: List[str]) -> None:
+    if TABLE_FIGURE_RE.match(line):
+        issues.append(f"[BAD FIGURE/TABLE] {stripped}")
+
+
+class FrontmatterScanner:
+    """Collect the leading ``---`` block from a stream of lines.
+
+    Matches what ``^---\\n(.*?)\\n---\\n`` would find on the whole text: the
+    block opens on the first line and closes at the first terminated ``---``
+    line from the third line on. Only the leading lines are ever buffered: past
+    ``FRONTMATTER_MAX_LINES`` the scanner only looks for the closing line, so an
+    oversized block can be told apart from one that is never closed.
+    """
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.index = 0
+        self.done = False
+        self.found = False
+        self.oversized = False
+
+    def feed(self, line: str) -> None:
+        if self.done:
+            return
+        body = line.rstrip("\r\n")
+        terminated = body != line
+        index = self.index
+        self.index += 1
+
+        if index == 0:
+            self.done = body != "---" or not terminated
+        elif index >= 2 and body == "---" and terminated:
+            self.found = self.done = True
+        elif len(self.lines) >= FRONTMATTER_MAX_LINES:
+            self.oversized = True
+        else:
+            self.lines.append(body)
+
+    @property
+    def block(self) -> Optional[str]:
+        return "\n".join(self.lines) if self.found and not self.oversized else None
+
+
+# ---------------- TAXONOMY ---------------- #
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Frontmatter keys whose values must come from a curated vocabulary, and the
+# data file (relative to the data dir) that holds it. Unknown values would
+# otherwise each produce a new term page in Hugo.
+TAXONOMY_SOURCES = {
+    "tags": "allowed/tags.json",
+    "categories": "allowed/categories.json",
+    "difficulty": "allowed/difficulty.json",
+    "tools": "tools.json",
+}
+
+# Largest edit distance a suggestion may be from the unknown value
+SUGGEST_DISTANCE = 2
+SUGGEST_LIMIT = 3
+# Shortest shared prefix that makes the trie offer completions
+SUGGEST_MIN_PREFIX = 3
+
+
+def vocabulary_values(data: Any) -> List[str]:
+    """Values from an ``allowed/*.json`` file (flat or grouped) or ``tools.json``."""
+    if isinstance(data, list):
+        return [str(item["slug"]) for item in data if isinstance(item, dict) and "slug" in item]
+    values = list(data.get("values", []))
+    for group in data.get("groups", {}).values():
+        values.extend(group.get("values", []))
+    return [str(v) for v in values]
+
+
+def deletions(word: str, distance: int) -> Set[str]:
+    """``word`` with every combination of up to ``distance`` characters removed."""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance counting adjacent transpositions as one edit."""
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        row = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, prev2[j - 2] + 1)
+            row.append(cost)
+        prev2, prev = prev, row
+    return prev[-1]
+
+
+class PrefixTrie:
+    """Character trie that completes a value from its longest known prefix."""
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "PrefixTrie"] = {}
+        self.words: List[str] = []
+
+    def insert(self, word: str) -> None:
+        node = self
+        for char in word:
+            node = node.children.setdefault(char, PrefixTrie())
+            node.words.append(word)
+
+    def complete(self, value: str, limit: int) -> List[str]:
+        node, depth = self, 0
+        for char in value:
+            if char not in node.children:
+                break
+            node, depth = node.children[char], depth + 1
+        return node.words[:limit] if depth >= SUGGEST_MIN_PREFIX else []
+
+
+class Vocabulary:
+    """One taxonomy's allowed values, indexed for membership and suggestions.
+
+    Membership is a set lookup. Misspellings are matched through a
+    symmetric-delete index: every value is stored under each of its variants
+    with up to ``SUGGEST_DISTANCE`` characters removed, so an unknown value
+    only has to be compared with the few values sharing one of its own
+    variants. Truncated values fall back to trie completion.
+    """
+
+    def __init__(self, values: Iterable[str]) -> None:
+        self.values = frozenset(v.lower() for v in values)
+        self.index: Dict[str, Set[str]] = defaultdict(set)
+        self.trie = PrefixTrie()
+        for value in sorted(self.values):
+            for variant in deletions(value, SUGGEST_DISTANCE):
+                self.index[variant].add(value)
+            self.trie.insert(value)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.values
+
+    def suggest(self, value: str) -> List[str]:
+        candidates: Set[str] = set()
+        for variant in deletions(value, SUGGEST_DISTANCE):
+            candidates |= self.index.get(variant, set())
+        ranked = sorted((edit_distance(value, c), c) for c in candidates)
+        matches = [c for dist, c in ranked if dist <= SUGGEST_DISTANCE]
+        return matches[:SUGGEST_LIMIT] or self.trie.complete(value, SUGGEST_LIMIT)
+
+
+# Loaded once in the parent and handed to each worker process by
+# process_files(), rather than re-read per file.
+VOCABULARIES: Dict[str, Vocabulary] = {}
+
+
+def load_vocabularies(data_dir: Path) -> Dict[str, Vocabulary]:
+    vocabularies = {}
+    for key, name in TAXONOMY_SOURCES.items():
+        try:
+            data = json.loads((data_dir / name).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
             continue
-        if not in_frontmatter and line.strip() == "---":
-            issues.append("[BAD HR] --- outside frontmatter")
+        vocabularies[key] = Vocabulary(vocabulary_values(data))
+    return vocabularies
 
 
-def check_table_figure(lines: List[str], issues: List[str]) -> None:
-    for line in lines:
-        if re.match(r"###### _Table", line) or re.match(r"###### _Figure", line):
-            issues.append(f"[BAD FIGURE/TABLE] {line.strip()}")
+def set_vocabularies(vocabularies: Dict[str, Vocabulary]) -> None:
+    VOCABULARIES.clear()
+    VOCABULARIES.update(vocabularies)
+
+
+def check_taxonomies(data: Dict[str, Any], issues: List[str]) -> None:
+    for key, vocabulary in VOCABULARIES.items():
+        raw = data.get(key)
+        if raw is None:
+            continue
+        for value in raw if isinstance(raw, list) else [raw]:
+            # Hugo lowercases term names, so case alone is not an error
+            if str(value).lower() in vocabulary:
+                continue
+            issue = f"[TAXONOMY] Unknown {key} value '{value}'"
+            suggestions = vocabulary.suggest(str(value).lower())
+            if suggestions:
+                issue += f" (did you mean {', '.join(repr(s) for s in suggestions)}?)"
+            issues.append(issue)
 
 
-def check_frontmatter(path: Path, issues: List[str]) -> None:
-    text = path.read_text(encoding="utf-8")
-    match = re.match(r"^---\n(.*?)\n---\n", text, re.DOTALL)
-    if not match:
+def check_frontmatter(block: Optional[str], issues: List[str]) -> None:
+    if block is None:
         issues.append("[FRONTMATTER] Missing or malformed frontmatter")
         return
     try:
-        data = yaml.safe_load(match.group(1))
+        data = yaml.safe_load(block)
     except Exception as e:
         issues.append(f"[FRONTMATTER] YAML parse error: {e}")
         return
+    if not isinstance(data, dict):
+        # An empty block loads as None, a bare scalar as a str or number
+        if data is None:
+            issues.append("[FRONTMATTER] Empty frontmatter")
+        else:
+            issues.append(f"[FRONTMATTER] Expected a mapping, got {type(data).__name__}")
+        return
     for key, expected_type in FRONTMATTER_FIELDS.items():
         if key not in data:
             issues.append(f"[FRONTMATTER] Missing field: {key}")
@@ -182,17 +434,29 @@ def check_frontmatter(path: Path, issues: List[str]) -> None:
             issues.append(
                 f"[FRONTMATTER] Invalid type for '{key}': expected {expected_type.__name__}, got {type(data[key]).__name__}"
             )
+    check_taxonomies(data, issues)
+
+
+def run_all_checks(raw_lines: Iterable[str]) -> List[str]:
+    """Run every line rule and the frontmatter check in one pass over a line stream.
 
+    ``raw_lines`` keep their line endings, as yielded by :func:`read_lines`.
+    """
+    buckets: List[List[str]] = [[] for _ in LINE_RULES]
+    dispatch = list(zip(LINE_RULES, buckets))
+    frontmatter = FrontmatterScanner()
+    for raw in raw_lines:
+        frontmatter.feed(raw)
+        for line in raw.splitlines():
+            stripped = line.strip()
+            for rule, bucket in dispatch:
+                rule(line, stripped, bucket)
 
-def run_all_checks(path: Path, lines: List[str]) -> List[str]:
-    issues: List[str] = []
-    check_h1_headers(lines, issues)
-    check_numbered_headings(lines, issues)
-    check_codeblock_languages(lines, issues)
-    check_specific_cases(lines, issues)
-    check_bad_horizontal_rules(lines, issues)
-    check_table_figure(lines, issues)
-    check_frontmatter(path, issues)
+    issues: List[str] = [issue for bucket in buckets for issue in bucket]
+    if frontmatter.found and frontmatter.oversized:
+        issues.append(f"[FRONTMATTER] Exceeds {FRONTMATTER_MAX_LINES} lines")
+    else:
+        check_frontmatter(frontmatter.block, issues)
     return issues
 
 
@@ -200,94 +464,584 @@ def run_all_checks(path: Path, lines: List[str]) -> List[str]:
 
 
 def find_markdown_files(root: Path) -> List[Path]:
-    return [p for p in root.rglob("*.md") if p.is_file()]
+    return sorted(p for p in root.rglob("*.md") if p.is_file())
+
+
+def _git_lines(root: Path, *args: str) -> List[str]:
+    result = subprocess.run(
+        ["git", "-C", str(root), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def find_changed_markdown_files(
+    root: Path, since: Optional[str], staged: bool
+) -> Optional[List[Path]]:
+    """Markdown files under ``root`` changed in git, or None if git is unavailable.
+
+    ``staged`` reads the index; otherwise the working tree is compared against
+    ``since`` and untracked files are included. Deleted files are skipped.
+    """
+    diff = ["diff", "--name-only", "--relative", "--diff-filter=d"]
+    try:
+        if staged:
+            names = _git_lines(root, *diff, "--cached")
+        else:
+            names = _git_lines(root, *diff, since or "HEAD")
+            names += _git_lines(root, "ls-files", "--others", "--exclude-standard")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    paths = {root / name for name in names if name.endswith(".md")}
+    return sorted(p for p in paths if p.is_file())
+
+
+def read_lines(path: Path, digest: Optional[Any] = None) -> Iterator[str]:
+    """Lazily yield the file's lines with their original endings.
+
+    If ``digest`` is given, it is updated with the raw bytes as they are read.
+    """
+    with path.open(encoding="utf-8", newline="") as f:
+        for line in f:
+            if digest is not None:
+                digest.update(line.encode("utf-8"))
+            yield line
+
+
+def split_lines(raw_lines: Iterable[str]) -> Iterator[str]:
+    """Yield lines as ``str.splitlines`` would split the whole text."""
+    for raw in raw_lines:
+        yield from raw.splitlines()
 
 
 def check_file(path: Path) -> List[str]:
-    lines = path.read_text(encoding="utf-8").splitlines()
-    return run_all_checks(path, lines)
+    return run_all_checks(read_lines(path))
 
 
-def fix_file(path: Path, enabled_fixes: List[str]) -> None:
-    lines = path.read_text(encoding="utf-8").splitlines()
-    updated = transform_lines(lines, enabled_fixes)
-    path.write_text("\n".join(updated) + "\n", encoding="utf-8")
+def atomic_write(path: Path, chunks: Iterable[str]) -> None:
+    """Write ``chunks`` to a temp file beside ``path`` and rename it into place."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.writelines(chunks)
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
 
-def main() -> None:
-    if len(sys.argv) < 2:
-        console.print(
-            "[red]Usage:[/red] python format_markdown.py <dir> [--check-only | --fix-only <fixes>]"
+def fixed_output(path: Path, enabled_fixes: List[str]) -> Iterator[str]:
+    empty = True
+    for line in transform_lines(split_lines(read_lines(path)), enabled_fixes):
+        empty = False
+        yield line + "\n"
+    if empty:
+        yield "\n"
+
+
+def scan_fixes(path: Path, enabled_fixes: List[str]) -> Tuple[str, str, bool]:
+    """Stream the fixes over ``path`` without writing.
+
+    Returns the SHA-256 of the file, of the fixed output, and whether the
+    output is a fixed point of ``enabled_fixes``.
+    """
+    before, after = hashlib.sha256(), hashlib.sha256()
+    fixed_point, empty = True, True
+    for line, stable in fix_stream(
+        split_lines(read_lines(path, before)), enabled_fixes
+    ):
+        after.update(line.encode("utf-8") + b"\n")
+        fixed_point = fixed_point and stable
+        empty = False
+    if empty:
+        after.update(b"\n")
+    return before.hexdigest(), after.hexdigest(), fixed_point
+
+
+def fix_file(path: Path, enabled_fixes: List[str]) -> bool:
+    """Apply fixes to ``path``, writing only if the content changes."""
+    before, after, _ = scan_fixes(path, enabled_fixes)
+    if before == after:
+        return False
+    atomic_write(path, fixed_output(path, enabled_fixes))
+    return True
+
+
+def render_diff(path: Path, enabled_fixes: List[str]) -> str:
+    """Unified diff of the fixes; unlike the rest, this holds the file in memory."""
+    name = os.path.relpath(path)
+    return "".join(
+        difflib.unified_diff(
+            list(read_lines(path)),
+            list(fixed_output(path, enabled_fixes)),
+            fromfile=f"a/{name}",
+            tofile=f"b/{name}",
         )
-        sys.exit(1)
+    )
+
+
+# ---------------- CACHE ---------------- #
+
+# Bump when the cache layout or the meaning of a stored entry changes.
+CACHE_VERSION = 2
+
+DEFAULT_CACHE = Path(__file__).resolve().parent.parent / ".cache" / "fmt-markdown.json"
+
+CacheEntry = Dict[str, Any]
+CacheItem = Tuple[Path, Optional[CacheEntry]]
+FixResult = Tuple[CacheEntry, bool, str]
+
+
+def rules_fingerprint() -> str:
+    """Hash everything that decides a file's issues, so stale entries are dropped."""
+    spec = {
+        "version": CACHE_VERSION,
+        "languages": sorted(VALID_LANGUAGES),
+        "fields": {k: t.__name__ for k, t in FRONTMATTER_FIELDS.items()},
+        "rules": [rule.__name__ for rule in LINE_RULES],
+        "taxonomies": {k: sorted(v.values) for k, v in VOCABULARIES.items()},
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
 
-    root = Path(sys.argv[1])
-    mode = sys.argv[2] if len(sys.argv) >= 3 else None
-    enabled_fixes = sys.argv[3:] if mode == "--fix-only" else []
+def fixes_key(enabled_fixes: List[str]) -> str:
+    return ",".join(sorted(set(enabled_fixes)))
+
+
+def load_cache(path: Path, fingerprint: str) -> Dict[str, CacheEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_cache(path: Path, fingerprint: str, entries: Dict[str, CacheEntry]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(
+        path,
+        [json.dumps({"fingerprint": fingerprint, "files": entries}, sort_keys=True)],
+    )
+
+
+def stat_matches(path: Path, entry: Optional[CacheEntry]) -> bool:
+    if not entry:
+        return False
+    st = path.stat()
+    return entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size
+
+
+def make_entry(path: Path, digest: str, prior: Optional[CacheEntry]) -> CacheEntry:
+    """Fresh entry for ``path``, keeping prior results when the content is unchanged."""
+    st = path.stat()
+    entry: CacheEntry = {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "issues": None,
+        "fixed": [],
+    }
+    if prior and prior.get("sha256") == digest:
+        entry["issues"] = prior.get("issues")
+        entry["fixed"] = list(prior.get("fixed", []))
+    return entry
+
+
+def check_cached(item: CacheItem) -> CacheEntry:
+    """Check a file whose stat no longer matches its cache entry."""
+    path, prior = item
+    digest = hashlib.sha256()
+    issues = run_all_checks(read_lines(path, digest))
+    entry = make_entry(path, digest.hexdigest(), prior)
+    entry["issues"] = issues
+    return entry
+
+
+def fix_cached(
+    item: CacheItem,
+    enabled_fixes: List[str],
+    dry_run: bool = False,
+    want_diff: bool = False,
+) -> FixResult:
+    """Fix a file and record whether the result is a fixed point of ``enabled_fixes``.
+
+    Returns the new cache entry, whether the content changed (or would change
+    under ``dry_run``) and, if requested, a unified diff of the change. The
+    file is streamed once to decide, and once more only if it must be written.
+    """
+    path, prior = item
+    before, after, fixed_point = scan_fixes(path, enabled_fixes)
+    changed = before != after
+    diff = render_diff(path, enabled_fixes) if changed and want_diff else ""
+
+    if not changed:
+        entry = make_entry(path, before, prior)
+    elif dry_run:
+        return make_entry(path, before, prior), True, diff
+    else:
+        atomic_write(path, fixed_output(path, enabled_fixes))
+        entry = make_entry(path, after, None)
+
+    key = fixes_key(enabled_fixes)
+    if fixed_point and key not in entry["fixed"]:
+        entry["fixed"].append(key)
+    return entry, changed, diff
+
+
+# ---------------- PARALLEL RUNNER ---------------- #
+
+
+def _timed(worker: Callable[[A], T], item: A) -> Tuple[T, float]:
+    start = time.perf_counter()
+    result = worker(item)
+    return result, time.perf_counter() - start
+
+
+def _run_chunk(worker: Callable[[A], T], items: Sequence[A]) -> List[Tuple[T, float]]:
+    return [_timed(worker, item) for item in items]
+
+
+def process_files(
+    worker: Callable[[A], T],
+    files: Sequence[A],
+    jobs: int,
+    on_done: Callable[[A, T, float], None],
+) -> List[T]:
+    """Apply ``worker`` to every item and return results in ``files`` order.
+
+    With ``jobs > 1`` the files are split into chunks and spread across a
+    process pool. ``on_done`` is called in the parent with each item, its
+    result and the seconds the worker spent on it, as each chunk finishes.
+    """
+    if jobs <= 1 or len(files) <= 1:
+        results: List[T] = []
+        for f in files:
+            result, seconds = _timed(worker, f)
+            results.append(result)
+            on_done(f, result, seconds)
+        return results
+
+    chunk_size = max(1, math.ceil(len(files) / (jobs * CHUNKS_PER_JOB)))
+    chunks = [files[i : i + chunk_size] for i in range(0, len(files), chunk_size)]
+    chunk_results: List[List[Tuple[T, float]]] = [[] for _ in chunks]
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=set_vocabularies, initargs=(VOCABULARIES,)
+    ) as pool:
+        futures = {
+            pool.submit(_run_chunk, worker, chunk): i
+            for i, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            chunk_results[i] = future.result()
+            for item, (result, seconds) in zip(chunks[i], chunk_results[i]):
+                on_done(item, result, seconds)
+
+    return [r for chunk in chunk_results for r, _ in chunk]
+
+
+def partition_cached(
+    files: List[Path],
+    entries: Dict[str, CacheEntry],
+    is_fresh: Callable[[CacheEntry], bool],
+) -> Tuple[Dict[str, CacheEntry], List[CacheItem]]:
+    """Split files into cache hits (by stat alone) and items that need a worker."""
+    hits: Dict[str, CacheEntry] = {}
+    pending: List[CacheItem] = []
+    for f in files:
+        entry = entries.get(str(f))
+        if entry and stat_matches(f, entry) and is_fresh(entry):
+            hits[str(f)] = entry
+        else:
+            pending.append((f, entry))
+    return hits, pending
+
+
+def prune_cache(
+    entries: Dict[str, CacheEntry], root: Path, seen: Dict[str, CacheEntry]
+) -> None:
+    """Replace entries under ``root`` with this run's results, dropping deleted files."""
+    prefix = str(root) + os.sep
+    for key in [k for k in entries if k.startswith(prefix) and k not in seen]:
+        del entries[key]
+    entries.update(seen)
+
+
+def store_results(
+    cache_path: Path,
+    fingerprint: str,
+    entries: Dict[str, CacheEntry],
+    root: Path,
+    results: Dict[str, CacheEntry],
+    full_scan: bool,
+) -> None:
+    if full_scan:
+        prune_cache(entries, root, results)
+    else:
+        entries.update(results)
+    save_cache(cache_path, fingerprint, entries)
+
+
+def make_progress(disable: bool = False) -> Progress:
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("{task.description}"),
+        BarColumn(),
+        TimeElapsedColumn(),
+        console=console,
+        disable=disable,
+    )
+
+
+def cached_note(hits: int) -> str:
+    return f" [dim]({hits} cached)[/dim]" if hits else ""
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="format_markdown.py",
+        description="Check or fix Markdown content files.",
+    )
+    parser.add_argument("root", type=Path, help="content directory to scan")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check-only", action="store_true", help="report issues")
+    mode.add_argument(
+        "--fix-only",
+        nargs="+",
+        metavar="FIX",
+        help=f"apply fixes ({', '.join(FIX_FUNCTIONS)})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes to use (0 = one per CPU, default: 1)",
+    )
+    changed = parser.add_mutually_exclusive_group()
+    changed.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="only process files changed in git since REF (plus untracked files)",
+    )
+    changed.add_argument(
+        "--staged", action="store_true", help="only process files staged in git"
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE,
+        help=f"results cache file (default: {DEFAULT_CACHE})",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="ignore and do not update the cache"
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=DEFAULT_DATA_DIR,
+        help=f"Hugo data dir with the allowed taxonomy values (default: {DEFAULT_DATA_DIR})",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="with --check-only, exit 1 when any file has issues",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="with --fix-only, report files that would change without writing",
+    )
+    parser.add_argument(
+        "--diff", action="store_true", help="with --fix-only, show a unified diff"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="text tables, or one JSON record per file (json document or ndjson lines)",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args(sys.argv[1:])
+
+    root: Path = args.root.resolve()
+    enabled_fixes: List[str] = args.fix_only or []
+    jobs: int = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.format != "text":
+        # Keep stdout for the records; warnings and errors still reach stderr
+        console.file = sys.stderr
 
     unknown = [f for f in enabled_fixes if f not in FIX_FUNCTIONS]
     if unknown:
         console.print(f"[red]Unknown fix keys:[/red] {', '.join(unknown)}")
         sys.exit(1)
 
-    md_files = find_markdown_files(root)
+    if not args.check_only and not enabled_fixes:
+        console.print(
+            "[red]You must pass either --check-only or --fix-only <fixes>[/red]"
+        )
+        sys.exit(1)
+
+    # Only once the arguments are valid: the json format opens its document here
+    reporter = Reporter(args.format, "fmt-markdown")
+
+    md_files: Optional[List[Path]] = None
+    if args.changed_since or args.staged:
+        md_files = find_changed_markdown_files(root, args.changed_since, args.staged)
+        if md_files is None:
+            console.print("[yellow]git unavailable, scanning all files.[/yellow]")
+    full_scan = md_files is None
+    if md_files is None:
+        md_files = find_markdown_files(root)
     if not md_files:
         console.print("[yellow]No Markdown files found.[/yellow]")
+        reporter.summary(files=0)
         return
 
-    console.print(
-        Panel.fit("[bold blue]Markdown Formatter[/bold blue]", box=box.DOUBLE)
-    )
-    console.print(f"[dim]Scanning:[/dim] {root.resolve()}\n")
+    set_vocabularies(load_vocabularies(args.data_dir))
+    fingerprint = rules_fingerprint()
+    entries = {} if args.no_cache else load_cache(args.cache, fingerprint)
 
-    if mode == "--check-only":
-        from rich.table import Table
+    if not reporter.enabled:
+        console.print(
+            Panel.fit("[bold blue]Markdown Formatter[/bold blue]", box=box.DOUBLE)
+        )
+        console.print(f"[dim]Scanning:[/dim] {root}\n")
+
+    def report(path: Path, mode: str, entry: CacheEntry, cached: bool, seconds: float, **extra) -> None:
+        reporter.record(
+            "file",
+            path=str(path.relative_to(root)),
+            mode=mode,
+            cached=cached,
+            bytes=entry.get("size"),
+            seconds=round(seconds, 4),
+            **extra,
+        )
+
+    if args.check_only:
+        hits, pending = partition_cached(
+            md_files, entries, lambda e: e.get("issues") is not None
+        )
+        for name, entry in hits.items():
+            report(Path(name), "check", entry, True, 0.0, issues=entry["issues"])
+
+        def checked(item: CacheItem, entry: CacheEntry, seconds: float) -> None:
+            progress.advance(task)
+            report(item[0], "check", entry, False, seconds, issues=entry["issues"])
+
+        with make_progress(disable=reporter.enabled) as progress:
+            task = progress.add_task("Checking files...", total=len(md_files))
+            progress.advance(task, len(hits))
+            fresh = process_files(check_cached, pending, jobs, checked)
+
+        results = dict(hits)
+        results.update((str(f), entry) for (f, _), entry in zip(pending, fresh))
+        if not args.no_cache:
+            store_results(args.cache, fingerprint, entries, root, results, full_scan)
+
+        with_issues = sum(1 for e in results.values() if e["issues"])
+        failed = args.strict and with_issues > 0
+        if reporter.enabled:
+            reporter.summary(
+                mode="check",
+                files=len(md_files),
+                cached=len(hits),
+                with_issues=with_issues,
+                issues=sum(len(e["issues"]) for e in results.values()),
+            )
+            if failed:
+                sys.exit(1)
+            return
 
         table = Table(box=box.ROUNDED)
         table.add_column("File", style="cyan", width=40)
         table.add_column("Issues", style="red", justify="left")
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("{task.description}"),
-            BarColumn(),
-            TimeElapsedColumn(),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Checking files...", total=len(md_files))
-            for f in md_files:
-                issues = check_file(f)
-                result = "\n".join(issues) if issues else "[green]✓ Clean[/green]"
-                table.add_row(str(f.relative_to(root)), result)
-                progress.advance(task)
+        for f in md_files:
+            issues = results[str(f)]["issues"]
+            result = "\n".join(issues) if issues else "[green]✓ Clean[/green]"
+            table.add_row(str(f.relative_to(root)), result)
         console.print(table)
-        console.print(
-            Panel.fit("[bold green]✓ Check complete[/bold green]", box=box.ROUNDED)
-        )
+        if with_issues:
+            message = (
+                f"[bold yellow]! Check complete: {with_issues} file(s) with issues[/bold yellow]"
+            )
+        else:
+            message = "[bold green]✓ Check complete[/bold green]"
+        console.print(Panel.fit(f"{message}{cached_note(len(hits))}", box=box.ROUNDED))
+        if failed:
+            sys.exit(1)
         return
 
-    elif mode == "--fix-only":
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("{task.description}"),
-            BarColumn(),
-            TimeElapsedColumn(),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Fixing files...", total=len(md_files))
-            for f in md_files:
-                fix_file(f, enabled_fixes)
-                progress.advance(task)
-        console.print(
-            Panel.fit("[bold green]✓ Fix complete[/bold green]", box=box.ROUNDED)
+    key = fixes_key(enabled_fixes)
+    hits, pending = partition_cached(
+        md_files, entries, lambda e: key in e.get("fixed", [])
+    )
+    for name, entry in hits.items():
+        report(Path(name), "fix", entry, True, 0.0, changed=False, diff=None)
+
+    def fixed(item: CacheItem, outcome: FixResult, seconds: float) -> None:
+        progress.advance(task)
+        entry, was_changed, diff = outcome
+        report(item[0], "fix", entry, False, seconds, changed=was_changed, diff=diff or None)
+
+    with make_progress(disable=reporter.enabled) as progress:
+        task = progress.add_task("Fixing files...", total=len(md_files))
+        progress.advance(task, len(hits))
+        outcomes = process_files(
+            partial(
+                fix_cached,
+                enabled_fixes=enabled_fixes,
+                dry_run=args.dry_run,
+                want_diff=args.diff,
+            ),
+            pending,
+            jobs,
+            fixed,
+        )
+
+    results = dict(hits)
+    results.update((str(f), entry) for (f, _), (entry, _, _) in zip(pending, outcomes))
+    if not args.no_cache:
+        store_results(args.cache, fingerprint, entries, root, results, full_scan)
+
+    changed = sum(1 for _, was_changed, _ in outcomes if was_changed)
+    if reporter.enabled:
+        reporter.summary(
+            mode="fix",
+            fixes=enabled_fixes,
+            dry_run=args.dry_run,
+            files=len(md_files),
+            cached=len(hits),
+            changed=changed,
         )
         return
 
+    for _, _, diff in outcomes:
+        if diff:
+            console.print(Syntax(diff, "diff", background_color="default"))
+
+    if args.dry_run:
+        message = f"✓ Dry run complete: {changed} file(s) would change"
     else:
-        console.print(
-            "[red]You must pass either --check-only or --fix-only <fixes>[/red]"
+        message = f"✓ Fix complete: {changed} file(s) changed"
+    console.print(
+        Panel.fit(
+            f"[bold green]{message}[/bold green]{cached_note(len(hits))}",
+            box=box.ROUNDED,
         )
-        sys.exit(1)
+    )
 
 
 if __name__ == "__main__":
@@ -1,9 +1,18 @@
+import argparse
 import os
 import re
+import sys
 import json
+import random
+import threading
+import time
 import requests
+import toml
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 from collections import defaultdict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from requests.adapters import HTTPAdapter
 
 from rich.console import Console
 from rich.panel import Panel
@@ -17,6 +26,9 @@ from rich.progress import (
 )
 from rich import box
 
+from content_index import DEFAULT_PATH as INDEX_PATH, ContentIndex, Page
+from reporting import FORMATS, Reporter
+
 console = Console()
 
 
@@ -101,31 +113,316 @@ COLOR_MAP = {
 
 EXCLUDED_LANGS = {"Markdown", "YAML", "JSON", "Text"}
 
+# File extensions for --source local, mapped to the names used in COLOR_MAP
+EXTENSION_MAP = {
+    ".adb": "Ada", ".ads": "Ada",
+    ".agda": "Agda",
+    ".asm": "Assembly", ".s": "Assembly", ".S": "Assembly",
+    ".astro": "Astro",
+    ".sh": "Shell", ".bash": "Shell", ".zsh": "Shell", ".fish": "Shell",
+    ".c": "C", ".h": "C",
+    ".clj": "Clojure", ".cljs": "Clojure", ".cljc": "Clojure", ".edn": "Clojure",
+    ".cbl": "COBOL", ".cob": "COBOL",
+    ".v": "Coq",
+    ".cpp": "Cpp", ".cc": "Cpp", ".cxx": "Cpp", ".hpp": "Cpp", ".hh": "Cpp", ".hxx": "Cpp",
+    ".cr": "Crystal",
+    ".cs": "CSharp",
+    ".css": "CSS", ".scss": "CSS", ".sass": "CSS", ".less": "CSS",
+    ".d": "D",
+    ".dart": "Dart",
+    ".ex": "Elixir", ".exs": "Elixir",
+    ".elm": "Elm",
+    ".erl": "Erlang", ".hrl": "Erlang",
+    ".fnl": "Fennel",
+    ".f": "Fortran", ".f90": "Fortran", ".f95": "Fortran", ".f03": "Fortran",
+    ".g": "GAP", ".gap": "GAP", ".gi": "GAP", ".gd": "GAP",
+    ".gleam": "Gleam",
+    ".go": "Go",
+    ".graphql": "GraphQL", ".gql": "GraphQL",
+    ".hs": "Haskell", ".lhs": "Haskell",
+    ".vhd": "HDL", ".vhdl": "HDL", ".sv": "HDL",
+    ".html": "HTML", ".htm": "HTML",
+    ".http": "HTTP",
+    ".idr": "Idris",
+    ".thy": "Isabelle",
+    ".java": "Java",
+    ".js": "JavaScript", ".mjs": "JavaScript", ".cjs": "JavaScript", ".jsx": "JavaScript",
+    ".jl": "Julia",
+    ".ipynb": "Jupyter",
+    ".kt": "Kotlin", ".kts": "Kotlin",
+    ".tex": "LaTeX", ".sty": "LaTeX", ".cls": "LaTeX",
+    ".lean": "Lean",
+    ".lisp": "Lisp", ".lsp": "Lisp", ".el": "Lisp",
+    ".lua": "Lua",
+    ".md": "Markdown", ".markdown": "Markdown",
+    ".wl": "Mathematica", ".nb": "Mathematica",
+    ".mac": "Maxima",
+    ".nim": "Nim",
+    ".nix": "Nix",
+    ".m": "ObjC", ".mm": "ObjC",
+    ".ml": "OCaml", ".mli": "OCaml",
+    ".odin": "Odin",
+    ".pas": "Pascal", ".pp": "Pascal",
+    ".pl": "Perl", ".pm": "Perl",
+    ".php": "PHP",
+    ".pro": "Prolog",
+    ".py": "Python", ".pyi": "Python", ".pyx": "Python",
+    ".r": "R", ".R": "R",
+    ".rkt": "Racket",
+    ".rb": "Ruby",
+    ".rs": "Rust",
+    ".sage": "Sage",
+    ".scala": "Scala", ".sc": "Scala",
+    ".scm": "Scheme", ".ss": "Scheme",
+    ".glsl": "Shaders", ".hlsl": "Shaders", ".wgsl": "Shaders", ".frag": "Shaders", ".vert": "Shaders",
+    ".sol": "Solidity",
+    ".sql": "SQL",
+    ".svelte": "Svelte",
+    ".swift": "Swift",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".mts": "TypeScript", ".cts": "TypeScript",
+    ".typ": "Typst",
+    ".vue": "Vue",
+    ".zig": "Zig",
+    ".json": "JSON",
+    ".yml": "YAML", ".yaml": "YAML",
+    ".txt": "Text",
+}
+
+# Directories that hold vendored, generated or tooling files rather than the
+# project's own source
+SKIPPED_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "vendor", "third_party", "third-party",
+    "bower_components", "dist", "build", "target", "out", "__pycache__",
+    ".venv", "venv", ".tox", ".mypy_cache", ".direnv", "result",
+}
+
+SKIPPED_SUFFIXES = (".min.js", ".min.css", ".bundle.js", ".map")
+
+# Bytes sniffed for a NUL to tell binary files from text
+BINARY_SNIFF_BYTES = 8192
+
 DATA_DIR = Path("data/langstats")
 CONTENT_DIR = Path("content/projects")
+CONFIG_FILE = Path("config.toml")
+CACHE_FILE = Path(".cache/langstats.json")
+
+# Overridable so runs can target GitHub Enterprise or a local stand-in server
+GITHUB_API = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+DEFAULT_CONCURRENCY = 8
 
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
 
-def get_repo_languages(repo_url: str):
+
+def make_session(concurrency: int) -> requests.Session:
+    """Shared session whose connection pool fits every concurrent request."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "Hugo-LangStats"
+    if token := os.getenv("GITHUB_TOKEN"):
+        session.headers["Authorization"] = f"token {token}"
+    return session
+
+
+CacheEntry = Dict[str, Any]
+
+
+class RateLimiter:
+    """Track GitHub's rate-limit headers and hold requests back near the limit.
+
+    Shared by every worker thread. ``remaining`` is decremented as requests
+    are dispatched and corrected from each response's headers. Once it reaches
+    the reserve, every worker waits for the same ``hold_until`` before sending,
+    so concurrent workers cannot overshoot the budget.
+    """
+
+    def __init__(
+        self, reserve: int = 0, max_wait: float = 60.0, max_retries: int = DEFAULT_RETRIES
+    ) -> None:
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.hold_until: Optional[float] = None
+        self.sent = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until a request fits in the budget, or fail if that is too far off."""
+        while True:
+            with self._lock:
+                now = time.time()
+                if (
+                    self.hold_until is None
+                    and self.remaining is not None
+                    and self.remaining <= self.reserve
+                ):
+                    wait = max(0.0, (self.reset or 0) - now)
+                    if wait > self.max_wait:
+                        raise RuntimeError(
+                            f"Rate limit exhausted until {time.strftime('%H:%M:%S', time.localtime(self.reset))}"
+                        )
+                    self.hold_until = now + wait
+                if self.hold_until is not None and now >= self.hold_until:
+                    # The window has reset; the budget is unknown until the
+                    # next response reports it
+                    self.hold_until = None
+                    self.remaining = None
+                if self.hold_until is None:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    self.sent += 1
+                    return
+                wait = self.hold_until - now
+            time.sleep(wait)
+
+    def note_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def update(self, res: requests.Response) -> None:
+        headers = res.headers
+        with self._lock:
+            if "X-RateLimit-Limit" in headers:
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                remaining = int(headers["X-RateLimit-Remaining"])
+                # Responses can arrive out of order; keep the lowest count seen
+                # unless the window has reset since.
+                reset = float(headers.get("X-RateLimit-Reset", self.reset or 0))
+                if self.remaining is None or reset != self.reset:
+                    self.remaining = remaining
+                else:
+                    self.remaining = min(self.remaining, remaining)
+                self.reset = reset
+
+    def delay(self, res: Optional[requests.Response], attempt: int) -> float:
+        """Seconds to wait before retrying: the server's hint, else jittered backoff."""
+        if res is not None:
+            if "Retry-After" in res.headers:
+                try:
+                    return float(res.headers["Retry-After"])
+                except ValueError:
+                    pass
+            if res.headers.get("X-RateLimit-Remaining") == "0" and self.reset:
+                return max(0.0, self.reset - time.time())
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.sent,
+            "retries": self.retries,
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset": self.reset,
+        }
+
+    def summary(self) -> str:
+        line = f"{self.sent} requests ({self.retries} retries)"
+        if self.limit is not None and self.remaining is not None:
+            line += f", {self.limit - self.remaining}/{self.limit} of the rate limit used"
+            if self.reset:
+                reset = time.strftime("%H:%M:%S", time.localtime(self.reset))
+                line += f", resets at {reset}"
+        return line
+
+
+def is_retryable(res: requests.Response) -> bool:
+    if res.status_code in RETRY_STATUSES:
+        return True
+    # GitHub signals primary and secondary rate limits with a 403
+    return res.status_code == 403 and (
+        res.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in res.headers
+    )
+
+
+def request_with_retry(
+    session: requests.Session,
+    url: str,
+    headers: Dict[str, str],
+    limiter: RateLimiter,
+) -> requests.Response:
+    """GET ``url`` through ``limiter``, retrying rate limits, 5xx and network errors."""
+    retries = limiter.max_retries
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            res = session.get(url, headers=headers, timeout=30)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+            res = None
+        else:
+            limiter.update(res)
+            if not is_retryable(res) or attempt == retries:
+                return res
+        wait = limiter.delay(res, attempt)
+        if wait > limiter.max_wait:
+            if res is not None:
+                return res
+            raise RuntimeError(f"Retry would wait {wait:.0f}s, over the limit")
+        limiter.note_retry()
+        time.sleep(wait)
+    raise AssertionError("unreachable")
+
+
+def parse_repo(repo_url: str) -> str:
     match = re.search(r"github\.com/([^/]+)/([^/]+)", repo_url)
     if not match:
         raise ValueError(f"Invalid GitHub repo URL: {repo_url}")
     owner, repo = match.groups()
-
-    headers = {
-        "User-Agent": "Hugo-LangStats",
-    }
-    if token := os.getenv("GITHUB_TOKEN"):
-        headers["Authorization"] = f"token {token}"
-
-    res = requests.get(
-        f"https://api.github.com/repos/{owner}/{repo}/languages", headers=headers
+    return f"{owner}/{repo}"
+
+
+def fetch_languages(
+    repo_url: str,
+    session: requests.Session,
+    api_url: str = GITHUB_API,
+    prior: Optional[CacheEntry] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> Tuple[CacheEntry, bool]:
+    """Fetch a repo's language byte counts, revalidating ``prior`` if given.
+
+    Returns the cache entry and whether it was served by a 304 Not Modified.
+    """
+    repo = parse_repo(repo_url)
+    headers = {}
+    if prior:
+        if prior.get("etag"):
+            headers["If-None-Match"] = prior["etag"]
+        if prior.get("last_modified"):
+            headers["If-Modified-Since"] = prior["last_modified"]
+
+    res = request_with_retry(
+        session,
+        f"{api_url.rstrip('/')}/repos/{repo}/languages",
+        headers,
+        limiter or RateLimiter(),
     )
+    if res.status_code == 304 and prior:
+        return {**prior, "fetched_at": time.time()}, True
     if not res.ok:
         raise RuntimeError(
             f"Failed to fetch GitHub languages: {res.status_code} {res.text}"
         )
-    data = res.json()
+    return {
+        "etag": res.headers.get("ETag"),
+        "last_modified": res.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "languages": res.json(),
+    }, False
+
 
+def language_stats(data: Dict[str, int]) -> List[dict]:
     total_bytes = sum(data.values())
     if total_bytes == 0:
         return []
@@ -148,31 +445,370 @@ def get_repo_languages(repo_url: str):
     return lang_stats
 
 
-def extract_repo_url(md_file: Path):
-    content = md_file.read_text(encoding="utf-8")
-    match = re.search(r"repository:\s*(.+)", content)
-    if not match:
-        return None
-    return match.group(1).strip()
+def get_repo_languages(
+    repo_url: str,
+    session: Optional[requests.Session] = None,
+    api_url: str = GITHUB_API,
+):
+    entry, _ = fetch_languages(repo_url, session or make_session(1), api_url)
+    return language_stats(entry["languages"])
+
+
+# ---------------- LOCAL CHECKOUTS ---------------- #
+
+
+def is_binary(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return b"\0" in f.read(BINARY_SNIFF_BYTES)
+    except OSError:
+        return True
+
+
+def scan_directory(path: str) -> Tuple[Dict[str, int], List[str]]:
+    """Count language bytes for the files directly in ``path``.
+
+    Returns the byte counts and the subdirectories still to be scanned.
+    """
+    counts: Dict[str, int] = defaultdict(int)
+    subdirs = []
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return counts, subdirs
+    for entry in entries:
+        name = entry.name
+        if entry.is_dir(follow_symlinks=False):
+            if name not in SKIPPED_DIRS and not name.startswith("."):
+                subdirs.append(entry.path)
+            continue
+        if not entry.is_file(follow_symlinks=False) or name.endswith(SKIPPED_SUFFIXES):
+            continue
+        lang = EXTENSION_MAP.get(os.path.splitext(name)[1])
+        if lang is None or is_binary(entry.path):
+            continue
+        counts[lang] += entry.stat(follow_symlinks=False).st_size
+    return counts, subdirs
+
+
+def scan_local(root: Path, jobs: int = DEFAULT_CONCURRENCY) -> Dict[str, int]:
+    """Count language bytes across a checkout, GitHub-style.
+
+    Each directory is scanned as its own task, and subdirectories are queued
+    as soon as they are found, so deep and wide trees keep every worker busy.
+    """
+    if not root.is_dir():
+        raise RuntimeError(f"Local checkout not found: {root}")
+    totals: Dict[str, int] = defaultdict(int)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        pending = {pool.submit(scan_directory, str(root))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                counts, subdirs = future.result()
+                for lang, size in counts.items():
+                    totals[lang] += size
+                pending.update(pool.submit(scan_directory, d) for d in subdirs)
+    return dict(totals)
+
+
+def load_cache(path: Path) -> Dict[str, CacheEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(path: Path, cache: Dict[str, CacheEntry]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write ``text`` only when it differs, so Hugo does not see a touched file."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def extract_repo_url(page: Page) -> Optional[str]:
+    value = page.frontmatter.get("repository")
+    return str(value).strip() if value else None
+
+
+def extract_local_path(page: Page) -> Optional[Path]:
+    """Read the ``localPath:`` frontmatter key; relative paths are from the site root."""
+    value = page.frontmatter.get("localPath")
+    return Path(str(value).strip()).expanduser() if value else None
+
+
+class ProjectResult(NamedTuple):
+    slug: str
+    languages: Optional[List[dict]]
+    error: Optional[Exception]
+    # "fetched", "not-modified", "fresh" (within the TTL), "offline", "stale"
+    # or "local" for --source local
+    status: str = "fetched"
+    entry: Optional[CacheEntry] = None
+    seconds: float = 0.0
+
+
+STATUS_LABELS = {
+    "fetched": "[green]OK[/green]",
+    "not-modified": "[dim]CACHED[/dim]",
+    "fresh": "[dim]CACHED[/dim]",
+    "offline": "[dim]OFFLINE[/dim]",
+    "stale": "[yellow]STALE[/yellow]",
+    "local": "[green]LOCAL[/green]",
+}
 
 
-def main():
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    md_files = list(CONTENT_DIR.glob("*.md"))
+def fetch_project(
+    slug: str,
+    repo_url: str,
+    session: requests.Session,
+    api_url: str,
+    prior: Optional[CacheEntry] = None,
+    ttl: float = 0,
+    offline: bool = False,
+    limiter: Optional[RateLimiter] = None,
+) -> ProjectResult:
+    """Resolve one project from the cache or GitHub, capturing any failure.
+
+    If GitHub cannot be reached or keeps failing, a cached entry is served as
+    stale rather than failing the project.
+    """
+    start = time.perf_counter()
+    try:
+        age = time.time() - prior["fetched_at"] if prior else None
+        if offline:
+            if prior is None:
+                raise RuntimeError("Not in cache and --offline was given")
+            entry = prior
+            status = "offline" if ttl <= 0 or age <= ttl else "stale"
+        elif prior is not None and age is not None and age <= ttl:
+            entry, status = prior, "fresh"
+        else:
+            try:
+                entry, not_modified = fetch_languages(
+                    repo_url, session, api_url, prior, limiter
+                )
+                status = "not-modified" if not_modified else "fetched"
+            except (requests.RequestException, RuntimeError):
+                if prior is None:
+                    raise
+                entry, status = prior, "stale"
+        return ProjectResult(
+            slug,
+            language_stats(entry["languages"]),
+            None,
+            status,
+            entry,
+            time.perf_counter() - start,
+        )
+    except Exception as e:
+        return ProjectResult(slug, None, e, seconds=time.perf_counter() - start)
+
+
+def local_project(slug: str, path: Path, jobs: int) -> ProjectResult:
+    start = time.perf_counter()
+    try:
+        entry = {"fetched_at": time.time(), "languages": scan_local(path, jobs)}
+        return ProjectResult(
+            slug,
+            language_stats(entry["languages"]),
+            None,
+            "local",
+            entry,
+            time.perf_counter() - start,
+        )
+    except Exception as e:
+        return ProjectResult(slug, None, e, seconds=time.perf_counter() - start)
+
+
+def resolve_github(
+    projects: List[Tuple[str, str]],
+    cache: Dict[str, CacheEntry],
+    args: argparse.Namespace,
+    concurrency: int,
+    limiter: RateLimiter,
+) -> Iterator[ProjectResult]:
+    """Yield each project's result from the API as soon as it completes."""
+    session = make_session(concurrency)
+    with session, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = []
+        for slug, repo_url in projects:
+            try:
+                prior = cache.get(parse_repo(repo_url))
+            except ValueError:
+                prior = None
+            futures.append(
+                pool.submit(
+                    fetch_project,
+                    slug,
+                    repo_url,
+                    session,
+                    args.api_url,
+                    prior,
+                    args.ttl,
+                    args.offline,
+                    limiter,
+                )
+            )
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def resolve_local(projects: List[Tuple[str, Path]], jobs: int) -> Iterator[ProjectResult]:
+    """Scan checkouts one at a time; each scan already spreads over ``jobs`` threads."""
+    for slug, path in projects:
+        yield local_project(slug, path, jobs)
+
+
+def cfg() -> Dict[str, Path]:
+    """Directories from config.toml's [language-stats], relative to the site root."""
+    try:
+        c = toml.load(CONFIG_FILE).get("language-stats", {})
+    except (OSError, toml.TomlDecodeError):
+        c = {}
+    return {
+        "content": Path(c.get("content_dir", CONTENT_DIR)),
+        "data": Path(c.get("data_dir", DATA_DIR)),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate language stats for project pages from GitHub."
+    )
+    parser.add_argument(
+        "--source",
+        choices=("github", "local"),
+        default="github",
+        help="query the GitHub API, or scan the checkout named by each page's "
+        "localPath frontmatter key (default: github)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"concurrent GitHub requests or directory scans (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--api-url",
+        default=GITHUB_API,
+        help="GitHub API base URL (default: $GITHUB_API_URL or api.github.com)",
+    )
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        default=0,
+        help="seconds a cached response is used without revalidating (default: 0)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="serve entirely from the cache; entries older than --ttl are marked stale",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=CACHE_FILE,
+        help=f"ETag cache file (default: {CACHE_FILE})",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f"retries for rate limits, 5xx and network errors (default: {DEFAULT_RETRIES})",
+    )
+    parser.add_argument(
+        "--rate-reserve",
+        type=int,
+        default=0,
+        help="pause dispatch once this many requests remain in the rate limit",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=60.0,
+        help="longest single wait for a rate-limit reset or retry (default: 60s)",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="exit 1 when a project ends with no language data, fresh or cached "
+        "(default: warn, so builds do not depend on GitHub being reachable)",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=INDEX_PATH,
+        help=f"shared content index (default: {INDEX_PATH})",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="text tables, or one JSON record per repository (json document or ndjson lines)",
+    )
+    return parser.parse_args()
 
+
+def finish(failed: int, strict: bool) -> None:
+    """Exit 1 under --strict when projects were left without data, else warn.
+
+    Stale fallbacks count as successes; only projects with nothing to show fail.
+    """
+    if not failed:
+        return
+    if strict:
+        sys.exit(1)
     console.print(
-        Panel.fit(
-            "[bold blue]Language Stats Generator – GitHub API[/bold blue]",
-            box=box.DOUBLE,
-            border_style="blue",
-        )
+        f"[yellow]⚠ {failed} project(s) have no language data; "
+        "their pages render without stats (use --strict to fail)[/yellow]"
     )
-    console.print(f"[dim]Scanning project directory:[/dim] {CONTENT_DIR}")
-    console.print(f"[dim]Output directory:[/dim] {DATA_DIR}")
-    console.print()
 
-    if not md_files:
+
+def main():
+    args = parse_args()
+    concurrency = max(1, args.jobs)
+    config = cfg()
+    content_dir, data_dir = config["content"], config["data"]
+    data_dir.mkdir(parents=True, exist_ok=True)
+    with ContentIndex(args.index) as index:
+        index.refresh(content_dir)
+        # Project pages sit directly in the content directory
+        pages = [p for p in index.pages(content_dir) if p.path.parent == content_dir.resolve()]
+    local = args.source == "local"
+    reporter = Reporter(args.format, "generate-langstats")
+    if reporter.enabled:
+        # Keep stdout for the records; warnings and errors still reach stderr
+        console.file = sys.stderr
+    else:
+        console.print(
+            Panel.fit(
+                "[bold blue]Language Stats Generator – "
+                f"{'Local Checkouts' if local else 'GitHub API'}[/bold blue]",
+                box=box.DOUBLE,
+                border_style="blue",
+            )
+        )
+        console.print(f"[dim]Scanning project directory:[/dim] {content_dir}")
+        console.print(f"[dim]Output directory:[/dim] {data_dir}")
+        console.print()
+
+    if not pages:
         console.print("[yellow]No project markdown files found[/yellow]")
+        reporter.summary(projects=0)
         return
 
     table = Table(box=box.ROUNDED, border_style="green")
@@ -188,64 +824,120 @@ def main():
         TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
         TimeElapsedColumn(),
         console=console,
+        disable=reporter.enabled,
     ) as progress:
         task = progress.add_task(
-            "[green]Analyzing repositories...", total=len(md_files)
+            "[green]Analyzing repositories...", total=len(pages)
         )
         success, failed = 0, 0
 
-        for md_file in md_files:
-            slug = md_file.stem
-            repo_url = extract_repo_url(md_file)
-            if not repo_url:
+        projects = []
+        cache = load_cache(args.cache)
+        hits, written = 0, 0
+        for page in pages:
+            source = extract_local_path(page) if local else extract_repo_url(page)
+            if source:
+                projects.append((page.path.stem, source))
+            else:
                 progress.advance(task)
-                continue
-
-            try:
-                languages = get_repo_languages(repo_url)
-                with open(DATA_DIR / f"{slug}.json", "w", encoding="utf-8") as f:
-                    json.dump({"languages": languages}, f, indent=2)
-
-                lang_str = ", ".join(
-                    f"{l['name']} ({l['percent']}%)" for l in languages
-                )
-                top_lang = languages[0]["name"] if languages else "N/A"
 
-                table.add_row(
-                    f"[cyan]{slug}[/cyan]",
-                    f"[magenta]{top_lang}[/magenta]",
-                    lang_str,
-                    "[green]OK[/green]",
-                )
+        sources = dict(projects)
+        limiter = RateLimiter(args.rate_reserve, args.max_wait, args.retries)
+        if local:
+            resolved = resolve_local(projects, concurrency)
+        else:
+            resolved = resolve_github(projects, cache, args, concurrency, limiter)
+        results = {}
+        for result in resolved:
+            results[result.slug] = result
+            reporter.record(
+                "repo",
+                slug=result.slug,
+                source=str(sources[result.slug]),
+                status="failed" if result.error else result.status,
+                cached=result.status not in ("fetched", "local"),
+                languages=result.languages,
+                seconds=round(result.seconds, 4),
+                error=None if result.error is None else str(result.error),
+            )
+            if result.error is None:
+                if not local:
+                    cache[parse_repo(sources[result.slug])] = result.entry
+                text = json.dumps({"languages": result.languages}, indent=2)
+                written += write_if_changed(data_dir / f"{result.slug}.json", text)
+                hits += result.status not in ("fetched", "local")
                 success += 1
-            except Exception as e:
-                table.add_row(
-                    f"[cyan]{slug}[/cyan]",
-                    "[magenta]-[/magenta]",
-                    "[dim]n/a[/dim]",
-                    "[red]FAIL[/red]",
-                )
-                console.print(f"[red]❌ {slug}[/red]: {e}")
+            else:
+                console.print(f"[red]❌ {result.slug}[/red]: {result.error}")
                 failed += 1
-
+            progress.update(
+                task,
+                description=f"[green]Analyzed [cyan]{result.slug}[/cyan]",
+            )
             progress.advance(task)
 
+    if not (local or args.offline):
+        save_cache(args.cache, cache)
+
+    if reporter.enabled:
+        reporter.summary(
+            source=args.source,
+            projects=len(pages),
+            success=success,
+            failed=failed,
+            cache_hits=hits,
+            written=written,
+            api=None if local else limiter.stats(),
+            output_dir=data_dir,
+        )
+        finish(failed, args.strict)
+        return
+
+    for slug, _ in projects:
+        result = results[slug]
+        if result.error is None:
+            languages = result.languages
+            lang_str = ", ".join(f"{l['name']} ({l['percent']}%)" for l in languages)
+            top_lang = languages[0]["name"] if languages else "N/A"
+            table.add_row(
+                f"[cyan]{slug}[/cyan]",
+                f"[magenta]{top_lang}[/magenta]",
+                lang_str,
+                STATUS_LABELS[result.status],
+            )
+        else:
+            table.add_row(
+                f"[cyan]{slug}[/cyan]",
+                "[magenta]-[/magenta]",
+                "[dim]n/a[/dim]",
+                "[red]FAIL[/red]",
+            )
+
     console.print()
     console.print(table)
 
+    if failed:
+        colour = "red" if args.strict else "yellow"
+        headline = f"[bold {colour}]Language Stats Completed with {failed} failure(s)[/bold {colour}]"
+    else:
+        headline = "[bold green]Language Stats Completed[/bold green]"
     summary = Panel(
-        f"[bold green]Language Stats Completed[/bold green]\n\n"
-        f"[cyan]Projects processed:[/cyan] [bold]{len(md_files)}[/bold]\n"
+        f"{headline}\n\n"
+        f"[cyan]Projects processed:[/cyan] [bold]{len(pages)}[/bold]\n"
         f"[cyan]Successful:[/cyan] [bold green]{success}[/bold green] "
         f"• [cyan]Failed:[/cyan] [bold red]{failed}[/bold red]\n"
-        f"[cyan]Output directory:[/cyan] [dim]{DATA_DIR}[/dim]",
+        f"[cyan]Cache hits:[/cyan] [bold]{hits}[/bold] "
+        f"• [cyan]Files updated:[/cyan] [bold]{written}[/bold]\n"
+        + ("" if local else f"[cyan]GitHub API:[/cyan] [bold]{limiter.summary()}[/bold]\n")
+        + f"[cyan]Output directory:[/cyan] [dim]{data_dir}[/dim]",
         title="[bold blue]Summary[/bold blue]",
         box=box.ROUNDED,
-        border_style="green",
+        border_style=("red" if args.strict else "yellow") if failed else "green",
     )
 
     console.print()
     console.print(summary)
+    finish(failed, args.strict)
 
 
 if __name__ == "__main__":
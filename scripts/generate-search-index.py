@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+import argparse, hashlib, json, math, os, re, sys, unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import toml
+    from rich.console import Console
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+from content_index import DEFAULT_PATH as INDEX_PATH, ContentIndex
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Bump when the on-disk layout changes, so the client can refuse an index it
+# does not understand and fall back to /index.json.
+INDEX_VERSION = 1
+
+# Per-field boosts applied to term frequencies before BM25 saturation
+DEFAULT_WEIGHTS = {"title": 10, "tags": 6, "categories": 4, "summary": 2, "content": 1}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SUMMARY_WORDS = 70
+MIN_TOKEN_LEN = 2
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or "
+    "that the this to was were will with".split()
+)
+
+TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+SHARD_KEY_RE = re.compile(r"^[a-z0-9]+$")
+
+
+def cfg() -> Dict[str, Any]:
+    c = toml.load(ROOT / "config.toml").get("search-index", {})
+    site = toml.load(ROOT / "hugo.toml")
+    # Same page types as the Hugo-built /index.json, so both stay in sync
+    types = site.get("params", {}).get("search", {}).get("types", [])
+    return {
+        "content": (ROOT / c.get("content_dir", "content")).resolve(),
+        "out": (ROOT / c.get("output_dir", "static/search")).resolve(),
+        "types": c.get("types", types),
+        "prefix_len": c.get("prefix_len", 2),
+        "docs_per_chunk": c.get("docs_per_chunk", 100),
+        "weights": {**DEFAULT_WEIGHTS, **c.get("weights", {})},
+    }
+
+
+# ---------------- PARSING ---------------- #
+
+
+class Page(NamedTuple):
+    title: str
+    summary: str
+    permalink: str
+    section: str
+    tags: List[str]
+    categories: List[str]
+    date: str
+    content: str
+
+
+def urlize(segment: str) -> str:
+    return re.sub(r"\s+", "-", segment.strip()).lower()
+
+
+def permalink_for(rel: Path, meta: Dict[str, Any]) -> str:
+    """Hugo's default permalink for a content file, honouring url and slug."""
+    if meta.get("url"):
+        return "/" + str(meta["url"]).strip("/") + "/"
+    parts = list(rel.parts[:-1])
+    if rel.stem != "index":
+        parts.append(rel.stem)
+    if meta.get("slug"):
+        parts[-1] = str(meta["slug"])
+    return "/" + "/".join(urlize(p) for p in parts) + "/"
+
+
+def as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
+
+def parse_page(indexed: Any, content_dir: Path) -> Optional[Page]:
+    """Build a search document from a page in the shared content index."""
+    meta = indexed.frontmatter
+    if meta.get("draft"):
+        return None
+    rel = indexed.path.relative_to(content_dir)
+    if indexed.lead is not None:
+        summary = indexed.lead
+    else:
+        summary = meta.get("summary") or meta.get("description")
+        if not summary:
+            summary = " ".join(indexed.text.split()[:SUMMARY_WORDS])
+    return Page(
+        title=str(meta.get("title") or rel.stem),
+        summary=str(summary),
+        permalink=permalink_for(rel, meta),
+        section=str(meta.get("type") or rel.parts[0]),
+        tags=as_list(meta.get("tags")),
+        categories=as_list(meta.get("categories")),
+        date=str(meta.get("date") or ""),
+        content=indexed.text,
+    )
+
+
+def find_pages(content_dir: Path, types: List[str], index: ContentIndex) -> List[Page]:
+    index.refresh(content_dir)
+    pages = []
+    for indexed in index.pages(content_dir):
+        path = indexed.path
+        if path.name == "_index.md" or path.parent == content_dir:
+            continue
+        page = parse_page(indexed, content_dir)
+        if page is not None and (not types or page.section in types):
+            pages.append(page)
+    return pages
+
+
+# ---------------- INDEXING ---------------- #
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip accents and split on anything that is not a letter or digit.
+
+    search.js applies the same steps to the query, so the two must change together.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [
+        t
+        for t in TOKEN_RE.findall(text)
+        if len(t) >= MIN_TOKEN_LEN and t not in STOPWORDS
+    ]
+
+
+def shard_key(term: str, prefix_len: int) -> str:
+    """File-safe name of the shard holding ``term``; mirrored in search.js."""
+    prefix = term[:prefix_len]
+    if SHARD_KEY_RE.match(prefix):
+        return prefix
+    return "u" + "-".join(f"{ord(c):x}" for c in prefix)
+
+
+def build_postings(
+    pages: List[Page], weights: Dict[str, float]
+) -> Dict[str, List[Tuple[int, float]]]:
+    """BM25F over the weighted fields; each posting carries its final score."""
+    field_tfs: List[Counter] = []
+    lengths: List[float] = []
+    for page in pages:
+        fields = {
+            "title": page.title,
+            "tags": " ".join(page.tags),
+            "categories": " ".join(page.categories),
+            "summary": page.summary,
+            "content": page.content,
+        }
+        tf: Counter = Counter()
+        length = 0.0
+        for field, text in fields.items():
+            tokens = tokenize(text)
+            for token in tokens:
+                tf[token] += weights[field]
+            length += weights[field] * len(tokens)
+        field_tfs.append(tf)
+        lengths.append(length)
+
+    n = len(pages)
+    avg_len = (sum(lengths) / n if n else 0) or 1.0
+    df: Counter = Counter()
+    for tf in field_tfs:
+        df.update(tf.keys())
+
+    postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+    for doc, (tf, length) in enumerate(zip(field_tfs, lengths)):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+        for term, freq in tf.items():
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score = idf * freq * (BM25_K1 + 1) / (freq + norm)
+            postings[term].append((doc, round(score, 3)))
+    for plist in postings.values():
+        plist.sort(key=lambda p: (-p[1], p[0]))
+    return postings
+
+
+def shard_postings(
+    postings: Dict[str, List[Tuple[int, float]]], prefix_len: int
+) -> Dict[str, Dict[str, List[Tuple[int, float]]]]:
+    shards: Dict[str, Dict[str, List[Tuple[int, float]]]] = defaultdict(dict)
+    for term in sorted(postings):
+        shards[shard_key(term, prefix_len)][term] = postings[term]
+    return shards
+
+
+# ---------------- OUTPUT ---------------- #
+
+
+def dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write ``text`` only when it differs, so Hugo does not see a touched file."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+def hashed_name(stem: str, text: str) -> str:
+    """Content-addressed file name, so shards can be cached as immutable."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:10]
+    return f"{stem}.{digest}.json"
+
+
+def write_index(
+    out: Path,
+    pages: List[Page],
+    shards: Dict[str, Dict[str, List[Tuple[int, float]]]],
+    prefix_len: int,
+    docs_per_chunk: int,
+) -> Tuple[int, int, int]:
+    """Write document chunks, shards and the manifest; returns written, kept, pruned."""
+    files: Dict[str, str] = {}
+    doc_files = []
+    for start in range(0, len(pages), docs_per_chunk):
+        chunk = [
+            {
+                "title": p.title,
+                "summary": p.summary,
+                "permalink": p.permalink,
+                "section": p.section,
+                "tags": p.tags,
+                "categories": p.categories,
+                "date": p.date,
+            }
+            for p in pages[start : start + docs_per_chunk]
+        ]
+        text = dumps(chunk)
+        name = f"docs/{hashed_name(str(start // docs_per_chunk), text)}"
+        files[name] = text
+        doc_files.append(name)
+
+    shard_files = {}
+    for key, terms in shards.items():
+        text = dumps(terms)
+        name = f"shards/{hashed_name(key, text)}"
+        files[name] = text
+        shard_files[key] = name
+
+    # The manifest is fetched first and is the only file that is not
+    # content-addressed; everything it points at can be cached forever.
+    manifest = {
+        "version": INDEX_VERSION,
+        "prefix": prefix_len,
+        "min_token": MIN_TOKEN_LEN,
+        "stopwords": sorted(STOPWORDS),
+        "docs": doc_files,
+        "chunk": docs_per_chunk,
+        "shards": shard_files,
+    }
+
+    written = kept = 0
+    for name, text in files.items():
+        if write_if_changed(out / name, text):
+            written += 1
+        else:
+            kept += 1
+
+    pruned = 0
+    for sub in ("docs", "shards"):
+        for path in (out / sub).glob("*.json"):
+            if f"{sub}/{path.name}" not in files:
+                path.unlink()
+                pruned += 1
+
+    written += write_if_changed(out / "manifest.json", dumps(manifest))
+    return written, kept, pruned
+
+
+# ---------------- MAIN ---------------- #
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build a prefix-sharded inverted search index from site content."
+    )
+    parser.add_argument(
+        "--output", type=Path, help="output directory (default: config.toml output_dir)"
+    )
+    parser.add_argument(
+        "--prefix-len", type=int, help="term prefix length used to pick a shard"
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=INDEX_PATH,
+        help=f"shared content index (default: {INDEX_PATH})",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = cfg()
+    out = (args.output or config["out"]).resolve()
+    prefix_len = max(1, args.prefix_len or config["prefix_len"])
+
+    console.print(
+        Panel.fit(
+            "[bold blue]Search Index Generator[/bold blue]",
+            box=box.DOUBLE,
+            border_style="blue",
+        )
+    )
+    console.print(f"[dim]Content directory:[/dim] {config['content']}")
+    console.print(f"[dim]Output directory:[/dim] {out}")
+    console.print()
+
+    with ContentIndex(args.index) as index:
+        pages = find_pages(config["content"].resolve(), config["types"], index)
+    postings = build_postings(pages, config["weights"])
+    shards = shard_postings(postings, prefix_len)
+    written, kept, pruned = write_index(
+        out, pages, shards, prefix_len, max(1, config["docs_per_chunk"])
+    )
+
+    sections = Counter(page.section for page in pages)
+    table = Table(box=box.ROUNDED, border_style="green")
+    table.add_column("Section", style="cyan")
+    table.add_column("Pages", justify="right")
+    for section, count in sorted(sections.items()):
+        table.add_row(section, str(count))
+    if sections:
+        console.print(table)
+
+    sizes = [len(dumps(terms)) for terms in shards.values()]
+    summary = Panel(
+        f"[bold green]Search Index Completed[/bold green]\n\n"
+        f"[cyan]Pages indexed:[/cyan] [bold]{len(pages)}[/bold] "
+        f"• [cyan]Terms:[/cyan] [bold]{len(postings)}[/bold]\n"
+        f"[cyan]Shards:[/cyan] [bold]{len(shards)}[/bold] "
+        f"• [cyan]Largest shard:[/cyan] [bold]{max(sizes, default=0) / 1024:.1f} KiB[/bold]\n"
+        f"[cyan]Files written:[/cyan] [bold]{written}[/bold] "
+        f"• [cyan]Unchanged:[/cyan] [bold]{kept}[/bold] "
+        f"• [cyan]Pruned:[/cyan] [bold]{pruned}[/bold]\n"
+        f"[cyan]Output directory:[/cyan] [dim]{out}[/dim]",
+        title="[bold blue]Summary[/bold blue]",
+        box=box.ROUNDED,
+        border_style="green",
+    )
+    console.print()
+    console.print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+import argparse, fnmatch, hashlib, json, os, re, subprocess, sys, time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import toml
+    from rich.console import Console
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ROOT / "scripts"
+STATE_FILE = ROOT / ".cache" / "pipeline.json"
+
+# Bump when the fingerprint recipe changes, so every stage runs once more.
+STATE_VERSION = 2
+
+
+class Stage(NamedTuple):
+    name: str
+    command: List[str]
+    # Glob patterns relative to the repo root. A stage runs after every stage
+    # whose outputs match one of its inputs.
+    inputs: List[str]
+    outputs: List[str]
+    description: str
+    # A nonzero exit from an advisory stage is shown as a warning with its
+    # output, without failing the pipeline; it runs again until it passes.
+    advisory: bool = False
+
+
+def stages() -> List[Stage]:
+    """The pre-build stages, with paths taken from config.toml like the scripts do."""
+    config = toml.load(ROOT / "config.toml")
+    images = config.get("preprocess-images", {})
+    langstats = config.get("language-stats", {})
+    search = config.get("search-index", {})
+    datablocks = config.get("datablocks", {})
+    fonts = config.get("font-subset", {})
+    content = search.get("content_dir", "content")
+
+    def script(name: str, *args: str) -> List[str]:
+        return [sys.executable, str(SCRIPTS / name), *args]
+
+    return [
+        Stage(
+            "images",
+            script("preprocess-images.py"),
+            [f"{images.get('raw_dir', 'static/images/raw')}/**", "config.toml"],
+            [
+                f"{images.get('processed_dir', 'static/images/processed')}/**",
+                images.get("data_file", "data/images.json"),
+            ],
+            "Convert raw images to WebP variants",
+        ),
+        Stage(
+            "langstats",
+            script("generate-langstats.py"),
+            [f"{langstats.get('content_dir', 'content/projects')}/*.md", "config.toml"],
+            [f"{langstats.get('data_dir', 'data/langstats')}/*.json"],
+            "Language stats for project pages",
+        ),
+        Stage(
+            "markdown",
+            script("fmt-markdown.py", content, "--check-only", "--strict", "--jobs", "0"),
+            [f"{content}/**/*.md", "data/allowed/*.json", "data/tools.json"],
+            [],
+            "Check content Markdown and taxonomies",
+            advisory=True,
+        ),
+        Stage(
+            "search-index",
+            script("generate-search-index.py"),
+            [f"{content}/**/*.md", "config.toml", "hugo.toml"],
+            [f"{search.get('output_dir', 'static/search')}/**"],
+            "Sharded search index",
+        ),
+        Stage(
+            "datablocks",
+            script("compile-datablocks.py"),
+            [f"{datablocks.get('source_dir', 'assets/data')}/**/*.csv", "config.toml"],
+            [f"{datablocks.get('output_dir', 'assets/datablocks')}/**"],
+            "Precompile datablock CSVs",
+        ),
+        Stage(
+            "fonts",
+            script("subset-fonts.py"),
+            [
+                fonts.get("fonts_css", "assets/css/base/fonts.css"),
+                "static/fonts/**",
+                "assets/css/**/*.css",
+                *fonts.get(
+                    "text_globs", ["content/**/*.md", "layouts/**/*.html", "data/**/*.json"]
+                ),
+                "config.toml",
+            ],
+            [
+                f"{fonts.get('output_dir', 'static/fonts-subset')}/**",
+                fonts.get("output_css", "assets/fonts/subset.css"),
+            ],
+            "Subset web fonts to the characters in use",
+        ),
+    ]
+
+
+# ---------------- DAG ---------------- #
+
+
+def pattern_overlap(output: str, input_: str) -> bool:
+    """Whether a file matched by ``output`` could also be matched by ``input_``."""
+    def base(pattern: str) -> str:
+        parts = []
+        for part in pattern.split("/"):
+            if any(c in part for c in "*?["):
+                break
+            parts.append(part)
+        return "/".join(parts)
+
+    a, b = base(output), base(input_)
+    return (
+        a == b
+        or a.startswith(b + "/")
+        or b.startswith(a + "/")
+        or fnmatch.fnmatch(output, input_)
+        or fnmatch.fnmatch(input_, output)
+    )
+
+
+def build_graph(all_stages: List[Stage]) -> Dict[str, Set[str]]:
+    """Map each stage to the stages it must wait for."""
+    deps: Dict[str, Set[str]] = {s.name: set() for s in all_stages}
+    for consumer in all_stages:
+        for producer in all_stages:
+            if producer is consumer:
+                continue
+            if any(
+                pattern_overlap(o, i) for o in producer.outputs for i in consumer.inputs
+            ):
+                deps[consumer.name].add(producer.name)
+    check_acyclic(deps)
+    return deps
+
+
+def check_acyclic(deps: Dict[str, Set[str]]) -> None:
+    visiting: Set[str] = set()
+    done: Set[str] = set()
+
+    def visit(name: str, path: List[str]) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise SystemExit(f"Stage cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in sorted(deps[name]):
+            visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in deps:
+        visit(name, [])
+
+
+def with_dependencies(selected: List[str], deps: Dict[str, Set[str]]) -> Set[str]:
+    wanted: Set[str] = set()
+    pending = list(selected)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(deps[name])
+    return wanted
+
+
+# ---------------- FINGERPRINTS ---------------- #
+
+
+def expand(patterns: List[str]) -> List[Path]:
+    files: Set[Path] = set()
+    for pattern in patterns:
+        if pattern.endswith("**"):
+            # Before Python 3.13 a trailing "**" matches directories only
+            pattern += "/*"
+        if any(c in pattern for c in "*?["):
+            files.update(p for p in ROOT.glob(pattern) if p.is_file())
+        elif (ROOT / pattern).is_file():
+            files.add(ROOT / pattern)
+    return sorted(files)
+
+
+def fingerprint(stage: Stage, patterns: List[str]) -> str:
+    """Hash the command and the path, size and mtime of every matched file.
+
+    Stat data is enough to decide whether a stage needs to run at all; the
+    stages themselves hash content to decide which files to redo.
+    """
+    digest = hashlib.sha256(json.dumps(stage.command[1:]).encode())
+    for path in expand(patterns):
+        st = path.stat()
+        digest.update(f"{path.relative_to(ROOT)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+IMPORT_RE = re.compile(r"^(?:from|import)\s+(\w+)", re.M)
+
+
+def script_modules(script: Path) -> List[str]:
+    """The script plus the shared modules it imports from scripts/, e.g. reporting.py."""
+    found = [script]
+    for name in IMPORT_RE.findall(script.read_text(encoding="utf-8")):
+        module = SCRIPTS / f"{name}.py"
+        if module.is_file() and module not in found:
+            found.append(module)
+    return [p.relative_to(ROOT).as_posix() for p in found]
+
+
+def input_fingerprint(stage: Stage) -> str:
+    # The stage's own script and the shared modules it imports are implicit inputs
+    return fingerprint(stage, stage.inputs + script_modules(Path(stage.command[1])))
+
+
+def load_state(path: Path) -> Dict[str, Dict[str, str]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+        return {}
+    return data.get("stages", {})
+
+
+def save_state(path: Path, state: Dict[str, Dict[str, str]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"version": STATE_VERSION, "stages": state}, indent=2, sort_keys=True),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+# ---------------- RUNNER ---------------- #
+
+
+class StageResult(NamedTuple):
+    name: str
+    # "ran", "skipped" (inputs unchanged), "warned" (an advisory stage found
+    # issues), "failed" or "blocked" (a dependency failed)
+    status: str
+    seconds: float = 0.0
+    output: str = ""
+    returncode: int = 0
+
+
+def run_stage(stage: Stage) -> StageResult:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        stage.command,
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "COLUMNS": str(console.width)},
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode == 0:
+        status = "ran"
+    else:
+        status = "warned" if stage.advisory else "failed"
+    return StageResult(stage.name, status, elapsed, proc.stdout + proc.stderr, proc.returncode)
+
+
+def run_pipeline(
+    selected: List[Stage],
+    deps: Dict[str, Set[str]],
+    state: Dict[str, Dict[str, str]],
+    jobs: int,
+    force: bool,
+    verbose: bool,
+) -> Dict[str, StageResult]:
+    """Run stages as soon as their dependencies finish, up to ``jobs`` at once.
+
+    A stage is skipped when neither its inputs nor its outputs changed since
+    it last succeeded and none of its dependencies ran in this pipeline.
+    """
+    by_name = {s.name: s for s in selected}
+    waiting = {name: deps[name] & by_name.keys() for name in by_name}
+    results: Dict[str, StageResult] = {}
+    running: Dict[Future, Tuple[Stage, str]] = {}
+
+    def finish(result: StageResult) -> None:
+        results[result.name] = result
+        label = STATUS_LABELS[result.status]
+        ran = result.status in ("ran", "warned", "failed")
+        timing = f" [dim]{result.seconds:.1f}s[/dim]" if ran else ""
+        console.print(f"{label} {result.name}{timing}")
+        if result.output and (verbose or result.status in ("warned", "failed")):
+            console.print(result.output.rstrip(), markup=False, highlight=False)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while waiting or running:
+            for name in sorted(waiting):
+                if waiting[name] - results.keys():
+                    continue
+                del waiting[name]
+                stage = by_name[name]
+                upstream = [results[d] for d in deps[name] if d in results]
+                if any(r.status in ("failed", "blocked") for r in upstream):
+                    finish(StageResult(name, "blocked"))
+                    continue
+                inputs = input_fingerprint(stage)
+                prior = state.get(name, {})
+                if (
+                    not force
+                    and not any(r.status in ("ran", "warned") for r in upstream)
+                    and prior.get("inputs") == inputs
+                    and prior.get("outputs") == fingerprint(stage, stage.outputs)
+                ):
+                    finish(StageResult(name, "skipped"))
+                    continue
+                console.print(f"[blue]▶[/blue] {name} [dim]{stage.description}[/dim]")
+                running[pool.submit(run_stage, stage)] = (stage, inputs)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, inputs = running.pop(future)
+                result = future.result()
+                if result.status == "ran":
+                    state[stage.name] = {
+                        "inputs": inputs,
+                        "outputs": fingerprint(stage, stage.outputs),
+                    }
+                else:
+                    state.pop(stage.name, None)
+                finish(result)
+    return results
+
+
+STATUS_LABELS = {
+    "ran": "[green]✓[/green]",
+    "skipped": "[dim]↷[/dim]",
+    "warned": "[yellow]![/yellow]",
+    "failed": "[red]✗[/red]",
+    "blocked": "[yellow]⊘[/yellow]",
+}
+
+
+def parse_args(names: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the pre-build asset pipeline, in parallel where stages allow."
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        metavar="STAGE",
+        help=f"stages to run, plus what they depend on (default: all; {', '.join(names)})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="stages to run at once (0 = all that are ready, default: 0)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="run stages even if their inputs are unchanged"
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="show the stages and their dependencies"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="print each stage's output"
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=STATE_FILE,
+        help=f"stage fingerprint file (default: {STATE_FILE})",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    all_stages = stages()
+    names = [s.name for s in all_stages]
+    args = parse_args(names)
+    deps = build_graph(all_stages)
+
+    unknown = [s for s in args.stages if s not in names]
+    if unknown:
+        console.print(f"[red]Unknown stages:[/red] {', '.join(unknown)}")
+        sys.exit(1)
+
+    if args.list:
+        table = Table(box=box.ROUNDED, border_style="green")
+        table.add_column("Stage", style="cyan")
+        table.add_column("After", style="magenta")
+        table.add_column("Description")
+        for stage in all_stages:
+            table.add_row(stage.name, ", ".join(sorted(deps[stage.name])) or "-", stage.description)
+        console.print(table)
+        return
+
+    wanted = with_dependencies(args.stages or names, deps)
+    selected = [s for s in all_stages if s.name in wanted]
+    jobs = args.jobs if args.jobs > 0 else len(selected)
+
+    console.print(
+        Panel.fit("[bold blue]Asset Pipeline[/bold blue]", box=box.DOUBLE, border_style="blue")
+    )
+    state = load_state(args.state)
+    start = time.perf_counter()
+    results = run_pipeline(selected, deps, state, jobs, args.force, args.verbose)
+    wall = time.perf_counter() - start
+    save_state(args.state, state)
+
+    counts = {s: sum(r.status == s for r in results.values()) for s in STATUS_LABELS}
+    serial = sum(r.seconds for r in results.values())
+    failed = counts["failed"] + counts["blocked"]
+    summary = Panel(
+        f"[bold {'red' if failed else 'green'}]Pipeline "
+        f"{'Failed' if failed else 'Completed'}[/bold {'red' if failed else 'green'}]\n\n"
+        f"[cyan]Ran:[/cyan] [bold green]{counts['ran']}[/bold green] "
+        f"• [cyan]Skipped:[/cyan] [bold]{counts['skipped']}[/bold] "
+        f"• [cyan]Warned:[/cyan] [bold yellow]{counts['warned']}[/bold yellow] "
+        f"• [cyan]Failed:[/cyan] [bold red]{counts['failed']}[/bold red] "
+        f"• [cyan]Blocked:[/cyan] [bold yellow]{counts['blocked']}[/bold yellow]\n"
+        f"[cyan]Wall time:[/cyan] [bold]{wall:.1f}s[/bold] "
+        f"• [cyan]Stage time:[/cyan] [bold]{serial:.1f}s[/bold]",
+        title="[bold blue]Summary[/bold blue]",
+        box=box.ROUNDED,
+        border_style="red" if failed else "green",
+    )
+    console.print()
+    console.print(summary)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
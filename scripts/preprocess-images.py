@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import subprocess, sys
+import argparse, base64, hashlib, io, json, os, subprocess, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from itertools import chain
-from typing import Dict, List, Union
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
 try:
     import toml
@@ -20,17 +21,36 @@ try:
 except ImportError as e:
     sys.exit(f"Missing dependency: {e}")
 
+from reporting import FORMATS, Reporter
+
+try:
+    from PIL import Image, ImageFilter, features
+except ImportError:
+    Image = None
+
 console = Console()
 
 
-def cfg() -> Dict[str, Union[Path, int, List[str]]]:
+def cfg() -> Dict[str, Union[Path, int, str, List[str], List[int]]]:
     root = Path(__file__).resolve().parent.parent
     c = toml.load(root / "config.toml")["preprocess-images"]
+    out = (root / c["processed_dir"]).resolve()
+    static = (root / "static").resolve()
     return {
         "raw": (root / c["raw_dir"]).resolve(),
-        "out": (root / c["processed_dir"]).resolve(),
+        "out": out,
         "webp_quality": c.get("webp_quality", 80),
         "extensions": c.get("extensions", ["jpg", "jpeg", "png"]),
+        "jobs": c.get("jobs", 0),
+        "encoder": c.get("encoder", "auto"),
+        "widths": sorted(c.get("widths", [])),
+        "data_file": (root / c.get("data_file", "data/images.json")).resolve(),
+        # Longest side of the inline blurred preview; 0 leaves previews out
+        "placeholder_size": c.get("placeholder_size", 16),
+        # URL the processed directory is served under by Hugo
+        "url_base": "/" + out.relative_to(static).as_posix()
+        if out.is_relative_to(static)
+        else "/" + c["processed_dir"].strip("/"),
     }
 
 
@@ -38,13 +58,16 @@ def ensure(p: Path) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
 
 
-def convert_to_webp(src: Path, dst: Path, quality: int) -> str:
+def convert_to_webp(
+    src: Path, dst: Path, quality: int, width: Optional[int] = None
+) -> str:
     # Change extension to .webp
     webp_dst = dst.with_suffix(".webp")
     ensure(webp_dst)
 
+    resize = ["-resize", str(width), "0"] if width else []
     result = subprocess.run(
-        ["cwebp", "-q", str(quality), str(src), "-o", str(webp_dst)],
+        ["cwebp", "-q", str(quality), *resize, str(src), "-o", str(webp_dst)],
         check=True,
         capture_output=True,
         text=True,
@@ -52,19 +75,398 @@ def convert_to_webp(src: Path, dst: Path, quality: int) -> str:
     return result.stderr.strip()
 
 
-def parse_webp_stats(output: str) -> tuple[str, str, str]:
-    """Parse WebP compression statistics"""
-    lines = output.split("\n")
-    for line in lines:
-        if "bytes" in line and "->" in line:
-            # Format: "Input: 123456 bytes, Output: 67890 bytes (45.0% saved)"
-            if "saved" in line and "%" in line:
-                parts = line.split()
-                input_size = parts[1]
-                output_size = parts[4]
-                savings = line.split("(")[1].split("%")[0] + "%"
-                return input_size, output_size, savings
-    return "N/A", "N/A", "N/A"
+def webp_dimensions(path: Path) -> Tuple[int, int]:
+    """Read width and height from a WebP file's RIFF header."""
+    with path.open("rb") as f:
+        head = f.read(30)
+    if len(head) < 30 or head[:4] != b"RIFF" or head[8:12] != b"WEBP":
+        raise ValueError(f"Not a WebP file: {path}")
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        width = 1 + int.from_bytes(head[24:27], "little")
+        height = 1 + int.from_bytes(head[27:30], "little")
+    elif chunk == b"VP8 ":
+        width = int.from_bytes(head[26:28], "little") & 0x3FFF
+        height = int.from_bytes(head[28:30], "little") & 0x3FFF
+    elif chunk == b"VP8L":
+        bits = int.from_bytes(head[21:25], "little")
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+    else:
+        raise ValueError(f"Unknown WebP chunk {chunk!r} in {path}")
+    return width, height
+
+
+def variant_path(webp: Path, width: int) -> Path:
+    return webp.with_name(f"{webp.stem}-{width}w.webp")
+
+
+# ---------------- ENCODERS ---------------- #
+
+
+class Encoded(NamedTuple):
+    path: Path
+    width: int
+    height: int
+    bytes: int
+
+
+# An encoder writes ``webp`` plus one variant per width narrower than the
+# source, and returns the full-size output first followed by the variants.
+Encoder = Callable[[Path, Path, int, List[int]], List[Encoded]]
+
+
+def encode_cwebp(src: Path, webp: Path, quality: int, widths: List[int]) -> List[Encoded]:
+    """Encode with one cwebp process per output.
+
+    Each process decodes the source again, so N widths cost N + 1 decodes;
+    only the Pillow backend decodes once. cwebp is the fallback for machines
+    without Pillow's WebP support, where there is nothing to decode with
+    in-process.
+    """
+
+    def run(dst: Path, width: Optional[int] = None) -> Encoded:
+        convert_to_webp(src, dst, quality, width)
+        w, h = webp_dimensions(dst)
+        return Encoded(dst, w, h, dst.stat().st_size)
+
+    full = run(webp)
+    return [full] + [
+        run(variant_path(webp, width), width)
+        for width in widths
+        if width < full.width
+    ]
+
+
+def encode_pillow(
+    src: Path, webp: Path, quality: int, widths: List[int]
+) -> List[Encoded]:
+    """Encode in-process with Pillow, decoding the source once for every output."""
+    with Image.open(src) as im:
+        im.load()
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+
+    def save(img: "Image.Image", dst: Path) -> Encoded:
+        ensure(dst)
+        img.save(dst, "WEBP", quality=quality, method=4)
+        return Encoded(dst, img.width, img.height, dst.stat().st_size)
+
+    outputs = [save(im, webp)]
+    for width in widths:
+        if width < im.width:
+            height = max(1, round(im.height * width / im.width))
+            resized = im.resize((width, height), Image.Resampling.LANCZOS)
+            outputs.append(save(resized, variant_path(webp, width)))
+    return outputs
+
+
+ENCODERS: Dict[str, Encoder] = {
+    "pillow": encode_pillow,
+    "cwebp": encode_cwebp,
+}
+
+
+def pillow_available() -> bool:
+    return Image is not None and features.check("webp")
+
+
+def select_encoder(name: str) -> str:
+    """Resolve ``auto`` to Pillow when it can write WebP, else cwebp."""
+    if name == "auto":
+        return "pillow" if pillow_available() else "cwebp"
+    if name not in ENCODERS:
+        sys.exit(f"Unknown encoder: {name} (expected auto, {', '.join(ENCODERS)})")
+    if name == "pillow" and not pillow_available():
+        sys.exit("Encoder 'pillow' requested but Pillow with WebP support is missing")
+    return name
+
+
+# ---------------- PLACEHOLDERS ---------------- #
+
+
+def placeholder_of(src: Path, size: int) -> Dict[str, Any]:
+    """Dominant color and a tiny blurred WebP data URI for ``src``, via Pillow."""
+    with Image.open(src) as im:
+        # JPEG decodes straight to a fraction of its size; other formats ignore this
+        im.draft("RGB", (max(size, 64) * 2, max(size, 64) * 2))
+        alpha = "A" in im.getbands() or "transparency" in im.info
+        im = im.convert("RGBA" if alpha else "RGB")
+    thumb = im.copy()
+    thumb.thumbnail((64, 64), Image.Resampling.BILINEAR)
+    # The most common of a few median-cut colors, rather than a muddy average
+    palette = thumb.convert("RGB").quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    _, index = max(palette.getcolors())
+    r, g, b = palette.getpalette()[index * 3 : index * 3 + 3]
+
+    tiny = im.copy()
+    tiny.thumbnail((size, size), Image.Resampling.LANCZOS)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    buf = io.BytesIO()
+    tiny.save(buf, "WEBP", quality=30, method=6)
+    return {
+        "color": f"#{r:02x}{g:02x}{b:02x}",
+        "alpha": alpha,
+        "placeholder": "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode(),
+        "placeholder_size": size,
+    }
+
+
+# ---------------- MANIFEST ---------------- #
+
+MANIFEST_NAME = ".manifest.json"
+
+ManifestEntry = Dict[str, Any]
+
+
+def load_manifest(path: Path) -> Dict[str, ManifestEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    images = data.get("images") if isinstance(data, dict) else None
+    return images if isinstance(images, dict) else {}
+
+
+def save_manifest(path: Path, images: Dict[str, ManifestEntry]) -> None:
+    ensure(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".manifest.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"images": images}, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def output_current(
+    entry: ManifestEntry, webp: Path, quality: int, widths: List[int]
+) -> bool:
+    """Whether ``webp`` and its variants still hold what ``entry`` recorded."""
+    if entry.get("quality") != quality or entry.get("widths") != widths:
+        return False
+    if "width" not in entry:
+        return False
+    expected = [(webp, entry.get("output_size"))] + [
+        (webp.with_name(v["name"]), v["bytes"]) for v in entry.get("variants", [])
+    ]
+    try:
+        return all(path.stat().st_size == size for path, size in expected)
+    except OSError:
+        return False
+
+
+def prune_orphans(
+    images: Dict[str, ManifestEntry], seen: Dict[str, ManifestEntry], out_path: Path
+) -> int:
+    """Delete outputs whose source is gone; returns how many were removed.
+
+    foo.jpg and foo.png both write foo.webp, so an output (or variant) still
+    named by a surviving entry is left in place.
+    """
+    live = set()
+    for entry in seen.values():
+        output = entry.get("output")
+        if output:
+            webp = out_path / output
+            live.add(webp)
+            live.update(webp.with_name(v["name"]) for v in entry.get("variants", []))
+
+    pruned = 0
+    for key in [k for k in images if k not in seen]:
+        entry = images.pop(key)
+        output = entry.get("output")
+        if output:
+            webp = out_path / output
+            for path in [webp] + [webp.with_name(v["name"]) for v in entry.get("variants", [])]:
+                if path not in live:
+                    path.unlink(missing_ok=True)
+            pruned += 1
+    return pruned
+
+
+def image_data(
+    images: Dict[str, ManifestEntry], url_base: str
+) -> Dict[str, Dict[str, Any]]:
+    """Map each output URL to its dimensions, size, preview and responsive variants."""
+    data: Dict[str, Dict[str, Any]] = {}
+    for entry in images.values():
+        if "width" not in entry:
+            continue
+        url = f"{url_base}/{entry['output']}"
+        folder = url.rsplit("/", 1)[0]
+        data[url] = {
+            "width": entry["width"],
+            "height": entry["height"],
+            "bytes": entry["output_size"],
+            "variants": [
+                {
+                    "src": f"{folder}/{v['name']}",
+                    "width": v["width"],
+                    "height": v["height"],
+                    "bytes": v["bytes"],
+                }
+                for v in entry.get("variants", [])
+            ],
+        }
+        if "placeholder" in entry:
+            data[url].update(
+                color=entry["color"], alpha=entry["alpha"], placeholder=entry["placeholder"]
+            )
+    return data
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write ``text`` only when it differs, so Hugo does not see a touched file."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    ensure(path)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+# ---------------- CONVERSION ---------------- #
+
+
+class ImageResult(NamedTuple):
+    src: Path
+    size_before: Optional[int]
+    size_after: Optional[int]
+    savings: str
+    error: Optional[Exception]
+    cached: bool = False
+    entry: Optional[ManifestEntry] = None
+    seconds: float = 0.0
+
+
+def output_collisions(imgs: List[Path], raw_path: Path) -> Dict[Path, List[Path]]:
+    """Map each source to the other sources that would write the same outputs.
+
+    foo.jpg and foo.png both become foo.webp and foo-<w>w.webp; encoding both
+    would race on those files and leave their manifest entries fighting.
+    """
+    by_output: Dict[Path, List[Path]] = {}
+    for src in imgs:
+        by_output.setdefault(src.relative_to(raw_path).with_suffix(".webp"), []).append(src)
+    return {
+        src: [other for other in group if other != src]
+        for group in by_output.values()
+        if len(group) > 1
+        for src in group
+    }
+
+
+def savings_of(size_before: int, size_after: int) -> str:
+    return f"{((size_before - size_after) / size_before) * 100:.1f}%"
+
+
+def process_image(
+    src: Path,
+    dst: Path,
+    quality: int,
+    widths: List[int],
+    prior: Optional[ManifestEntry] = None,
+    encoder: str = "cwebp",
+    placeholder_size: int = 0,
+) -> ImageResult:
+    """Convert one image and its variants unless ``prior`` shows they are current.
+
+    The preview is computed from the source alongside the encode and kept in
+    the manifest, so cached images only gain one when it is missing or the
+    configured size changed. Any failure is captured so it can be reported
+    per file.
+    """
+    size_before = None
+    webp = dst.with_suffix(".webp")
+    start = time.perf_counter()
+    try:
+        st = src.stat()
+        size_before = st.st_size
+        # Same mtime and size means same content; otherwise fall back to the hash.
+        if (
+            prior
+            and prior.get("mtime_ns") == st.st_mtime_ns
+            and prior.get("size") == st.st_size
+        ):
+            sha = prior["sha256"]
+        else:
+            sha = file_sha256(src)
+
+        entry: ManifestEntry = {
+            "sha256": sha,
+            "size": size_before,
+            "mtime_ns": st.st_mtime_ns,
+            "quality": quality,
+            "widths": widths,
+        }
+        if (
+            prior
+            and prior.get("sha256") == sha
+            and output_current(prior, webp, quality, widths)
+        ):
+            for key in ("output_size", "width", "height", "variants"):
+                entry[key] = prior[key]
+            if placeholder_size:
+                if prior.get("placeholder_size") == placeholder_size:
+                    for key in ("color", "alpha", "placeholder", "placeholder_size"):
+                        entry[key] = prior[key]
+                else:
+                    entry.update(placeholder_of(src, placeholder_size))
+            size_after = prior["output_size"]
+            return ImageResult(
+                src,
+                size_before,
+                size_after,
+                savings_of(size_before, size_after),
+                None,
+                cached=True,
+                entry=entry,
+                seconds=time.perf_counter() - start,
+            )
+
+        full, *encoded = ENCODERS[encoder](src, webp, quality, widths)
+        size_after = full.bytes
+        variants = [
+            {"name": v.path.name, "width": v.width, "height": v.height, "bytes": v.bytes}
+            for v in encoded
+        ]
+        entry.update(
+            encoder=encoder,
+            output_size=size_after,
+            width=full.width,
+            height=full.height,
+            variants=variants,
+        )
+        if placeholder_size:
+            entry.update(placeholder_of(src, placeholder_size))
+
+        # Drop variants for widths that are no longer produced
+        current = {v["name"] for v in variants}
+        for old in (prior or {}).get("variants", []):
+            if old["name"] not in current:
+                webp.with_name(old["name"]).unlink(missing_ok=True)
+
+        return ImageResult(
+            src,
+            size_before,
+            size_after,
+            savings_of(size_before, size_after),
+            None,
+            entry=entry,
+            seconds=time.perf_counter() - start,
+        )
+    except Exception as e:
+        return ImageResult(
+            src, size_before, None, "N/A", e, seconds=time.perf_counter() - start
+        )
 
 
 def format_size(size_bytes: int) -> str:
@@ -76,40 +478,111 @@ def format_size(size_bytes: int) -> str:
         return f"{size_bytes / (1024 * 1024):.1f}MB"
 
 
+def report_image(reporter: Reporter, result: ImageResult, raw_path: Path) -> None:
+    entry = result.entry or {}
+    reporter.record(
+        "image",
+        path=result.src.relative_to(raw_path).as_posix(),
+        format=result.src.suffix[1:].lower(),
+        cached=result.cached,
+        bytes_before=result.size_before,
+        bytes_after=result.size_after,
+        width=entry.get("width"),
+        height=entry.get("height"),
+        variants=len(entry.get("variants", [])),
+        color=entry.get("color"),
+        seconds=round(result.seconds, 4),
+        error=None if result.error is None else str(result.error),
+    )
+
+
+def parse_args(default_jobs: int, default_encoder: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert raw images to WebP.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=default_jobs,
+        help="concurrent encodes (0 = one per CPU, default from config.toml)",
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=["auto", *ENCODERS],
+        default=default_encoder,
+        help="WebP encoder backend (auto prefers in-process Pillow, which decodes each "
+        "source once; cwebp decodes it again for every width)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-encode every image, ignoring the manifest",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="text tables, or one JSON record per image (json document or ndjson lines)",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
     c = cfg()
     raw_path = Path(str(c["raw"]))
     out_path = Path(str(c["out"]))
     extensions: List[str] = c["extensions"]
     webp_quality = int(c["webp_quality"])
+    widths: List[int] = [int(w) for w in c["widths"]]
+    data_file = Path(str(c["data_file"]))
+    url_base = str(c["url_base"])
+    args = parse_args(int(c["jobs"]), str(c["encoder"]))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    encoder = select_encoder(args.encoder)
+    placeholder_size = int(c["placeholder_size"]) if pillow_available() else 0
 
     # Header
-    console.print(
-        Panel.fit(
-            "[bold blue]Image Compression Tool - WebP Conversion[/bold blue]",
-            box=box.DOUBLE,
-            border_style="blue",
+    reporter = Reporter(args.format, "preprocess-images")
+    if reporter.enabled:
+        # Keep stdout for the records; warnings and errors still reach stderr
+        console.file = sys.stderr
+    else:
+        console.print(
+            Panel.fit(
+                "[bold blue]Image Compression Tool - WebP Conversion[/bold blue]",
+                box=box.DOUBLE,
+                border_style="blue",
+            )
         )
-    )
 
-    console.print(f"[dim]Working directory:[/dim] {Path.cwd()}")
-    console.print(f"[dim]Source directory:[/dim] {raw_path}")
-    console.print(f"[dim]Output directory:[/dim] {out_path}")
-    console.print(f"[dim]WebP Quality:[/dim] {webp_quality}")
-    console.print()
+        console.print(f"[dim]Working directory:[/dim] {Path.cwd()}")
+        console.print(f"[dim]Source directory:[/dim] {raw_path}")
+        console.print(f"[dim]Output directory:[/dim] {out_path}")
+        console.print(f"[dim]WebP Quality:[/dim] {webp_quality}")
+        console.print(
+            f"[dim]Responsive widths:[/dim] {', '.join(map(str, widths)) or 'none'}"
+        )
+        console.print(f"[dim]Encoder:[/dim] {encoder}")
+        console.print(
+            f"[dim]Placeholders:[/dim] "
+            f"{f'{placeholder_size}px' if placeholder_size else 'off (needs Pillow with WebP)'}"
+        )
+        console.print(f"[dim]Workers:[/dim] {jobs}")
+        console.print()
 
     # Find images
     with console.status("[bold green]Scanning for images...", spinner="dots"):
-        imgs: List[Path] = list(
+        imgs: List[Path] = sorted(
             chain.from_iterable(raw_path.rglob(f"*.{ext}") for ext in extensions)
         )
 
     if not imgs:
         console.print("[yellow]No images found to compress[/yellow]")
+        reporter.summary(images=0)
         return
 
-    console.print(f"[green]Found {len(imgs)} images to convert to WebP[/green]")
-    console.print()
+    if not reporter.enabled:
+        console.print(f"[green]Found {len(imgs)} images to convert to WebP[/green]")
+        console.print()
 
     # Create results table
     table = Table(box=box.ROUNDED, border_style="green")
@@ -120,7 +593,17 @@ def main() -> None:
     table.add_column("Savings", style="bold green", justify="center", width=10)
     table.add_column("Status", justify="center", width=8)
 
-    # Process images with progress bar
+    manifest_path = out_path / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+
+    def manifest_key(src: Path) -> str:
+        return src.relative_to(raw_path).as_posix()
+
+    results: Dict[Path, ImageResult] = {}
+    collisions = output_collisions(imgs, raw_path)
+
+    # Process images with progress bar; cwebp runs out of process and Pillow
+    # releases the GIL while coding, so threads keep several encoders busy.
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -128,73 +611,136 @@ def main() -> None:
         TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
         TimeElapsedColumn(),
         console=console,
+        disable=reporter.enabled,
     ) as progress:
         task = progress.add_task("[green]Converting to WebP...", total=len(imgs))
 
-        total_before = 0
-        total_after = 0
-
-        for src in imgs:
-            dst: Path = out_path / src.relative_to(raw_path)
-            original_format = src.suffix.upper()[1:]  # Remove the dot and uppercase
-
+        def collect(result: ImageResult) -> None:
+            results[result.src] = result
+            report_image(reporter, result, raw_path)
+            if result.error is not None:
+                console.print(
+                    f"[red]Error processing {result.src.name}: {result.error}[/red]"
+                )
+            verb = "Cached" if result.cached else "Converted"
             progress.update(
-                task, description=f"[green]Converting [cyan]{src.name}[/cyan]..."
+                task, description=f"[green]{verb} [cyan]{result.src.name}[/cyan]"
             )
+            progress.advance(task)
 
-            try:
-                size_before = src.stat().st_size
-                total_before += size_before
-
-                output = convert_to_webp(src, dst, webp_quality)
-
-                # Get the actual WebP file that was created
-                webp_file = dst.with_suffix(".webp")
-                size_after = webp_file.stat().st_size
-                total_after += size_after
-
-                before_str, after_str, savings = parse_webp_stats(output)
-
-                if savings == "N/A":
-                    savings_pct = ((size_before - size_after) / size_before) * 100
-                    savings = f"{savings_pct:.1f}%"
-
-                table.add_row(
-                    f"[cyan]{src.relative_to(raw_path)}[/cyan]",
-                    f"[magenta]{original_format}→WEBP[/magenta]",
-                    format_size(size_before),
-                    format_size(size_after),
-                    f"[bold green]{savings}[/bold green]",
-                    "[green]OK[/green]",
-                )
-
-            except Exception as e:
-                table.add_row(
-                    f"[cyan]{src.relative_to(raw_path)}[/cyan]",
-                    f"[magenta]{original_format}→WEBP[/magenta]",
-                    "N/A",
+        # Neither side of a collision is encoded; their previous outputs stay
+        for src, others in collisions.items():
+            names = ", ".join(o.relative_to(raw_path).as_posix() for o in others)
+            collect(
+                ImageResult(
+                    src,
+                    src.stat().st_size,
+                    None,
                     "N/A",
-                    "N/A",
-                    "[red]FAIL[/red]",
+                    ValueError(f"same output name as {names}; rename one of them"),
                 )
-                console.print(f"[red]Error processing {src.name}: {e}[/red]")
+            )
 
-            progress.advance(task)
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(
+                    process_image,
+                    src,
+                    out_path / src.relative_to(raw_path),
+                    webp_quality,
+                    widths,
+                    None if args.force else manifest.get(manifest_key(src)),
+                    encoder,
+                    placeholder_size,
+                )
+                for src in imgs
+                if src not in collisions
+            ]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    total_before = 0
+    total_after = 0
+    cached = 0
+    failed = 0
+    seen: Dict[str, ManifestEntry] = {}
+
+    for src in imgs:
+        result = results[src]
+        original_format = src.suffix.upper()[1:]  # Remove the dot and uppercase
+        total_before += result.size_before or 0
+
+        if result.error is None:
+            total_after += result.size_after or 0
+            cached += result.cached
+            if result.entry is not None:
+                key = manifest_key(src)
+                seen[key] = {
+                    **result.entry,
+                    "output": Path(key).with_suffix(".webp").as_posix(),
+                }
+            table.add_row(
+                f"[cyan]{src.relative_to(raw_path)}[/cyan]",
+                f"[magenta]{original_format}→WEBP[/magenta]",
+                format_size(result.size_before or 0),
+                format_size(result.size_after or 0),
+                f"[bold green]{result.savings}[/bold green]",
+                "[dim]CACHED[/dim]" if result.cached else "[green]OK[/green]",
+            )
+        else:
+            failed += 1
+            table.add_row(
+                f"[cyan]{src.relative_to(raw_path)}[/cyan]",
+                f"[magenta]{original_format}→WEBP[/magenta]",
+                "N/A",
+                "N/A",
+                "N/A",
+                "[red]FAIL[/red]",
+            )
 
-    console.print()
-    console.print(table)
+    # Failed sources keep their old entry so a later run can retry them.
+    for src in imgs:
+        key = manifest_key(src)
+        if key not in seen and key in manifest:
+            seen[key] = manifest[key]
+    pruned = prune_orphans(manifest, seen, out_path)
+    save_manifest(manifest_path, seen)
+    write_if_changed(
+        data_file, json.dumps(image_data(seen, url_base), indent=2, sort_keys=True) + "\n"
+    )
 
     # Summary
     total_savings = total_before - total_after
     savings_pct = (total_savings / total_before) * 100 if total_before > 0 else 0
 
+    if reporter.enabled:
+        reporter.summary(
+            images=len(imgs),
+            converted=len(imgs) - cached - failed,
+            cached=cached,
+            failed=failed,
+            pruned=pruned,
+            bytes_before=total_before,
+            bytes_after=total_after,
+            output_dir=out_path,
+            data_file=data_file,
+        )
+        return
+
+    console.print()
+    console.print(table)
+
     summary = Panel(
         f"[bold green]WebP Conversion Complete[/bold green]\n\n"
-        f"[cyan]Images processed:[/cyan] [bold]{len(imgs)}[/bold]\n"
+        f"[cyan]Images processed:[/cyan] [bold]{len(imgs)}[/bold] "
+        f"([bold]{len(imgs) - cached - failed}[/bold] converted, "
+        f"[bold]{cached}[/bold] cached, [bold]{failed}[/bold] failed)\n"
+        f"[cyan]Orphaned outputs pruned:[/cyan] [bold]{pruned}[/bold]\n"
         f"[cyan]Total size before:[/cyan] [bold]{format_size(total_before)}[/bold]\n"
         f"[cyan]Total size after:[/cyan] [bold]{format_size(total_after)}[/bold]\n"
         f"[cyan]Total savings:[/cyan] [bold green]{format_size(total_savings)} ({savings_pct:.1f}%)[/bold green]\n"
-        f"[cyan]Output directory:[/cyan] [dim]{out_path}[/dim]",
+        f"[cyan]Output directory:[/cyan] [dim]{out_path}[/dim]\n"
+        f"[cyan]Image data:[/cyan] [dim]{data_file}[/dim]",
         title="[bold blue]Summary[/bold blue]",
         box=box.ROUNDED,
         border_style="green",
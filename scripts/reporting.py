@@ -0,0 +1,68 @@
+"""Machine-readable output shared by the scripts' ``--format`` option."""
+
+import atexit
+import json
+import sys
+import time
+from typing import Any, TextIO
+
+FORMATS = ("text", "json", "ndjson")
+
+
+class Reporter:
+    """Stream result records as JSON Lines or as one JSON document.
+
+    ``ndjson`` writes each record on its own line as soon as it is known, and
+    ends with a ``summary`` line. ``json`` streams the same records into a
+    single ``{"tool", "records": [...], "summary"}`` document. With ``text``
+    every call is a no-op and the script renders its rich output instead.
+
+    A run that exits before calling :meth:`summary` (a usage error, a missing
+    site) still ends with a summary marked ``"aborted": true``, so the output
+    always parses.
+    """
+
+    def __init__(self, fmt: str, tool: str, stream: TextIO = sys.stdout) -> None:
+        self.fmt = fmt
+        self.tool = tool
+        self.stream = stream
+        self.count = 0
+        self.start = time.perf_counter()
+        self.done = False
+        if fmt == "json":
+            stream.write(f'{{"tool":{json.dumps(tool)},"records":[')
+        if self.enabled:
+            atexit.register(self._abort)
+
+    @property
+    def enabled(self) -> bool:
+        return self.fmt != "text"
+
+    def _dump(self, data: Any) -> str:
+        return json.dumps(data, default=str, separators=(",", ":"))
+
+    def record(self, kind: str, /, **fields: Any) -> None:
+        if not self.enabled:
+            return
+        if self.fmt == "ndjson":
+            self.stream.write(self._dump({"tool": self.tool, "type": kind, **fields}) + "\n")
+        else:
+            if self.count:
+                self.stream.write(",")
+            self.stream.write(self._dump({"type": kind, **fields}))
+        self.count += 1
+        self.stream.flush()
+
+    def summary(self, **fields: Any) -> None:
+        if not self.enabled or self.done:
+            return
+        self.done = True
+        data = {**fields, "records": self.count, "seconds": round(time.perf_counter() - self.start, 4)}
+        if self.fmt == "ndjson":
+            self.stream.write(self._dump({"tool": self.tool, "type": "summary", **data}) + "\n")
+        else:
+            self.stream.write(f'],"summary":{self._dump(data)}}}\n')
+        self.stream.flush()
+
+    def _abort(self) -> None:
+        self.summary(aborted=True)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+import argparse, hashlib, mimetypes, os, posixpath, re, sys, time
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+try:
+    import toml
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.markup import escape
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Precompressed siblings written by compress-public.py, in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# Hugo's fingerprint (bundle.<sha256>.css) and the scripts' <stem>.<hash>.<ext>
+DEFAULT_IMMUTABLE = [r"\.[0-9a-f]{10,64}\.[A-Za-z0-9]+$"]
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Everything else is revalidated against its ETag on each use, as a CDN would
+REVALIDATE_CACHE = "no-cache"
+
+
+def cfg() -> Dict[str, Any]:
+    c = toml.load(ROOT / "config.toml").get("serve", {})
+    return {
+        "public": (ROOT / c.get("public_dir", "public")).resolve(),
+        "bind": c.get("bind", "127.0.0.1"),
+        "port": c.get("port", 8080),
+        "immutable": [re.compile(p) for p in c.get("immutable", DEFAULT_IMMUTABLE)],
+    }
+
+
+# ---------------- ETAGS ---------------- #
+
+
+class ETagCache:
+    """Strong ETags from file contents, rehashed only when (mtime, size) change."""
+
+    def __init__(self) -> None:
+        self.tags: Dict[str, Tuple[int, int, str]] = {}
+
+    def get(self, path: str, st: os.stat_result) -> str:
+        hit = self.tags.get(path)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return hit[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        tag = f'"{digest.hexdigest()[:32]}"'
+        self.tags[path] = (st.st_mtime_ns, st.st_size, tag)
+        return tag
+
+
+# ---------------- HANDLER ---------------- #
+
+
+def accepted(header: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}."""
+    codings: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            codings[name.strip().lower()] = q
+    return codings
+
+
+class Handler(SimpleHTTPRequestHandler):
+    """Serve public/ the way the production host does: precompressed, with validators."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "SiteServe"
+
+    # Set on the class by main()
+    public: str = ""
+    immutable: List["re.Pattern[str]"] = []
+    compress = True
+    etags = ETagCache()
+
+    def handle_one_request(self) -> None:
+        self.started = time.perf_counter()
+        self.status: Optional[int] = None
+        self.sent = 0
+        self.encoding = "identity"
+        super().handle_one_request()
+        if self.status is not None:
+            self.log_timing()
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self.status = code
+        super().send_response(code, message)
+
+    def log_request(self, code: Any = "-", size: Any = "-") -> None:
+        pass  # logged with timings once the body is out
+
+    def log_error(self, format: str, *args: Any) -> None:
+        pass  # the status line in log_timing covers it
+
+    def log_timing(self) -> None:
+        ms = (time.perf_counter() - self.started) * 1000
+        status = self.status or 0
+        colour = "green" if status < 300 else "yellow" if status < 400 else "red"
+        console.print(
+            f"[{colour}]{status}[/{colour}] {escape(self.command or '-')} "
+            f"{escape(self.path)} [dim]{self.encoding}[/dim] "
+            f"[bold]{self.sent}[/bold]B [cyan]{ms:.1f}ms[/cyan]",
+            highlight=False,
+        )
+
+    def resolve(self) -> Tuple[Optional[str], bool]:
+        """The file for the request path, and whether it needs a trailing-slash redirect."""
+        path = posixpath.normpath(unquote(urlsplit(self.path).path))
+        full = os.path.join(self.public, *[p for p in path.split("/") if p not in ("", ".", "..")])
+        if os.path.isdir(full):
+            index = os.path.join(full, "index.html")
+            if not os.path.isfile(index):
+                return None, False
+            return index, not urlsplit(self.path).path.endswith("/")
+        return (full if os.path.isfile(full) else None), False
+
+    def choose(self, path: str) -> Tuple[str, str]:
+        """The representation to send: a precompressed sibling when the client takes it."""
+        if self.compress:
+            codings = accepted(self.headers.get("Accept-Encoding", ""))
+            for coding, suffix in ENCODINGS:
+                if codings.get(coding, codings.get("*", 0.0)) > 0 and os.path.isfile(path + suffix):
+                    return path + suffix, coding
+        return path, "identity"
+
+    def send_head(self) -> Any:
+        path, redirect = self.resolve()
+        if redirect:
+            parts = urlsplit(self.path)
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header("Location", parts._replace(path=parts.path + "/").geturl())
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        status = HTTPStatus.OK
+        if path is None:
+            # Hugo's 404 page, as the production host would serve it
+            path = os.path.join(self.public, "404.html")
+            status = HTTPStatus.NOT_FOUND
+            if not os.path.isfile(path):
+                self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+                return None
+
+        body, self.encoding = self.choose(path)
+        f = open(body, "rb")
+        try:
+            st = os.fstat(f.fileno())
+            etag = self.etags.get(body, st)
+            name = os.path.basename(path)
+            cache = (
+                IMMUTABLE_CACHE
+                if status == HTTPStatus.OK and any(p.search(name) for p in self.immutable)
+                else REVALIDATE_CACHE
+            )
+            if status == HTTPStatus.OK and etag in {
+                t.strip() for t in self.headers.get("If-None-Match", "").split(",")
+            }:
+                f.close()
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", cache)
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return None
+            self.send_response(status)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(st.st_size))
+            if self.encoding != "identity":
+                self.send_header("Content-Encoding", self.encoding)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache)
+            self.send_header("Last-Modified", self.date_time_string(int(st.st_mtime)))
+            self.end_headers()
+            return f
+        except BaseException:
+            f.close()
+            raise
+
+    def copyfile(self, source: Any, outputfile: Any) -> None:
+        super().copyfile(source, outputfile)
+        self.sent = source.tell()
+
+
+# ---------------- MAIN ---------------- #
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Serve the built site with its precompressed variants and cache headers."
+    )
+    parser.add_argument("--public", type=Path, help="built site (default: config.toml public_dir)")
+    parser.add_argument("--bind", help="address to listen on (default: config.toml bind)")
+    parser.add_argument("-p", "--port", type=int, help="port (default: config.toml port)")
+    parser.add_argument(
+        "--no-compress",
+        action="store_true",
+        help="ignore .br/.gz siblings, to compare against uncompressed transfers",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = cfg()
+    public: Path = (args.public or config["public"]).resolve()
+    bind = args.bind or config["bind"]
+    port = args.port or config["port"]
+
+    if not public.is_dir():
+        console.print(f"[red]No built site at {public}; run hugo first[/red]")
+        sys.exit(1)
+
+    # .woff2, .webmanifest and friends are missing from some platforms' tables
+    mimetypes.add_type("font/woff2", ".woff2")
+    mimetypes.add_type("application/manifest+json", ".webmanifest")
+    mimetypes.add_type("image/webp", ".webp")
+
+    Handler.public = str(public)
+    Handler.immutable = config["immutable"]
+    Handler.compress = not args.no_compress
+    server = ThreadingHTTPServer((bind, port), Handler)
+
+    console.print(
+        Panel.fit("[bold blue]Static Server[/bold blue]", box=box.DOUBLE, border_style="blue")
+    )
+    console.print(f"[dim]Site:[/dim] {public}")
+    console.print(f"[dim]Precompressed variants:[/dim] {'off' if args.no_compress else 'br, gzip'}")
+    console.print(f"[bold]http://{bind}:{port}/[/bold]")
+    console.print()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+import argparse, hashlib, html, json, os, posixpath, re, sys, tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import toml
+    import brotli  # noqa: F401  fontTools needs it to write WOFF2
+    from fontTools import subset
+    from rich.console import Console
+    from rich.progress import (
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        BarColumn,
+        TimeElapsedColumn,
+    )
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+STATIC = ROOT / "static"
+
+# Bump when the subsetter options change, so every font is redone on the next run.
+SUBSET_VERSION = 1
+
+MANIFEST_NAME = ".manifest.json"
+
+# Hugo publishes the concatenated stylesheet under /css/, and the url()s in
+# fonts.css are relative to it.
+CSS_URL = "/css/"
+
+# Characters every subset keeps, whatever the scan finds: printable ASCII and
+# the typographic punctuation Markdown rendering and the templates introduce.
+DEFAULT_ALWAYS = "".join(map(chr, range(0x20, 0x7F))) + "\u00a0–—‘’“”…•·→←×©"
+
+DEFAULT_TEXT_GLOBS = ["content/**/*.md", "layouts/**/*.html", "data/**/*.json"]
+
+FONT_SUFFIXES = {".woff2", ".woff", ".ttf", ".otf"}
+
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+FONT_FACE_RE = re.compile(r"@font-face\s*\{[^}]*\}")
+FAMILY_RE = re.compile(r"font-family\s*:\s*([^;}]+)")
+SRC_RE = re.compile(r"\bsrc\s*:[^;}]*;?")
+URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]+)\1\s*\)""")
+# font-family declarations and the --font-* tokens they are built from
+FAMILY_USE_RE = re.compile(r"(?:font-family|--font-[\w-]+)\s*:\s*([^;{}]+)")
+CONTENT_RE = re.compile(r"""\bcontent\s*:\s*(["'])(.*?)\1""")
+CSS_ESCAPE_RE = re.compile(r"\\([0-9a-fA-F]{1,6})\s?|\\(.)")
+
+
+def cfg() -> Dict[str, Any]:
+    c = toml.load(ROOT / "config.toml").get("font-subset", {})
+    return {
+        "css": (ROOT / c.get("fonts_css", "assets/css/base/fonts.css")).resolve(),
+        "out_css": (ROOT / c.get("output_css", "assets/fonts/subset.css")).resolve(),
+        "out": (ROOT / c.get("output_dir", "static/fonts-subset")).resolve(),
+        "styles": [(ROOT / d).resolve() for d in c.get("styles_dirs", ["assets/css", "layouts"])],
+        "html": (ROOT / c.get("html_dir", "public")).resolve(),
+        "text": c.get("text_globs", DEFAULT_TEXT_GLOBS),
+        "families": c.get("families", []),
+        "always": c.get("always", DEFAULT_ALWAYS),
+    }
+
+
+# ---------------- STYLESHEETS ---------------- #
+
+
+class Face(NamedTuple):
+    family: str
+    # First src url() that is a font file under static/, if any
+    src: Optional[Path]
+
+
+def unquote(name: str) -> str:
+    return name.strip().strip("\"'")
+
+
+def url_to_path(url: str) -> Optional[Path]:
+    if ":" in url.split("/", 1)[0]:
+        return None  # data:, https: and the like
+    path = posixpath.normpath(posixpath.join(CSS_URL, url.split("?")[0].split("#")[0]))
+    file = STATIC / path.lstrip("/")
+    return file if file.suffix.lower() in FONT_SUFFIXES and file.is_file() else None
+
+
+def path_to_url(path: Path) -> str:
+    return posixpath.relpath("/" + path.relative_to(STATIC).as_posix(), CSS_URL)
+
+
+def parse_face(block: str) -> Optional[Face]:
+    block = COMMENT_RE.sub("", block)
+    family = FAMILY_RE.search(block)
+    if not family:
+        return None
+    src = SRC_RE.search(block)
+    paths = [url_to_path(url) for _, url in URL_RE.findall(src.group(0))] if src else []
+    return Face(unquote(family.group(1)), next((p for p in paths if p), None))
+
+
+def used_families(dirs: List[Path], declared: Set[str], skip: Set[Path]) -> Set[str]:
+    """Declared families named by any font-family or --font-* value outside ``skip``."""
+    used: Set[str] = set()
+    for d in dirs:
+        for path in sorted(d.rglob("*")):
+            if path.suffix not in (".css", ".html") or path in skip or not path.is_file():
+                continue
+            text = COMMENT_RE.sub("", path.read_text(encoding="utf-8", errors="replace"))
+            for value in FAMILY_USE_RE.findall(text):
+                used.update(n for n in map(unquote, value.split(",")) if n in declared)
+    return used
+
+
+def css_unescape(text: str) -> str:
+    return CSS_ESCAPE_RE.sub(
+        lambda m: chr(int(m.group(1), 16)) if m.group(1) else m.group(2), text
+    )
+
+
+# ---------------- TEXT ---------------- #
+
+
+class TextExtractor(HTMLParser):
+    """Collect the characters a browser would render, skipping scripts and styles."""
+
+    SKIP = {"script", "style", "template"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.chars: Set[str] = set()
+        self.skipping = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in self.SKIP:
+            self.skipping += 1
+        for name, value in attrs:
+            if name == "placeholder" and value:
+                self.chars.update(value)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIP and self.skipping:
+            self.skipping -= 1
+
+    def handle_data(self, data: str) -> None:
+        if not self.skipping:
+            self.chars.update(data)
+
+
+def html_chars(html_dir: Path) -> Set[str]:
+    chars: Set[str] = set()
+    for path in sorted(html_dir.rglob("*.html")):
+        parser = TextExtractor()
+        parser.feed(path.read_text(encoding="utf-8", errors="replace"))
+        parser.close()
+        chars |= parser.chars
+    return chars
+
+
+def source_chars(patterns: Iterable[str]) -> Set[str]:
+    """Every character in the sources; a superset of what the built pages show."""
+    chars: Set[str] = set()
+    for pattern in patterns:
+        for path in sorted(ROOT.glob(pattern)):
+            if not path.is_file():
+                continue
+            text = path.read_text(encoding="utf-8", errors="replace")
+            chars.update(html.unescape(text) if path.suffix == ".html" else text)
+    return chars
+
+
+def stylesheet_chars(dirs: List[Path]) -> Set[str]:
+    """Characters inserted by CSS content: strings, such as list markers."""
+    chars: Set[str] = set()
+    for d in dirs:
+        for path in sorted(d.rglob("*.css")):
+            text = COMMENT_RE.sub("", path.read_text(encoding="utf-8", errors="replace"))
+            for _, value in CONTENT_RE.findall(text):
+                chars.update(css_unescape(value))
+    return chars
+
+
+def codepoints(chars: Set[str]) -> List[int]:
+    # Control characters are never drawn
+    return sorted(
+        cp for cp in map(ord, chars) if cp >= 0x20 and not 0x7F <= cp < 0xA0
+    )
+
+
+# ---------------- SUBSETTING ---------------- #
+
+
+def subset_font(src: Path, dst: Path, unicodes: List[int]) -> int:
+    """Write a WOFF2 of ``src`` holding only ``unicodes``; returns its size."""
+    options = subset.Options()
+    options.flavor = "woff2"
+    # Keep every OpenType feature, so ligatures and kerning survive
+    options.layout_features = ["*"]
+    options.notdef_outline = True
+    font = subset.load_font(str(src), options)
+    try:
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=unicodes)
+        subsetter.subset(font)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.stem}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            subset.save_font(font, tmp, options)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, dst)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    finally:
+        font.close()
+    return dst.stat().st_size
+
+
+# ---------------- MANIFEST ---------------- #
+
+ManifestEntry = Dict[str, Any]
+
+
+def load_manifest(path: Path) -> Dict[str, ManifestEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != SUBSET_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(path: Path, files: Dict[str, ManifestEntry]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".manifest.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"version": SUBSET_VERSION, "files": files}, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_digest(entry: Optional[ManifestEntry], src: Path) -> str:
+    """The source's sha256, reusing the manifest's when mtime and size match."""
+    st = src.stat()
+    if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+        return entry["sha256"]
+    return file_sha256(src)
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write ``text`` only when it differs, so Hugo does not see a touched file."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def rewrite_css(css: str, families: Set[str], outputs: Dict[Path, Path]) -> str:
+    """Point each subset face's src at its WOFF2; other faces are left untouched."""
+
+    def replace(match: "re.Match[str]") -> str:
+        block = match.group(0)
+        face = parse_face(block)
+        if face is None or face.family not in families or face.src not in outputs:
+            return block
+        url = path_to_url(outputs[face.src])
+        return SRC_RE.sub(lambda _: f'src: url("{url}") format("woff2");', block, count=1)
+
+    return FONT_FACE_RE.sub(replace, css)
+
+
+# ---------------- MAIN ---------------- #
+
+
+class FontResult(NamedTuple):
+    name: str
+    status: str
+    size_before: int
+    size_after: Optional[int]
+    error: Optional[Exception]
+
+
+def format_size(size_bytes: int) -> str:
+    if size_bytes < 1024:
+        return f"{size_bytes}B"
+    if size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f}KB"
+    return f"{size_bytes / (1024 * 1024):.1f}MB"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Subset web fonts to the characters the site uses, as WOFF2."
+    )
+    parser.add_argument(
+        "--source",
+        choices=("content", "html"),
+        default="content",
+        help="collect characters from the Markdown, templates and data (default), "
+        "or from the HTML of the last Hugo build",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="fonts subset at once (0 = one per CPU, default: 0)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="subset every font, ignoring the manifest"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = cfg()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    css_path, out_css, out_dir = config["css"], config["out_css"], config["out"]
+    manifest_path = out_dir / MANIFEST_NAME
+    if STATIC not in out_dir.parents:
+        sys.exit(f"output_dir must be inside {STATIC}, got {out_dir}")
+
+    console.print(
+        Panel.fit(
+            "[bold blue]Font Subsetter - WOFF2[/bold blue]",
+            box=box.DOUBLE,
+            border_style="blue",
+        )
+    )
+    console.print(f"[dim]Font faces:[/dim] {css_path}")
+    console.print(f"[dim]Output directory:[/dim] {out_dir}")
+    console.print(f"[dim]Output stylesheet:[/dim] {out_css}")
+    console.print()
+
+    css = css_path.read_text(encoding="utf-8")
+    faces = [f for f in map(parse_face, FONT_FACE_RE.findall(css)) if f]
+    declared = {f.family for f in faces}
+    families = set(config["families"]) or used_families(
+        config["styles"], declared, {css_path, out_css}
+    )
+
+    if args.source == "html":
+        if not config["html"].is_dir():
+            console.print(f"[red]No built site at {config['html']}; run hugo first[/red]")
+            sys.exit(1)
+        chars = html_chars(config["html"])
+    else:
+        chars = source_chars(config["text"])
+    chars |= set(config["always"]) | stylesheet_chars(config["styles"])
+    unicodes = codepoints(chars)
+    unicodes_digest = hashlib.sha256(",".join(map(str, unicodes)).encode()).hexdigest()
+
+    console.print(f"[dim]Families:[/dim] {', '.join(sorted(families)) or 'none'}")
+    console.print(f"[dim]Codepoints:[/dim] {len(unicodes)} from {args.source}")
+    console.print()
+
+    sources = sorted({f.src for f in faces if f.family in families and f.src})
+    # Mirror the source tree below the directory the fonts share, e.g. static/fonts
+    base = Path(os.path.commonpath([s.parent for s in sources])) if sources else STATIC
+    manifest = load_manifest(manifest_path)
+    seen: Dict[str, ManifestEntry] = {}
+    outputs: Dict[Path, Path] = {}
+    results: Dict[str, FontResult] = {}
+    pending: List[Tuple[str, Path, Path, ManifestEntry]] = []
+
+    for src in sources:
+        key = src.relative_to(STATIC).as_posix()
+        entry = manifest.get(key)
+        st = src.stat()
+        sha = source_digest(entry, src)
+        name = hashlib.sha256(f"{sha}:{unicodes_digest}".encode()).hexdigest()[:10]
+        dst = out_dir / src.parent.relative_to(base) / f"{src.stem}.{name}.woff2"
+        fresh: ManifestEntry = {
+            "sha256": sha,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "unicodes": unicodes_digest,
+            "output": dst.relative_to(out_dir).as_posix(),
+        }
+        if (
+            not args.force
+            and entry
+            and entry.get("output") == fresh["output"]
+            and dst.exists()
+        ):
+            seen[key] = {**fresh, "output_size": entry["output_size"]}
+            outputs[src] = dst
+            results[key] = FontResult(key, "cached", st.st_size, entry["output_size"], None)
+        else:
+            pending.append((key, src, dst, fresh))
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        TimeElapsedColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task("[green]Subsetting fonts...", total=len(sources))
+        progress.advance(task, len(sources) - len(pending))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(subset_font, src, dst, unicodes): (key, src, dst, fresh)
+                for key, src, dst, fresh in pending
+            }
+            for future in as_completed(futures):
+                key, src, dst, fresh = futures[future]
+                try:
+                    size_after = future.result()
+                    seen[key] = {**fresh, "output_size": size_after}
+                    outputs[src] = dst
+                    results[key] = FontResult(key, "subset", fresh["size"], size_after, None)
+                except Exception as e:
+                    # Keep the previous subset, if any, until this one succeeds
+                    prior = manifest.get(key)
+                    if prior and (out_dir / prior["output"]).exists():
+                        seen[key] = prior
+                        outputs[src] = out_dir / prior["output"]
+                    results[key] = FontResult(key, "failed", fresh["size"], None, e)
+                progress.update(
+                    task, description=f"[green]Subset [cyan]{src.name}[/cyan]"
+                )
+                progress.advance(task)
+
+    keep = {out_dir / e["output"] for e in seen.values()}
+    pruned = 0
+    for path in out_dir.rglob("*.woff2"):
+        if path not in keep:
+            path.unlink()
+            pruned += 1
+    for d in sorted((p for p in out_dir.rglob("*") if p.is_dir()), reverse=True):
+        if not any(d.iterdir()):
+            d.rmdir()
+    save_manifest(manifest_path, seen)
+
+    header = f"/* Generated by scripts/subset-fonts.py from {css_path.relative_to(ROOT)}; do not edit. */\n"
+    css_written = write_if_changed(out_css, header + rewrite_css(css, families, outputs))
+
+    table = Table(box=box.ROUNDED, border_style="green")
+    table.add_column("Font", style="cyan", no_wrap=False, width=50)
+    table.add_column("Before", style="yellow", justify="right", width=10)
+    table.add_column("After", style="green", justify="right", width=10)
+    table.add_column("Savings", style="bold green", justify="center", width=10)
+    table.add_column("Status", justify="center", width=8)
+    total_before = total_after = 0
+    for key in sorted(results):
+        result = results[key]
+        total_before += result.size_before
+        if result.error is not None:
+            console.print(f"[red]❌ {key}[/red]: {result.error}")
+            table.add_row(key, format_size(result.size_before), "N/A", "N/A", "[red]FAIL[/red]")
+            continue
+        total_after += result.size_after or 0
+        savings = (result.size_before - (result.size_after or 0)) / result.size_before * 100
+        table.add_row(
+            key,
+            format_size(result.size_before),
+            format_size(result.size_after or 0),
+            f"{savings:.1f}%",
+            "[dim]CACHED[/dim]" if result.status == "cached" else "[green]OK[/green]",
+        )
+    if results:
+        console.print(table)
+
+    counts = {s: sum(r.status == s for r in results.values()) for s in ("subset", "cached", "failed")}
+    savings_pct = (total_before - total_after) / total_before * 100 if total_before else 0
+    summary = Panel(
+        f"[bold green]Font Subsetting Complete[/bold green]\n\n"
+        f"[cyan]Fonts:[/cyan] [bold]{len(sources)}[/bold] "
+        f"([bold]{counts['subset']}[/bold] subset, [bold]{counts['cached']}[/bold] cached, "
+        f"[bold red]{counts['failed']}[/bold red] failed) • [cyan]Pruned:[/cyan] [bold]{pruned}[/bold]\n"
+        f"[cyan]Total size before:[/cyan] [bold]{format_size(total_before)}[/bold]\n"
+        f"[cyan]Total size after:[/cyan] [bold]{format_size(total_after)}[/bold] "
+        f"[bold green]({savings_pct:.1f}% saved)[/bold green]\n"
+        f"[cyan]Stylesheet:[/cyan] [dim]{out_css}[/dim]"
+        + (" [green](updated)[/green]" if css_written else ""),
+        title="[bold blue]Summary[/bold blue]",
+        box=box.ROUNDED,
+        border_style="green",
+    )
+    console.print()
+    console.print(summary)
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import importlib.util
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parent.parent
+# The scripts import their shared modules (reporting, content_index) by bare name
+sys.path.insert(0, str(SCRIPTS))
+
+# status, headers, body
+Reply = Tuple[int, Dict[str, str], object]
+
+
+@pytest.fixture
+def load_script() -> Callable[[str], ModuleType]:
+    """Import a hyphen-named script afresh, after the test has set up its environment."""
+
+    def load(name: str) -> ModuleType:
+        spec = importlib.util.spec_from_file_location(
+            name[:-3].replace("-", "_"), SCRIPTS / name
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
+
+
+class FakeGitHub:
+    """A local stand-in for the GitHub REST API.
+
+    ``replies`` maps a request path to the responses to give, in order; the
+    last one repeats. Paths without replies get a 404. Every request is kept
+    with its headers, and the highest number of requests in flight at once
+    is tracked.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.replies: Dict[str, List[Reply]] = {}
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with fake._lock:
+                    fake.requests.append((self.path, dict(self.headers)))
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    queue = fake.replies.get(self.path)
+                    reply = (queue.pop(0) if len(queue) > 1 else queue[0]) if queue else None
+                try:
+                    time.sleep(fake.delay)
+                    status, headers, body = reply or (404, {}, {"message": "Not Found"})
+                    data = b"" if status == 304 else json.dumps(body).encode()
+                    self.send_response(status)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def languages(self, repo: str, *replies: Reply) -> None:
+        self.replies[f"/repos/{repo}/languages"] = list(replies)
+
+    def hits(self, repo: str) -> List[Dict[str, str]]:
+        return [h for p, h in self.requests if p == f"/repos/{repo}/languages"]
+
+
+@pytest.fixture
+def github(monkeypatch):
+    fake = FakeGitHub()
+    fake.thread.start()
+    monkeypatch.setenv("GITHUB_API_URL", fake.url)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
@@ -0,0 +1,211 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def links(load_script):
+    return load_script("check-links.py")
+
+
+FILES = {
+    "index.html",
+    "a/index.html",
+    "a/img.png",
+    "b/index.html",
+    "b/img.png",
+    "css/site.css",
+    "feed.xml",
+}
+IDS = {"index.html": {"main"}, "a/index.html": {"intro"}, "b/index.html": {"usage"}}
+
+
+def problem(site, page, url, kind="link"):
+    broken = site.check(page, (kind, url, 1))
+    return broken.problem if broken else None
+
+
+# ---------------- RESOLUTION ---------------- #
+
+
+@pytest.mark.parametrize(
+    "page, url",
+    [
+        ("a/index.html", "../b/"),
+        ("a/index.html", "/b/"),
+        ("a/index.html", "/b"),
+        ("a/index.html", "/b/index.html"),
+        ("a/index.html", "img.png"),
+        ("a/index.html", "./img.png?v=1"),
+        ("a/index.html", "/b/#usage"),
+        ("a/index.html", "#intro"),
+        ("a/index.html", "#top"),
+        ("a/index.html", "#"),
+        ("a/index.html", "/"),
+        ("a/index.html", "/feed.xml#anything"),
+        ("a/index.html", "https://example.org/missing/"),
+        ("a/index.html", "mailto:me@example.org"),
+        ("a/index.html", "http://example.org/"),
+        ("a/index.html", "/b/%69mg.png"),
+    ],
+)
+def test_resolving_references(links, page, url):
+    site = links.Site(FILES, IDS, "https://example.com/")
+
+    assert problem(site, page, url) is None
+
+
+@pytest.mark.parametrize(
+    "page, url, kind, expected",
+    [
+        ("a/index.html", "/c/", "link", "missing file"),
+        ("a/index.html", "img.jpg", "img", "missing file"),
+        ("a/index.html", "/b/#nope", "link", "missing anchor #nope"),
+        ("a/index.html", "#usage", "link", "missing anchor #usage"),
+        ("a/index.html", "http://cdn.example.org/x.png", "img", "insecure http://"),
+        ("a/index.html", "http://cdn.example.org/x.js", "script", "insecure http://"),
+        ("a/index.html", "https://example.com/c/", "link", "missing file"),
+        ("index.html", "../../etc/passwd", "link", "missing file"),
+    ],
+)
+def test_broken_references(links, page, url, kind, expected):
+    site = links.Site(FILES, IDS, "https://example.com/")
+
+    assert problem(site, page, url, kind) == expected
+
+
+def test_relative_urls_resolve_per_directory(links):
+    site = links.Site(FILES - {"b/img.png"}, IDS, "https://example.com/")
+
+    # Memoised per directory: the same URL must not reuse another page's answer
+    assert problem(site, "a/index.html", "img.png", "img") is None
+    assert problem(site, "b/index.html", "img.png", "img") == "missing file"
+
+
+def test_anchors_are_only_checked_on_pages(links):
+    site = links.Site(FILES, IDS, "https://example.com/")
+
+    assert problem(site, "a/index.html", "/css/site.css#x") is None
+    assert problem(site, "a/index.html", "/b/img.png#x", "img") is None
+
+
+def test_base_path_is_honoured(links):
+    site = links.Site(FILES, IDS, "https://example.com/blog/")
+
+    assert problem(site, "a/index.html", "/blog/b/#usage") is None
+    assert problem(site, "a/index.html", "https://example.com/blog/b/") is None
+    assert problem(site, "a/index.html", "/b/") == "outside /blog/"
+
+
+def test_parser_collects_ids_and_every_url(links):
+    parser = links.PageParser()
+    parser.feed(
+        '<h2 id="x">X</h2><a name="y"></a>\n'
+        '<a href=" /a/ ">a</a><img src="/i.png" srcset="/i-480w.png 480w, /i-960w.png 960w">\n'
+        '<img srcset="data:image/webp;base64,AAAA 1x"><script src="/s.js"></script><a>none</a>'
+    )
+
+    assert parser.ids == {"x", "y"}
+    assert parser.refs == [
+        ("link", "/a/", 2),
+        ("img", "/i.png", 2),
+        ("img", "/i-480w.png", 2),
+        ("img", "/i-960w.png", 2),
+        ("script", "/s.js", 3),
+    ]
+
+
+# ---------------- PAGE CACHE ---------------- #
+
+
+PAGES = {
+    "index.html": '<main id="main"><a href="/a/#intro">a</a></main>',
+    "a/index.html": '<h1 id="intro">A</h1><a href="/">home</a>',
+}
+
+
+@pytest.fixture
+def site(links, tmp_path, monkeypatch):
+    (tmp_path / "config.toml").write_text(
+        '[link-check]\npublic_dir = "public"\ncache = "cache.json"\n', encoding="utf-8"
+    )
+    (tmp_path / "hugo.toml").write_text('baseURL = "https://example.com/"\n', encoding="utf-8")
+    for name, html in PAGES.items():
+        write(tmp_path, name, html)
+    monkeypatch.setattr(links, "ROOT", tmp_path)
+    monkeypatch.setattr(sys, "argv", ["check-links.py", "--jobs", "1"])
+
+    parsed = []
+    parse_pages = links.parse_pages
+
+    def spy(paths, jobs):
+        parsed.append(sorted(p.relative_to(tmp_path / "public").as_posix() for p in paths))
+        return parse_pages(paths, jobs)
+
+    monkeypatch.setattr(links, "parse_pages", spy)
+    return SimpleNamespace(root=tmp_path, parsed=parsed)
+
+
+def write(root, name, html):
+    path = root / "public" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(html, encoding="utf-8")
+
+
+def run(links, site):
+    """Pages parsed this run, and whether the site checked clean."""
+    try:
+        links.main()
+        clean = True
+    except SystemExit as e:
+        clean = e.code in (None, 0)
+    return site.parsed[-1], clean
+
+
+def test_unchanged_pages_are_not_reparsed(links, site):
+    assert run(links, site) == (["a/index.html", "index.html"], True)
+    assert run(links, site) == ([], True)
+
+
+def test_touched_page_keeps_its_entry_with_fresh_stat(links, site):
+    run(links, site)
+    page = site.root / "public" / "index.html"
+    os.utime(page, ns=(0, 10**9))
+
+    assert run(links, site) == ([], True)
+    cache = json.loads((site.root / "cache.json").read_text(encoding="utf-8"))
+    assert cache["pages"]["index.html"]["mtime_ns"] == 10**9
+
+
+def test_edited_page_alone_is_reparsed(links, site):
+    run(links, site)
+    write(site.root, "index.html", '<main id="main"><a href="/missing/">x</a></main>')
+
+    assert run(links, site) == (["index.html"], False)
+
+
+def test_removed_anchor_breaks_cached_pages_that_link_to_it(links, site):
+    run(links, site)
+    write(site.root, "a/index.html", '<h1 id="renamed">A</h1><a href="/">home</a>')
+
+    # index.html is served from the cache but still checked against the new ids
+    assert run(links, site) == (["a/index.html"], False)
+
+
+def test_deleted_page_is_dropped_and_breaks_its_links(links, site):
+    run(links, site)
+    (site.root / "public" / "a" / "index.html").unlink()
+
+    assert run(links, site) == ([], False)
+    cache = json.loads((site.root / "cache.json").read_text(encoding="utf-8"))
+    assert list(cache["pages"]) == ["index.html"]
+
+
+def test_cache_version_change_reparses_everything(links, site, monkeypatch):
+    run(links, site)
+    monkeypatch.setattr(links, "CACHE_VERSION", links.CACHE_VERSION + 1)
+
+    assert run(links, site) == (["a/index.html", "index.html"], True)
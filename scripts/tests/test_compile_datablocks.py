@@ -0,0 +1,148 @@
+import json
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def datablocks(load_script):
+    return load_script("compile-datablocks.py")
+
+
+# ---------------- TYPE INFERENCE ---------------- #
+
+
+@pytest.mark.parametrize(
+    "value, kind",
+    [
+        ("12", "int"),
+        ("-12", "int"),
+        ("1.5", "float"),
+        ("-0.25", "float"),
+        ("null", "null"),
+        ("", "string"),
+        ("1e3", "string"),
+        ("1.", "string"),
+        (".5", "string"),
+        ("+3", "string"),
+        ("1,000", "string"),
+        (" 7", "string"),
+        ("NULL", "string"),
+    ],
+)
+def test_cell_type(datablocks, value, kind):
+    assert datablocks.cell_type(value) == kind
+
+
+def column(datablocks, tmp_path, values):
+    spool = (tmp_path / "spool").open("w+", encoding="utf-8", newline="")
+    datablocks.spool_batch([datablocks.csv.writer(spool)], [[v] for v in values])
+    return datablocks.column_data("col", spool)
+
+
+def test_int_and_float_columns_keep_their_type(datablocks, tmp_path):
+    assert column(datablocks, tmp_path, ["3", "10", "2"])["type"] == "int"
+    assert column(datablocks, tmp_path, ["0.5", "1.25"])["type"] == "float"
+
+
+def test_numeric_columns_sort_by_value_not_text(datablocks, tmp_path):
+    data = column(datablocks, tmp_path, ["10", "9", "-1", "9"])
+
+    assert data["sort"] == [2, 1, 0, 1]
+    assert "types" not in data
+
+
+def test_mixed_columns_sort_numbers_then_text_then_nulls(datablocks, tmp_path):
+    data = column(datablocks, tmp_path, ["null", "beta", "2", "Alpha", "1.5"])
+
+    assert data["type"] == "mixed"
+    assert data["types"] == ["null", "string", "int", "string", "float"]
+    assert data["sort"] == [4, 3, 1, 2, 0]
+
+
+def test_int_and_float_together_are_mixed(datablocks, tmp_path):
+    data = column(datablocks, tmp_path, ["2", "1.5"])
+
+    assert data["type"] == "mixed"
+    assert data["sort"] == [1, 0]
+
+
+def test_compiled_file_is_column_oriented(datablocks, tmp_path, monkeypatch):
+    monkeypatch.setattr(datablocks, "SPOOL_BATCH", 2)
+    src = tmp_path / "t.csv"
+    src.write_text("\ufeffname,score\nb,2\na,10\nc\nd,1,extra\n", encoding="utf-8")
+    dst = tmp_path / "out" / "t.json"
+
+    compiled = datablocks.compile_csv(src, dst, "t.csv", "digest")
+
+    assert compiled == (4, 2, 2)
+    data = json.loads(dst.read_text(encoding="utf-8"))
+    assert data["rows"] == 4 and data["sha256"] == "digest"
+    name, score = data["columns"]
+    assert name["name"] == "name" and name["values"] == ["b", "a", "c", "d"]
+    assert score["values"] == ["2", "10", "", "1"]
+    assert score["types"] == ["int", "int", "string", "int"]
+
+
+# ---------------- MANIFEST ---------------- #
+
+
+@pytest.fixture
+def site(datablocks, tmp_path, monkeypatch):
+    (tmp_path / "config.toml").write_text(
+        '[datablocks]\nsource_dir = "src"\noutput_dir = "out"\n', encoding="utf-8"
+    )
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.csv").write_text("x\n1\n", encoding="utf-8")
+    (tmp_path / "src" / "b.csv").write_text("y\nfoo\n", encoding="utf-8")
+    monkeypatch.setattr(datablocks, "ROOT", tmp_path)
+    monkeypatch.setattr(sys, "argv", ["compile-datablocks.py"])
+    return tmp_path
+
+
+def output_mtimes(datablocks, site):
+    datablocks.main()
+    manifest = datablocks.load_manifest(site / "out" / datablocks.MANIFEST_NAME)
+    return {
+        name: (site / "out" / name).with_suffix(".json").stat().st_mtime_ns
+        for name in manifest
+    }
+
+
+def test_unchanged_csvs_are_not_recompiled(datablocks, site):
+    first = output_mtimes(datablocks, site)
+    os.utime(site / "src" / "a.csv", ns=(0, 10**9))
+
+    assert output_mtimes(datablocks, site) == first
+
+
+def test_edited_or_deleted_output_is_recompiled(datablocks, site):
+    first = output_mtimes(datablocks, site)
+    (site / "src" / "a.csv").write_text("x\n2\n", encoding="utf-8")
+    (site / "out" / "b.json").unlink()
+
+    second = output_mtimes(datablocks, site)
+
+    assert second["a.csv"] != first["a.csv"]
+    assert (site / "out" / "b.json").is_file()
+    values = json.loads((site / "out" / "a.json").read_text(encoding="utf-8"))["columns"][0]
+    assert values["values"] == ["2"]
+
+
+def test_removed_csv_is_pruned(datablocks, site):
+    output_mtimes(datablocks, site)
+    (site / "src" / "b.csv").unlink()
+
+    assert list(output_mtimes(datablocks, site)) == ["a.csv"]
+    assert not (site / "out" / "b.json").exists()
+
+
+def test_compiler_version_change_recompiles_everything(datablocks, site, monkeypatch):
+    output_mtimes(datablocks, site)
+    monkeypatch.setattr(datablocks, "COMPILER_VERSION", datablocks.COMPILER_VERSION + 1)
+
+    assert datablocks.load_manifest(site / "out" / datablocks.MANIFEST_NAME) == {}
+    datablocks.main()
+    data = json.loads((site / "out" / "a.json").read_text(encoding="utf-8"))
+    assert data["version"] == datablocks.COMPILER_VERSION
@@ -0,0 +1,156 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+brotli = pytest.importorskip("brotli")
+
+import reporting
+
+TEXT = ("<p>Repetitive markup compresses well.</p>\n" * 40).encode()
+
+
+@pytest.fixture
+def compress(load_script, monkeypatch):
+    module = load_script("compress-public.py")
+    # The worker pool pickles compress_file by module name
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    return module
+
+
+@pytest.fixture
+def site(compress, tmp_path, monkeypatch):
+    (tmp_path / "config.toml").write_text(
+        '[precompress]\npublic_dir = "public"\nstore_dir = "store"\nmin_size = 256\n',
+        encoding="utf-8",
+    )
+    public = tmp_path / "public"
+    (public / "css").mkdir(parents=True)
+    (public / "index.html").write_bytes(TEXT)
+    (public / "css" / "site.css").write_bytes(TEXT.replace(b"<p>", b"p {"))
+    monkeypatch.setattr(compress, "ROOT", tmp_path)
+    return tmp_path
+
+
+def run(compress, site, monkeypatch, *args):
+    """Status per file from the ndjson records, and the summary."""
+    out = io.StringIO()
+    monkeypatch.setattr(compress, "Reporter", lambda fmt, tool: reporting.Reporter(fmt, tool, out))
+    monkeypatch.setattr(
+        sys, "argv", ["compress-public.py", "--jobs", "1", "--format", "ndjson", *args]
+    )
+    compress.main()
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    return {r["path"]: r["status"] for r in records if r["type"] == "file"}, records[-1]
+
+
+def sibling(site, name, suffix):
+    return site / "public" / (name + suffix)
+
+
+# ---------------- SKIP AND RESTORE ---------------- #
+
+
+def test_siblings_decode_to_the_source(compress, site, monkeypatch):
+    statuses, _ = run(compress, site, monkeypatch)
+
+    assert statuses == {"index.html": "compressed", "css/site.css": "compressed"}
+    assert brotli.decompress(sibling(site, "index.html", ".br").read_bytes()) == TEXT
+    assert gzip.decompress(sibling(site, "index.html", ".gz").read_bytes()) == TEXT
+
+
+def test_unchanged_files_are_skipped(compress, site, monkeypatch):
+    run(compress, site, monkeypatch)
+    before = sibling(site, "index.html", ".br").stat().st_mtime_ns
+
+    statuses, _ = run(compress, site, monkeypatch)
+
+    assert set(statuses.values()) == {"cached"}
+    assert sibling(site, "index.html", ".br").stat().st_mtime_ns == before
+
+
+def test_rebuilt_site_is_restored_from_the_store(compress, site, monkeypatch):
+    run(compress, site, monkeypatch)
+    expected = sibling(site, "index.html", ".br").read_bytes()
+    # `just clean && hugo`: same content, fresh files, no siblings
+    shutil.rmtree(site / "public")
+    (site / "public" / "css").mkdir(parents=True)
+    (site / "public" / "index.html").write_bytes(TEXT)
+    (site / "public" / "css" / "site.css").write_bytes(TEXT.replace(b"<p>", b"p {"))
+
+    statuses, _ = run(compress, site, monkeypatch)
+
+    assert set(statuses.values()) == {"restored"}
+    assert sibling(site, "index.html", ".br").read_bytes() == expected
+
+
+def test_tampered_sibling_is_restored(compress, site, monkeypatch):
+    run(compress, site, monkeypatch)
+    sibling(site, "index.html", ".gz").write_bytes(b"stale")
+
+    statuses, _ = run(compress, site, monkeypatch)
+
+    assert statuses["index.html"] == "restored"
+    assert gzip.decompress(sibling(site, "index.html", ".gz").read_bytes()) == TEXT
+
+
+def test_edited_file_is_recompressed_and_its_old_blob_dropped(compress, site, monkeypatch):
+    run(compress, site, monkeypatch)
+    old = {p.name for p in (site / "store").iterdir()}
+    (site / "public" / "index.html").write_bytes(TEXT + b"<p>more</p>\n")
+
+    statuses, _ = run(compress, site, monkeypatch)
+
+    assert statuses == {"index.html": "compressed", "css/site.css": "cached"}
+    blobs = {p.name for p in (site / "store").iterdir()}
+    assert len(old - blobs) == 2  # the old index.html .br and .gz
+    assert brotli.decompress(sibling(site, "index.html", ".br").read_bytes()).endswith(b"more</p>\n")
+
+
+def test_force_recompresses_everything(compress, site, monkeypatch):
+    run(compress, site, monkeypatch)
+
+    statuses, _ = run(compress, site, monkeypatch, "--force")
+
+    assert set(statuses.values()) == {"compressed"}
+
+
+def test_version_change_recompresses_everything(compress, site, monkeypatch):
+    run(compress, site, monkeypatch)
+    monkeypatch.setattr(compress, "COMPRESS_VERSION", compress.COMPRESS_VERSION + 1)
+
+    statuses, _ = run(compress, site, monkeypatch)
+
+    assert set(statuses.values()) == {"compressed"}
+
+
+# ---------------- SIBLINGS THAT SHOULD NOT EXIST ---------------- #
+
+
+def test_incompressible_file_gets_no_siblings_and_stays_cached(compress, site, monkeypatch):
+    noise = site / "public" / "noise.txt"
+    noise.write_bytes(os.urandom(4096))
+
+    first, _ = run(compress, site, monkeypatch)
+    second, _ = run(compress, site, monkeypatch)
+
+    assert first["noise.txt"] == "compressed" and second["noise.txt"] == "cached"
+    assert not sibling(site, "noise.txt", ".br").exists()
+    assert not sibling(site, "noise.txt", ".gz").exists()
+
+
+def test_small_and_deleted_files_lose_their_siblings(compress, site, monkeypatch):
+    run(compress, site, monkeypatch)
+    (site / "public" / "index.html").write_bytes(b"<p>tiny</p>")
+    (site / "public" / "css" / "site.css").unlink()
+
+    statuses, summary = run(compress, site, monkeypatch)
+
+    assert statuses == {}
+    assert summary["removed"] == 2
+    assert not any(p.suffix in (".br", ".gz") for p in (site / "public").rglob("*"))
+    assert not any((site / "store").glob("*.br"))
@@ -0,0 +1,160 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS
+
+VALID = [
+    'title: "Post"\n',
+    "date: 2024-01-01\n",
+]
+
+
+@pytest.fixture
+def fmt(load_script):
+    module = load_script("fmt-markdown.py")
+    module.set_vocabularies({})
+    return module
+
+
+def frontmatter_issues(fmt, lines):
+    return [i for i in fmt.run_all_checks(lines) if i.startswith("[FRONTMATTER]")]
+
+
+# ---------------- FRONTMATTER BLOCK ---------------- #
+
+
+def test_block_within_the_cap_is_parsed(fmt):
+    padding = ["# note\n"] * (fmt.FRONTMATTER_MAX_LINES - len(VALID))
+    issues = frontmatter_issues(fmt, ["---\n", *VALID, *padding, "---\n", "Body\n"])
+
+    assert "[FRONTMATTER] Missing or malformed frontmatter" not in issues
+    assert not any("Exceeds" in i for i in issues)
+
+
+def test_oversized_block_is_reported_as_such(fmt):
+    padding = ["# note\n"] * fmt.FRONTMATTER_MAX_LINES
+    issues = frontmatter_issues(fmt, ["---\n", *VALID, *padding, "---\n", "Body\n"])
+
+    assert issues == [f"[FRONTMATTER] Exceeds {fmt.FRONTMATTER_MAX_LINES} lines"]
+
+
+def test_unclosed_block_is_malformed(fmt):
+    padding = ["# note\n"] * (fmt.FRONTMATTER_MAX_LINES * 2)
+    issues = frontmatter_issues(fmt, ["---\n", *VALID, *padding])
+
+    assert issues == ["[FRONTMATTER] Missing or malformed frontmatter"]
+
+
+def test_oversized_block_keeps_the_buffer_bounded(fmt):
+    scanner = fmt.FrontmatterScanner()
+    for line in ["---\n", *["# note\n"] * (fmt.FRONTMATTER_MAX_LINES * 3), "---\n"]:
+        scanner.feed(line)
+
+    assert scanner.found and scanner.oversized
+    assert len(scanner.lines) == fmt.FRONTMATTER_MAX_LINES
+    assert scanner.block is None
+
+
+# ---------------- RESULT CACHE ---------------- #
+
+
+@pytest.fixture
+def site(tmp_path):
+    content = tmp_path / "content"
+    content.mkdir()
+    # Already in the form the fixes write, bar b.md's numbered heading
+    (content / "a.md").write_text("---\ndifficulty: beginner\n---\n## Intro\n", encoding="utf-8")
+    (content / "b.md").write_text("---\ntitle: B\n---\n## 1. Numbered\n", encoding="utf-8")
+    (tmp_path / "data" / "allowed").mkdir(parents=True)
+    vocabulary(tmp_path, ["beginner", "advanced"])
+    return tmp_path
+
+
+def vocabulary(site, values):
+    (site / "data" / "allowed" / "difficulty.json").write_text(
+        json.dumps({"values": values}), encoding="utf-8"
+    )
+
+
+def run(site, *mode):
+    proc = subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPTS / "fmt-markdown.py"),
+            str(site / "content"),
+            *mode,
+            "--cache",
+            str(site / "cache.json"),
+            "--data-dir",
+            str(site / "data"),
+            "--jobs",
+            "1",
+            "--format",
+            "ndjson",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    records = [json.loads(line) for line in proc.stdout.splitlines()]
+    return {r["path"]: r for r in records if r["type"] == "file"}
+
+
+def check(site):
+    return run(site, "--check-only")
+
+
+def test_unchanged_files_are_served_from_the_cache(site):
+    first = check(site)
+    second = check(site)
+
+    assert not any(r["cached"] for r in first.values())
+    assert all(r["cached"] for r in second.values())
+    assert {p: r["issues"] for p, r in second.items()} == {
+        p: r["issues"] for p, r in first.items()
+    }
+
+
+def test_edited_file_is_rechecked(site):
+    check(site)
+    (site / "content" / "b.md").write_text("---\ntitle: B\n---\n# Now an H1\n", encoding="utf-8")
+
+    results = check(site)
+
+    assert results["a.md"]["cached"]
+    assert not results["b.md"]["cached"]
+    assert "[H1 HEADER] # Now an H1" in results["b.md"]["issues"]
+    assert not any("NUMBERED" in i for i in results["b.md"]["issues"])
+
+
+def test_vocabulary_change_invalidates_every_entry(site):
+    check(site)
+    vocabulary(site, ["advanced"])
+
+    results = check(site)
+
+    assert not any(r["cached"] for r in results.values())
+    assert any("difficulty" in i for i in results["a.md"]["issues"])
+
+
+def test_fix_rewrites_then_caches_the_fixed_point(site):
+    check(site)
+    fixed = run(site, "--fix-only", "numbering")
+    assert (site / "content" / "b.md").read_text(encoding="utf-8").endswith("## Numbered\n")
+    assert not fixed["b.md"]["cached"]
+
+    again = run(site, "--fix-only", "numbering")
+    assert all(r["cached"] for r in again.values())
+
+    # A different set of fixes has not been applied yet
+    other = run(site, "--fix-only", "numbering", "markers")
+    assert not any(r["cached"] for r in other.values())
+
+    # The rewrite changed b.md, so only its earlier check result is dropped
+    results = check(site)
+    assert results["a.md"]["cached"]
+    assert not results["b.md"]["cached"]
+    assert not any("NUMBERED" in i for i in results["b.md"]["issues"])
@@ -0,0 +1,289 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import SCRIPTS
+
+LANGUAGES = {"Python": 7000, "Shell": 2000, "Markdown": 500, "Nix": 1000}
+
+
+@pytest.fixture
+def langstats(github, load_script, monkeypatch):
+    module = load_script("generate-langstats.py")
+    # Keep jittered backoff short; Retry-After hints are set per test
+    monkeypatch.setattr(module, "BACKOFF_BASE", 0.01)
+    return module
+
+
+def resolve(langstats, projects, cache=None, concurrency=4, limiter=None):
+    args = argparse.Namespace(api_url=langstats.GITHUB_API, ttl=0, offline=False)
+    limiter = limiter or langstats.RateLimiter(max_wait=5)
+    results = {
+        r.slug: r
+        for r in langstats.resolve_github(projects, cache or {}, args, concurrency, limiter)
+    }
+    return results, limiter
+
+
+def ok(etag='"v1"', **headers):
+    return 200, {"ETag": etag, **headers}, LANGUAGES
+
+
+# ---------------- CONCURRENCY AND REVALIDATION ---------------- #
+
+
+def test_api_url_comes_from_the_environment(langstats, github):
+    assert langstats.GITHUB_API == github.url
+
+
+def test_projects_are_fetched_in_parallel(langstats, github):
+    github.delay = 0.2
+    repos = [f"owner/repo{i}" for i in range(6)]
+    for repo in repos:
+        github.languages(repo, ok())
+    projects = [(repo.split("/")[1], f"https://github.com/{repo}") for repo in repos]
+
+    start = time.perf_counter()
+    results, limiter = resolve(langstats, projects, concurrency=6)
+    elapsed = time.perf_counter() - start
+
+    assert github.max_in_flight > 1
+    assert elapsed < 0.2 * len(repos)
+    assert {r.status for r in results.values()} == {"fetched"}
+    assert all(r.error is None for r in results.values())
+    assert results["repo0"].languages == langstats.language_stats(LANGUAGES)
+    assert "Markdown" not in {l["name"] for l in results["repo0"].languages}
+    assert sum(l["percent"] for l in results["repo0"].languages) == 100
+    assert results["repo0"].entry["etag"] == '"v1"'
+    assert limiter.sent == len(repos)
+
+
+def test_unchanged_repos_are_revalidated_with_their_etag(langstats, github):
+    github.languages("owner/repo", ok(), (304, {"ETag": '"v1"'}, None))
+    projects = [("repo", "https://github.com/owner/repo")]
+
+    first, _ = resolve(langstats, projects)
+    cache = {"owner/repo": first["repo"].entry}
+    second, _ = resolve(langstats, projects, cache)
+
+    first_hit, second_hit = github.hits("owner/repo")
+    assert "If-None-Match" not in first_hit
+    assert second_hit["If-None-Match"] == '"v1"'
+    assert second["repo"].status == "not-modified"
+    assert second["repo"].languages == first["repo"].languages
+    assert second["repo"].entry["fetched_at"] >= first["repo"].entry["fetched_at"]
+
+
+def test_changed_repos_replace_the_cached_entry(langstats, github):
+    github.languages("owner/repo", (200, {"ETag": '"v2"'}, {"Rust": 10}))
+    prior = {"etag": '"v1"', "fetched_at": 0, "languages": LANGUAGES}
+
+    results, _ = resolve(langstats, [("repo", "https://github.com/owner/repo")], {"owner/repo": prior})
+
+    assert results["repo"].status == "fetched"
+    assert results["repo"].entry["etag"] == '"v2"'
+    assert [l["name"] for l in results["repo"].languages] == ["Rust"]
+
+
+# ---------------- RATE LIMITS AND RETRIES ---------------- #
+
+
+def test_429_is_retried_after_the_servers_hint(langstats, github):
+    github.languages("owner/repo", (429, {"Retry-After": "0.1"}, {}), ok())
+
+    start = time.perf_counter()
+    results, limiter = resolve(langstats, [("repo", "https://github.com/owner/repo")])
+
+    assert time.perf_counter() - start >= 0.1
+    assert results["repo"].status == "fetched"
+    assert limiter.retries == 1
+    assert len(github.hits("owner/repo")) == 2
+
+
+def test_403_rate_limit_waits_for_the_reset(langstats, github):
+    reset = str(int(time.time()) + 1)
+    exhausted = {
+        "X-RateLimit-Limit": "60",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": reset,
+    }
+    github.languages(
+        "owner/repo",
+        (403, exhausted, {"message": "API rate limit exceeded"}),
+        ok(**{"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": reset}),
+    )
+
+    results, limiter = resolve(langstats, [("repo", "https://github.com/owner/repo")])
+
+    assert results["repo"].status == "fetched"
+    assert limiter.retries == 1
+    assert limiter.limit == 5000 and limiter.remaining == 4999
+
+
+def test_403_without_rate_limit_headers_is_not_retried(langstats, github):
+    github.languages("owner/repo", (403, {}, {"message": "Forbidden"}))
+
+    results, limiter = resolve(langstats, [("repo", "https://github.com/owner/repo")])
+
+    assert results["repo"].error is not None
+    assert limiter.retries == 0
+    assert len(github.hits("owner/repo")) == 1
+
+
+def test_5xx_is_retried_with_backoff(langstats, github):
+    github.languages("owner/repo", (502, {}, {}), (503, {}, {}), ok())
+
+    results, limiter = resolve(langstats, [("repo", "https://github.com/owner/repo")])
+
+    assert results["repo"].status == "fetched"
+    assert limiter.retries == 2
+
+
+def test_persistent_failure_falls_back_to_stale_cache(langstats, github):
+    github.languages("owner/repo", (503, {}, {}))
+    prior = {"etag": '"v1"', "fetched_at": 0, "languages": LANGUAGES}
+    limiter = langstats.RateLimiter(max_wait=5, max_retries=2)
+
+    results, _ = resolve(
+        langstats, [("repo", "https://github.com/owner/repo")], {"owner/repo": prior}, limiter=limiter
+    )
+
+    assert results["repo"].status == "stale"
+    assert results["repo"].error is None
+    assert results["repo"].languages == langstats.language_stats(LANGUAGES)
+    assert len(github.hits("owner/repo")) == 3
+
+
+def test_persistent_failure_without_cache_is_an_error(langstats, github):
+    github.languages("owner/repo", (503, {}, {}))
+    limiter = langstats.RateLimiter(max_wait=5, max_retries=1)
+
+    results, _ = resolve(langstats, [("repo", "https://github.com/owner/repo")], limiter=limiter)
+
+    assert results["repo"].languages is None
+    assert "503" in str(results["repo"].error)
+
+
+def test_rate_limit_reset_too_far_off_fails_fast(langstats, github):
+    github.languages(
+        "owner/repo",
+        (429, {"Retry-After": "3600"}, {}),
+    )
+
+    start = time.perf_counter()
+    results, limiter = resolve(langstats, [("repo", "https://github.com/owner/repo")])
+
+    assert time.perf_counter() - start < 5
+    assert results["repo"].error is not None
+    assert limiter.retries == 0
+
+
+def test_dispatch_pauses_at_the_reserve(langstats):
+    limiter = langstats.RateLimiter(reserve=1, max_wait=5)
+    limiter.remaining, limiter.reset = 1, time.time() + 0.2
+
+    start = time.perf_counter()
+    limiter.acquire()
+
+    assert time.perf_counter() - start >= 0.15
+    assert limiter.remaining is None
+
+
+def test_concurrent_workers_all_wait_at_the_reserve(langstats):
+    limiter = langstats.RateLimiter(reserve=1, max_wait=5)
+    limiter.remaining, limiter.reset = 1, time.time() + 0.3
+    barrier = threading.Barrier(6)
+    dispatched = []
+
+    def worker():
+        barrier.wait()
+        limiter.acquire()
+        dispatched.append(time.time())
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(dispatched) == 6
+    assert min(dispatched) >= limiter.reset - 0.01
+    assert limiter.sent == 6
+
+
+# ---------------- EXIT STATUS ---------------- #
+
+
+def run_main(tmp_path, github, prior=None, *extra):
+    projects = tmp_path / "content" / "projects"
+    projects.mkdir(parents=True)
+    (projects / "demo.md").write_text(
+        '---\ntitle: Demo\nrepository: "https://github.com/owner/demo"\n---\n\nBody\n',
+        encoding="utf-8",
+    )
+    (tmp_path / "config.toml").write_text(
+        '[language-stats]\ncontent_dir = "content/projects"\ndata_dir = "data/langstats"\n',
+        encoding="utf-8",
+    )
+    cache = tmp_path / "langstats.json"
+    if prior:
+        cache.write_text(json.dumps({"owner/demo": prior}), encoding="utf-8")
+    return subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPTS / "generate-langstats.py"),
+            "--index",
+            str(tmp_path / "index.sqlite"),
+            "--cache",
+            str(cache),
+            "--retries",
+            "0",
+            "--format",
+            "ndjson",
+            *extra,
+        ],
+        cwd=tmp_path,
+        env={**os.environ, "GITHUB_API_URL": github.url},
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_main_warns_when_a_project_has_no_data(tmp_path, github):
+    github.languages("owner/demo", (500, {}, {}))
+
+    proc = run_main(tmp_path, github)
+
+    assert proc.returncode == 0
+    assert "no language data" in proc.stderr
+    summary = json.loads(proc.stdout.splitlines()[-1])
+    assert summary["failed"] == 1
+
+
+def test_strict_main_exits_nonzero_when_a_project_has_no_data(tmp_path, github):
+    github.languages("owner/demo", (500, {}, {}))
+
+    proc = run_main(tmp_path, github, None, "--strict")
+
+    assert proc.returncode == 1
+    summary = json.loads(proc.stdout.splitlines()[-1])
+    assert summary["failed"] == 1
+
+
+def test_main_succeeds_on_stale_fallback(tmp_path, github):
+    github.languages("owner/demo", (500, {}, {}))
+    prior = {"etag": '"v1"', "fetched_at": 0, "languages": LANGUAGES}
+
+    proc = run_main(tmp_path, github, prior)
+
+    assert proc.returncode == 0, proc.stderr
+    records = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert records[0]["status"] == "stale"
+    written = json.loads((tmp_path / "data" / "langstats" / "demo.json").read_text())
+    assert written["languages"] == records[0]["languages"]
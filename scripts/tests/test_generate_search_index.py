@@ -0,0 +1,114 @@
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import SCRIPTS
+
+SEARCH_JS = SCRIPTS.parent / "assets" / "js" / "modules" / "search.js"
+
+TERMS = ["python", "go", "x", "42", "café", "straße", "日本語", "ñu", "a1", "😀ok", "über"]
+TEXTS = [
+    "Hello, World! Ça va?",
+    "snake_case and kebab-case",
+    "Ｆｕｌｌｗｉｄｔｈ ＡＢＣ",
+    "naïve façade — résumé",
+    "日本語のテキスト 123",
+    "emoji 😀 in text",
+]
+
+
+@pytest.fixture
+def search(load_script):
+    return load_script("generate-search-index.py")
+
+
+def js_function(source, name):
+    """The source of a top-level ``function name(...) {...}`` in search.js."""
+    match = re.search(rf"^function {name}\(.*?^}}$", source, re.M | re.S)
+    assert match, f"{name} not found in search.js"
+    return match.group(0)
+
+
+def run_js(search, prefix, calls):
+    source = SEARCH_JS.read_text(encoding="utf-8")
+    manifest = {
+        "prefix": prefix,
+        "min_token": search.MIN_TOKEN_LEN,
+        "stopwords": sorted(search.STOPWORDS),
+    }
+    program = "\n".join(
+        [
+            f"const manifest = {json.dumps(manifest)};",
+            "manifest.stopwords = new Set(manifest.stopwords);",
+            js_function(source, "tokenize"),
+            js_function(source, "shardKey"),
+            f"console.log(JSON.stringify({calls}));",
+        ]
+    )
+    proc = subprocess.run(
+        ["node", "-e", program], capture_output=True, text=True, encoding="utf-8", check=True
+    )
+    return json.loads(proc.stdout)
+
+
+# ---------------- PARITY WITH SEARCH.JS ---------------- #
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+@pytest.mark.parametrize("prefix", [1, 2, 3])
+def test_shard_key_matches_search_js(search, prefix):
+    calls = f"{json.dumps(TERMS)}.map(shardKey)"
+
+    assert run_js(search, prefix, calls) == [search.shard_key(t, prefix) for t in TERMS]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_tokenize_matches_search_js(search):
+    calls = f"{json.dumps(TEXTS)}.map(tokenize)"
+
+    assert run_js(search, 2, calls) == [search.tokenize(t) for t in TEXTS]
+
+
+def test_shard_keys_are_file_safe(search):
+    for term in TERMS:
+        assert re.fullmatch(r"[a-z0-9-]+", search.shard_key(term, 2))
+
+
+# ---------------- INDEX FILES ---------------- #
+
+
+def postings_for(terms):
+    return {term: [(0, 1.0)] for term in terms}
+
+
+def test_every_term_is_in_the_shard_its_key_names(search, tmp_path):
+    shards = search.shard_postings(postings_for(TERMS), 2)
+    search.write_index(tmp_path, [], shards, 2, 10)
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+    for term in TERMS:
+        name = manifest["shards"][search.shard_key(term, 2)]
+        assert term in json.loads((tmp_path / name).read_text(encoding="utf-8"))
+
+
+def test_rewrites_only_changed_shards_and_prunes_stale_ones(search, tmp_path):
+    search.write_index(tmp_path, [], search.shard_postings(postings_for(["python", "go"]), 2), 2, 10)
+    before = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))["shards"]
+
+    assert search.write_index(
+        tmp_path, [], search.shard_postings(postings_for(["python", "go"]), 2), 2, 10
+    ) == (0, 2, 0)
+
+    written, kept, pruned = search.write_index(
+        tmp_path, [], search.shard_postings(postings_for(["python", "golang"]), 2), 2, 10
+    )
+    after = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))["shards"]
+
+    assert after["py"] == before["py"]
+    assert after["go"] != before["go"]
+    # The new "go" shard and the manifest; the old "go" shard is gone
+    assert (written, kept, pruned) == (2, 1, 1)
+    assert not (tmp_path / before["go"]).exists()
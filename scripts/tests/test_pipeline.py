@@ -0,0 +1,55 @@
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def pipeline(load_script, monkeypatch, tmp_path):
+    module = load_script("pipeline.py")
+    monkeypatch.setattr(module, "ROOT", tmp_path)
+    monkeypatch.setattr(module, "SCRIPTS", tmp_path / "scripts")
+    (tmp_path / "scripts").mkdir()
+    (tmp_path / "scripts" / "stage.py").write_text("pass\n", encoding="utf-8")
+    raw = tmp_path / "raw" / "nested"
+    raw.mkdir(parents=True)
+    (raw / "a.jpg").write_bytes(b"a")
+    return module
+
+
+def stage(pipeline, tmp_path, inputs):
+    return pipeline.Stage(
+        "images", [sys.executable, str(tmp_path / "scripts" / "stage.py")], inputs, [], "test"
+    )
+
+
+def run(pipeline, stage, state):
+    results = pipeline.run_pipeline([stage], {stage.name: set()}, state, 1, False, False)
+    return results[stage.name].status
+
+
+# ---------------- FINGERPRINTS ---------------- #
+
+
+def test_trailing_double_star_matches_files(pipeline, tmp_path):
+    assert pipeline.expand(["raw/**"]) == [tmp_path / "raw" / "nested" / "a.jpg"]
+    assert pipeline.expand(["raw/**"]) == pipeline.expand(["raw/**/*"])
+
+
+def test_new_file_under_double_star_input_reruns_the_stage(pipeline, tmp_path):
+    images = stage(pipeline, tmp_path, ["raw/**"])
+    state = {}
+
+    assert run(pipeline, images, state) == "ran"
+    assert run(pipeline, images, state) == "skipped"
+
+    (tmp_path / "raw" / "b.png").write_bytes(b"b")
+    assert run(pipeline, images, state) == "ran"
+
+
+def test_changed_file_under_double_star_input_reruns_the_stage(pipeline, tmp_path):
+    images = stage(pipeline, tmp_path, ["raw/**"])
+    state = {}
+    run(pipeline, images, state)
+
+    (tmp_path / "raw" / "nested" / "a.jpg").write_bytes(b"changed")
+    assert run(pipeline, images, state) == "ran"
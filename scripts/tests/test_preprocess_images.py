@@ -0,0 +1,151 @@
+import os
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def images(load_script):
+    return load_script("preprocess-images.py")
+
+
+# ---------------- OUTPUT NAMES ---------------- #
+
+
+def test_sources_sharing_an_output_name_collide(images):
+    raw = Path("/raw")
+    jpg, png, other = raw / "blog" / "foo.jpg", raw / "blog" / "foo.png", raw / "foo.jpg"
+
+    collisions = images.output_collisions([jpg, png, other], raw)
+
+    assert collisions == {jpg: [png], png: [jpg]}
+
+
+# ---------------- MANIFEST ---------------- #
+
+
+@pytest.fixture
+def raw(tmp_path):
+    from PIL import Image
+
+    src = tmp_path / "raw" / "foo.png"
+    src.parent.mkdir()
+    Image.new("RGB", (200, 100), (200, 30, 30)).save(src)
+    return src
+
+
+def convert(images, src, prior=None, quality=80, widths=(50, 100)):
+    out = src.parent.parent / "out" / src.name
+    result = images.process_image(
+        src, out, quality, list(widths), prior, encoder="pillow", placeholder_size=8
+    )
+    assert result.error is None, result.error
+    return result, out.with_suffix(".webp")
+
+
+def test_unchanged_source_is_not_reencoded(images, raw):
+    first, webp = convert(images, raw)
+    second, _ = convert(images, raw, first.entry)
+
+    assert not first.cached and second.cached
+    assert second.entry["variants"] == first.entry["variants"]
+    assert [v["width"] for v in first.entry["variants"]] == [50, 100]
+    assert second.entry["placeholder"] == first.entry["placeholder"]
+    assert webp.is_file()
+
+
+def test_touched_source_with_the_same_content_stays_cached(images, raw):
+    first, _ = convert(images, raw)
+    os.utime(raw, ns=(raw.stat().st_atime_ns, raw.stat().st_mtime_ns + 10**9))
+
+    second, _ = convert(images, raw, first.entry)
+
+    assert second.cached
+    assert second.entry["mtime_ns"] == raw.stat().st_mtime_ns
+
+
+@pytest.mark.parametrize(
+    "change",
+    ["content", "quality", "widths", "output deleted", "variant deleted"],
+)
+def test_changes_that_invalidate_the_entry(images, raw, change):
+    from PIL import Image
+
+    first, webp = convert(images, raw)
+    quality, widths = 80, (50, 100)
+    if change == "content":
+        Image.new("RGB", (200, 100), (30, 30, 200)).save(raw)
+    elif change == "quality":
+        quality = 60
+    elif change == "widths":
+        widths = (50,)
+    elif change == "output deleted":
+        webp.unlink()
+    elif change == "variant deleted":
+        images.variant_path(webp, 50).unlink()
+
+    second, _ = convert(images, raw, first.entry, quality, widths)
+
+    assert not second.cached
+    assert webp.is_file()
+    assert images.variant_path(webp, 50).is_file()
+    if change == "widths":
+        assert not images.variant_path(webp, 100).exists()
+    if change == "content":
+        assert second.entry["sha256"] != first.entry["sha256"]
+        assert second.entry["color"] != first.entry["color"]
+
+
+def test_placeholder_size_change_keeps_the_encode(images, raw):
+    first, webp = convert(images, raw)
+    out = raw.parent.parent / "out" / raw.name
+
+    second = images.process_image(
+        raw, out, 80, [50, 100], first.entry, encoder="pillow", placeholder_size=4
+    )
+
+    assert second.cached
+    assert second.entry["placeholder_size"] == 4
+    assert second.entry["placeholder"] != first.entry["placeholder"]
+
+
+# ---------------- PRUNING ---------------- #
+
+
+def entry_for(result, output):
+    return {**result.entry, "output": output}
+
+
+def test_outputs_of_removed_sources_are_pruned(images, raw, tmp_path):
+    result, webp = convert(images, raw)
+    manifest = {"foo.png": entry_for(result, "foo.webp")}
+
+    pruned = images.prune_orphans(manifest, {}, tmp_path / "out")
+
+    assert pruned == 1
+    assert manifest == {}
+    assert list((tmp_path / "out").iterdir()) == []
+
+
+def test_outputs_still_named_by_a_live_entry_are_kept(images, raw, tmp_path):
+    # foo.png was replaced by foo.jpg, which now owns foo.webp
+    result, webp = convert(images, raw)
+    manifest = {"foo.png": entry_for(result, "foo.webp")}
+    seen = {"foo.jpg": {**entry_for(result, "foo.webp"), "variants": result.entry["variants"][:1]}}
+
+    pruned = images.prune_orphans(manifest, seen, tmp_path / "out")
+
+    assert pruned == 1
+    assert webp.is_file()
+    assert images.variant_path(webp, 50).is_file()
+    assert not images.variant_path(webp, 100).exists()
+
+
+def test_manifest_round_trips(images, raw, tmp_path):
+    result, _ = convert(images, raw)
+    path = tmp_path / "out" / images.MANIFEST_NAME
+    images.save_manifest(path, {"foo.png": entry_for(result, "foo.webp")})
+
+    assert images.load_manifest(path) == {"foo.png": entry_for(result, "foo.webp")}
+    path.write_text("not json", encoding="utf-8")
+    assert images.load_manifest(path) == {}
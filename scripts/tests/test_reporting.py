@@ -0,0 +1,70 @@
+import io
+import json
+import subprocess
+import sys
+
+from conftest import SCRIPTS
+
+from reporting import Reporter
+
+
+def run_python(code):
+    return subprocess.run(
+        [sys.executable, "-c", code], cwd=SCRIPTS, capture_output=True, text=True
+    )
+
+
+def test_json_document_holds_records_and_summary():
+    stream = io.StringIO()
+    reporter = Reporter("json", "tool", stream)
+    reporter.record("file", path="a.md")
+    reporter.record("file", path="b.md")
+    reporter.summary(files=2)
+
+    data = json.loads(stream.getvalue())
+    assert [r["path"] for r in data["records"]] == ["a.md", "b.md"]
+    assert data["summary"]["files"] == 2 and data["summary"]["records"] == 2
+
+
+def test_summary_is_written_once():
+    stream = io.StringIO()
+    reporter = Reporter("ndjson", "tool", stream)
+    reporter.summary(files=0)
+    reporter.summary(files=0)
+
+    assert len(stream.getvalue().splitlines()) == 1
+
+
+def test_early_exit_still_closes_the_json_document():
+    proc = run_python(
+        "import sys\n"
+        "from reporting import Reporter\n"
+        "reporter = Reporter('json', 'tool')\n"
+        "reporter.record('file', path='a.md')\n"
+        "sys.exit(1)\n"
+    )
+
+    assert proc.returncode == 1
+    data = json.loads(proc.stdout)
+    assert data["summary"]["aborted"] is True
+    assert data["records"] == [{"type": "file", "path": "a.md"}]
+
+
+def test_fmt_markdown_usage_error_leaves_stdout_empty(tmp_path):
+    proc = subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPTS / "fmt-markdown.py"),
+            str(tmp_path),
+            "--fix-only",
+            "bogus",
+            "--format",
+            "json",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert proc.returncode == 1
+    assert proc.stdout == ""
+    assert "Unknown fix keys" in proc.stderr
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+import argparse, ctypes, ctypes.util, importlib.util, json, os, select, struct, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import toml
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich import box
+except ImportError as e:
+    sys.exit(f"Missing dependency: {e}")
+
+from content_index import ContentIndex
+
+console = Console()
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ROOT / "scripts"
+
+# Quiet period that ends a burst of events, e.g. an editor's save sequence or
+# a folder of images being copied in.
+DEFAULT_DEBOUNCE = 0.15
+DEFAULT_POLL_INTERVAL = 0.5
+
+Stat = Tuple[int, int]
+
+
+def load_script(name: str) -> ModuleType:
+    """Import one of the hyphen-named scripts so its state stays warm."""
+    spec = importlib.util.spec_from_file_location(name[:-3].replace("-", "_"), SCRIPTS / name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def stat_of(path: Path) -> Optional[Stat]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def stamp() -> str:
+    return f"[dim]{time.strftime('%H:%M:%S')}[/dim]"
+
+
+# ---------------- WATCHERS ---------------- #
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over a set of directories (Linux only)."""
+
+    def __init__(self, roots: List[Path]) -> None:
+        self.roots = roots
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.dirs: Dict[int, Path] = {}
+        for root in roots:
+            self.add_tree(root)
+
+    def add_tree(self, root: Path) -> Set[Path]:
+        """Watch ``root`` and its subdirectories; returns files already inside."""
+        found: Set[Path] = set()
+        for dirpath, _, filenames in os.walk(root):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), IN_MASK)
+            if wd >= 0:
+                self.dirs[wd] = Path(dirpath)
+            found.update(Path(dirpath) / name for name in filenames)
+        return found
+
+    def poll(self, timeout: float) -> Set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size : offset + EVENT_HEADER.size + length]
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; treat everything as changed
+                for root in self.roots:
+                    changed.update(p for p in root.rglob("*") if p.is_file())
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None:
+                continue
+            path = parent / os.fsdecode(name.rstrip(b"\0"))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may land before the new directory is watched
+                    changed.update(self.add_tree(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE):
+                changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """Fallback that compares (mtime, size) snapshots of the watched trees."""
+
+    def __init__(self, roots: List[Path], interval: float) -> None:
+        self.roots = roots
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> Dict[Path, Stat]:
+        snapshot: Dict[Path, Stat] = {}
+        for root in self.roots:
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    path = Path(dirpath) / name
+                    st = stat_of(path)
+                    if st is not None:
+                        snapshot[path] = st
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[Path]:
+        time.sleep(max(timeout, self.interval))
+        current = self.scan()
+        changed = {p for p, st in current.items() if self.snapshot.get(p) != st}
+        changed.update(p for p in self.snapshot if p not in current)
+        self.snapshot = current
+        return changed
+
+
+def make_watcher(roots: List[Path], poll: bool, interval: float):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            console.print(f"[yellow]inotify unavailable ({e}), polling instead[/yellow]")
+    return PollingWatcher(roots, interval)
+
+
+# ---------------- HANDLERS ---------------- #
+
+
+class ImageHandler:
+    """Converts only the raw images that changed, keeping the manifest loaded."""
+
+    def __init__(self, jobs: int) -> None:
+        self.images = load_script("preprocess-images.py")
+        c = self.images.cfg()
+        self.raw = Path(str(c["raw"]))
+        self.out = Path(str(c["out"]))
+        self.extensions = {f".{ext}" for ext in c["extensions"]}
+        self.quality = int(c["webp_quality"])
+        self.widths = [int(w) for w in c["widths"]]
+        self.data_file = Path(str(c["data_file"]))
+        self.url_base = str(c["url_base"])
+        self.encoder = self.images.select_encoder(str(c["encoder"]))
+        self.placeholder_size = (
+            int(c["placeholder_size"]) if self.images.pillow_available() else 0
+        )
+        self.manifest_path = self.out / self.images.MANIFEST_NAME
+        self.manifest = self.images.load_manifest(self.manifest_path)
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+
+    def roots(self) -> List[Path]:
+        return [self.raw]
+
+    def wants(self, path: Path) -> bool:
+        return path.suffix in self.extensions and path.is_relative_to(self.raw)
+
+    def handle(self, paths: List[Path]) -> None:
+        present = [p for p in paths if p.is_file()]
+        removed = [p for p in paths if not p.exists()]
+
+        def convert(src: Path):
+            key = src.relative_to(self.raw).as_posix()
+            return key, self.images.process_image(
+                src,
+                self.out / key,
+                self.quality,
+                self.widths,
+                self.manifest.get(key),
+                self.encoder,
+                self.placeholder_size,
+            )
+
+        with ThreadPoolExecutor(max_workers=min(self.jobs, max(1, len(present)))) as pool:
+            for key, result in pool.map(convert, present):
+                if result.error is not None:
+                    console.print(f"{stamp()} [red]✗ {key}: {result.error}[/red]")
+                    continue
+                self.manifest[key] = {
+                    **result.entry,
+                    "output": Path(key).with_suffix(".webp").as_posix(),
+                }
+                verb = "unchanged" if result.cached else f"→ WebP ({result.savings} smaller)"
+                console.print(f"{stamp()} [green]✓[/green] [cyan]{key}[/cyan] {verb}")
+
+        gone = {p.relative_to(self.raw).as_posix() for p in removed}
+        kept = {k: v for k, v in self.manifest.items() if k not in gone}
+        if self.images.prune_orphans(self.manifest, kept, self.out):
+            for key in sorted(gone):
+                console.print(f"{stamp()} [yellow]−[/yellow] [cyan]{key}[/cyan] removed")
+        self.manifest = kept
+
+        self.images.save_manifest(self.manifest_path, self.manifest)
+        self.images.write_if_changed(
+            self.data_file,
+            json.dumps(self.images.image_data(self.manifest, self.url_base), indent=2, sort_keys=True)
+            + "\n",
+        )
+
+
+class MarkdownHandler:
+    """Checks (and optionally fixes) saved notes with rules and vocabularies kept loaded.
+
+    Also keeps the shared content index current, so the next search-index or
+    langstats run finds nothing left to parse.
+    """
+
+    def __init__(self, content: Path, data_dir: Path, fixes: List[str]) -> None:
+        self.fmt = load_script("fmt-markdown.py")
+        unknown = [f for f in fixes if f not in self.fmt.FIX_FUNCTIONS]
+        if unknown:
+            raise SystemExit(f"Unknown fix keys: {', '.join(unknown)}")
+        self.content = content
+        self.data_dir = data_dir
+        self.fixes = fixes
+        self.index = ContentIndex()
+        self.reload_vocabularies()
+
+    def reload_vocabularies(self) -> None:
+        self.fmt.set_vocabularies(self.fmt.load_vocabularies(self.data_dir))
+
+    def roots(self) -> List[Path]:
+        return [self.content, self.data_dir]
+
+    def is_vocabulary(self, path: Path) -> bool:
+        return any(path == self.data_dir / name for name in self.fmt.TAXONOMY_SOURCES.values())
+
+    def wants(self, path: Path) -> bool:
+        return (path.suffix == ".md" and path.is_relative_to(self.content)) or self.is_vocabulary(path)
+
+    def handle(self, paths: List[Path]) -> None:
+        if any(self.is_vocabulary(p) for p in paths):
+            self.reload_vocabularies()
+            console.print(f"{stamp()} [blue]↻[/blue] taxonomy vocabularies reloaded")
+        for path in paths:
+            if path.suffix != ".md" or not path.is_file():
+                continue
+            rel = path.relative_to(self.content)
+            if self.fixes and self.fmt.fix_file(path, self.fixes):
+                console.print(f"{stamp()} [blue]✎[/blue] [cyan]{rel}[/cyan] fixed")
+            issues = self.fmt.check_file(path)
+            if issues:
+                console.print(f"{stamp()} [red]✗[/red] [cyan]{rel}[/cyan]")
+                for issue in issues:
+                    console.print(f"    {issue}", markup=False, highlight=False)
+            else:
+                console.print(f"{stamp()} [green]✓[/green] [cyan]{rel}[/cyan]")
+        if any(p.suffix == ".md" for p in paths):
+            self.index.refresh(self.content)
+
+
+# ---------------- MAIN ---------------- #
+
+
+def dispatch(handlers: Iterable, batch: Set[Path], seen: Dict[Path, Optional[Stat]]) -> None:
+    """Hand each handler the changed paths it cares about.
+
+    Paths whose (mtime, size) match what was last handled are dropped, so the
+    watcher's own writes (fixes, manifests) do not trigger another round.
+    """
+    fresh = []
+    for path in sorted(batch):
+        st = stat_of(path)
+        if path in seen and seen[path] == st:
+            continue
+        fresh.append(path)
+    for handler in handlers:
+        mine = [p for p in fresh if handler.wants(p)]
+        if mine:
+            try:
+                handler.handle(mine)
+            except Exception as e:
+                console.print(f"{stamp()} [red]✗ {type(handler).__name__}: {e}[/red]")
+    for path in fresh:
+        seen[path] = stat_of(path)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Watch raw images and content, reprocessing only what changed."
+    )
+    parser.add_argument(
+        "--fix",
+        nargs="+",
+        metavar="FIX",
+        default=[],
+        help="apply these fmt-markdown fixes to each saved note before checking it",
+    )
+    parser.add_argument(
+        "--no-images", action="store_true", help="do not watch static/images/raw"
+    )
+    parser.add_argument(
+        "--no-markdown", action="store_true", help="do not watch content"
+    )
+    parser.add_argument(
+        "--poll", action="store_true", help="poll for changes instead of using inotify"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"polling interval in seconds (default: {DEFAULT_POLL_INTERVAL})",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"quiet seconds that end a burst of events (default: {DEFAULT_DEBOUNCE})",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=0, help="concurrent image encodes (0 = one per CPU)"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    search = toml.load(ROOT / "config.toml").get("search-index", {})
+    content = (ROOT / search.get("content_dir", "content")).resolve()
+
+    handlers = []
+    if not args.no_images:
+        handlers.append(ImageHandler(args.jobs))
+    if not args.no_markdown:
+        handlers.append(MarkdownHandler(content, (ROOT / "data").resolve(), args.fix))
+    roots = sorted({r for h in handlers for r in h.roots() if r.is_dir()})
+    if not roots:
+        sys.exit("Nothing to watch")
+
+    watcher = make_watcher(roots, args.poll, args.interval)
+    console.print(
+        Panel.fit(
+            "[bold blue]Asset Watcher[/bold blue]\n"
+            + "\n".join(f"[dim]{r}[/dim]" for r in roots)
+            + f"\n[dim]{type(watcher).__name__}, debounce {args.debounce}s[/dim]",
+            box=box.DOUBLE,
+            border_style="blue",
+        )
+    )
+
+    seen: Dict[Path, Optional[Stat]] = {}
+    pending: Set[Path] = set()
+    deadline = 0.0
+    try:
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else 1.0
+            changed = watcher.poll(timeout)
+            if changed:
+                pending |= changed
+                deadline = time.monotonic() + args.debounce
+            elif pending and time.monotonic() >= deadline:
+                dispatch(handlers, pending, seen)
+                pending = set()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()